@@ -0,0 +1,757 @@
+"""
+A pure-Python stand-in for the parts of the `lldb` module used by iLLDB.
+
+Expressions are answered by responders registered on `SBProcess`:
+the first responder whose pattern matches the script returns the result.
+Scripts that no responder matches get the "no value" result (error 0x1001),
+which iLLDB treats as success.
+
+Example:
+    debugger = lldb.SBDebugger()
+    process = debugger.GetSelectedTarget().GetProcess()
+    process.respond(r'objectForKey', lambda script: process.object_result({'value': 'text'}))
+"""
+
+import re
+import sys
+import struct
+import plistlib
+from bisect import bisect_right, insort
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+eLanguageTypeC = 0x000C
+eLanguageTypeObjC = 0x0010
+eLanguageTypeObjC_plus_plus = 0x0011
+eLanguageTypeSwift = 0x001E
+eNoDynamicValues = 0
+eStateStopped = 5
+eStateExited = 10
+ePermissionsWritable = 1
+ePermissionsReadable = 2
+eSymbolTypeAny = 0
+eSymbolTypeData = 4
+eSymbolContextLineEntry = 1 << 5
+eSymbolContextSymbol = 1 << 6
+LLDB_INVALID_ADDRESS = 0xFFFFFFFFFFFFFFFF
+# Where Xcode keeps copies of the system images of a device
+DEVICE_SUPPORT = '/tmp/iOS DeviceSupport/17.0 (21A329)/Symbols'
+
+# Set by LLDB while a command runs.
+debugger: Optional['SBDebugger'] = None
+
+
+class SBError:
+    def __init__(self, value: int = 0, message: str = '') -> None:
+        self.value = value
+        self.message = message
+
+    def Success(self) -> bool:
+        return self.value == 0
+
+    def Fail(self) -> bool:
+        return not self.Success()
+
+    def GetError(self) -> int:
+        return self.value
+
+    def GetCString(self) -> str:
+        return self.message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class SBValue:
+    if TYPE_CHECKING:
+        # Added by `lldbhelper/SBValue.py` when it is imported
+        def asInt(self) -> Optional[int]:
+            ...
+
+        def asFloat(self) -> Optional[float]:
+            ...
+
+        def asBool(self) -> Optional[bool]:
+            ...
+
+        def asStr(self) -> Optional[str]:
+            ...
+
+    def __init__(
+        self,
+        value: Optional[str] = None,
+        summary: Optional[str] = None,
+        description: Optional[str] = None,
+        error: Optional[SBError] = None,
+        children: Optional[list['SBValue']] = None,
+        name: Optional[str] = None,
+        valid: bool = True
+    ) -> None:
+        self.valid = valid
+        self.name = name
+        self.value = value
+        self.summary = summary
+        self.description = description
+        self.error = error or SBError()
+        self.children = children or []
+
+    def IsValid(self) -> bool:
+        return self.valid
+
+    def GetName(self) -> Optional[str]:
+        return self.name
+
+    def GetValue(self) -> Optional[str]:
+        return self.value
+
+    def GetSummary(self) -> Optional[str]:
+        return self.summary
+
+    def GetObjectDescription(self) -> Optional[str]:
+        return self.description
+
+    def GetError(self) -> SBError:
+        return self.error
+
+    def GetValueAsUnsigned(self, default: int = 0) -> int:
+        try:
+            return int(self.value or '', 0)
+        except ValueError:
+            return default
+
+    def GetNumChildren(self) -> int:
+        return len(self.children)
+
+    def GetChildAtIndex(self, index: int) -> 'SBValue':
+        return self.children[index]
+
+    def GetChildMemberWithName(self, name: str) -> 'SBValue':
+        for child in self.children:
+            if child.name == name:
+                return child
+        return SBValue(valid=False)
+
+
+class SBExpressionOptions:
+    """Records every `Set...` call as an attribute (e.g. `SetTimeoutInMicroSeconds` -> `TimeoutInMicroSeconds`)."""
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        if not name.startswith('Set'):
+            raise AttributeError(name)
+
+        def setter(*args: Any) -> None:
+            setattr(self, name[3:], args[0] if args else None)
+        return setter
+
+
+class SBFileSpec:
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def IsValid(self) -> bool:
+        return self.path != ''
+
+    def GetFilename(self) -> str:
+        return self.path.split('/')[-1]
+
+    def GetDirectory(self) -> str:
+        return '/'.join(self.path.split('/')[:-1])
+
+    @property
+    def fullpath(self) -> str:
+        return self.path
+
+
+class SBModule:
+    def __init__(
+        self,
+        path: str = '',
+        uuid: Optional[str] = None,
+        base: int = 0,
+        size: int = 0,
+        platform_path: str = ''
+    ) -> None:
+        self.path = path
+        # The path in the process when `path` is a copy on the host (e.g. DeviceSupport)
+        self.platform_path = platform_path
+        self.uuid = uuid
+        self.base = base
+        self.size = size
+        self.sections = [SBSection('__TEXT', self, base, size)] if size > 0 else []
+        # sorted (start address, name, source file, line) of functions
+        self.functions: list[tuple[int, str, str, int]] = []
+
+    def IsValid(self) -> bool:
+        return self.path != ''
+
+    def GetFileSpec(self) -> SBFileSpec:
+        return SBFileSpec(self.path)
+
+    def GetPlatformFileSpec(self) -> SBFileSpec:
+        return SBFileSpec(self.platform_path)
+
+    def GetUUIDString(self) -> Optional[str]:
+        return self.uuid
+
+    def GetNumSections(self) -> int:
+        return len(self.sections)
+
+    def GetSectionAtIndex(self, index: int) -> 'SBSection':
+        return self.sections[index]
+
+    def ResolveSymbolContextForAddress(self, address: 'SBAddress', scope: int) -> 'SBSymbolContext':
+        index = bisect_right(self.functions, (address.load_address, '\uffff')) - 1
+        if index < 0:
+            return SBSymbolContext(SBSymbol('', SBAddress(0)))
+        start, name, file, line = self.functions[index]
+        symbol = SBSymbol(name, SBAddress(start, self)) if scope & eSymbolContextSymbol else SBSymbol('', SBAddress(0))
+        line_entry = SBLineEntry(file, line) if scope & eSymbolContextLineEntry else SBLineEntry('', 0)
+        return SBSymbolContext(symbol, line_entry)
+
+    def add_function(self, address: int, name: str, file: str = '', line: int = 0) -> None:
+        """Adds a function symbol, with its source location if `file` is given."""
+        insort(self.functions, (address, name, file, line))
+
+
+class SBSection:
+    def __init__(self, name: str, module: SBModule, address: int, size: int) -> None:
+        self.name = name
+        self.module = module
+        self.address = address
+        self.size = size
+
+    def GetName(self) -> str:
+        return self.name
+
+    def GetLoadAddress(self, target: 'SBTarget') -> int:
+        return self.address
+
+    def GetByteSize(self) -> int:
+        return self.size
+
+
+class SBAddress:
+    """Created from a load address (and module), or from a section and an offset."""
+
+    def __init__(self, base: Union[int, SBSection], offset_or_module: Union[int, SBModule, None] = None) -> None:
+        if isinstance(base, SBSection):
+            self.load_address = base.address + (offset_or_module if isinstance(offset_or_module, int) else 0)
+            self.module = base.module
+        else:
+            self.load_address = base
+            self.module = offset_or_module if isinstance(offset_or_module, SBModule) else SBModule()
+
+    def GetModule(self) -> SBModule:
+        return self.module
+
+    def GetLoadAddress(self, target: 'SBTarget') -> int:
+        return self.load_address
+
+
+class SBSymbol:
+    def __init__(self, name: str, address: SBAddress) -> None:
+        self.name = name
+        self.address = address
+
+    def IsValid(self) -> bool:
+        return self.name != ''
+
+    def GetName(self) -> str:
+        return self.name
+
+    def GetStartAddress(self) -> SBAddress:
+        return self.address
+
+
+class SBLineEntry:
+    def __init__(self, file: str, line: int) -> None:
+        self.file = file
+        self.line = line
+
+    def IsValid(self) -> bool:
+        return self.file != ''
+
+    def GetFileSpec(self) -> SBFileSpec:
+        return SBFileSpec(self.file)
+
+    def GetLine(self) -> int:
+        return self.line
+
+
+class SBSymbolContext:
+    def __init__(self, symbol: SBSymbol, line_entry: Optional[SBLineEntry] = None) -> None:
+        self.symbol = symbol
+        self.line_entry = line_entry or SBLineEntry('', 0)
+
+    def GetSymbol(self) -> SBSymbol:
+        return self.symbol
+
+    def GetLineEntry(self) -> SBLineEntry:
+        return self.line_entry
+
+
+class SBSymbolContextList:
+    def __init__(self, contexts: Optional[list[SBSymbolContext]] = None) -> None:
+        self.contexts = contexts or []
+
+    def GetSize(self) -> int:
+        return len(self.contexts)
+
+    def GetContextAtIndex(self, index: int) -> SBSymbolContext:
+        return self.contexts[index]
+
+
+class SBBreakpoint:
+    def __init__(self, id: int, address: int) -> None:
+        self.id = id
+        self.address = address
+        self.names: list[str] = []
+        self.auto_continue = False
+        self.callback: Optional[str] = None
+        self.ignore_count = 0
+        self.hit_count = 0
+
+    def IsValid(self) -> bool:
+        return self.id > 0
+
+    def GetID(self) -> int:
+        return self.id
+
+    def AddName(self, name: str) -> bool:
+        self.names.append(name)
+        return True
+
+    def SetAutoContinue(self, auto_continue: bool) -> None:
+        self.auto_continue = auto_continue
+
+    def SetScriptCallbackFunction(self, name: str) -> None:
+        self.callback = name
+
+    def SetIgnoreCount(self, count: int) -> None:
+        self.ignore_count = count
+
+    def GetHitCount(self) -> int:
+        return self.hit_count
+
+
+class SBBreakpointList:
+    def __init__(self, target: 'SBTarget') -> None:
+        self.target = target
+        self.breakpoints: list[SBBreakpoint] = []
+
+    def GetSize(self) -> int:
+        return len(self.breakpoints)
+
+    def GetBreakpointAtIndex(self, index: int) -> SBBreakpoint:
+        return self.breakpoints[index]
+
+
+class SBBreakpointLocation:
+    def __init__(self, breakpoint: SBBreakpoint) -> None:
+        self.breakpoint = breakpoint
+
+    def GetBreakpoint(self) -> SBBreakpoint:
+        return self.breakpoint
+
+
+class SBPlatform:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def IsValid(self) -> bool:
+        return True
+
+    def GetName(self) -> str:
+        return self.name
+
+
+class SBFrame:
+    def __init__(self, process: 'SBProcess') -> None:
+        self.process = process
+
+    def __bool__(self) -> bool:
+        return True
+
+    def IsValid(self) -> bool:
+        return True
+
+    def EvaluateExpression(self, script: str, options: SBExpressionOptions) -> SBValue:
+        return self.process.evaluate(script, options)
+
+    def GetValueForVariablePath(self, path: str) -> SBValue:
+        if path in self.process.variables:
+            return self.process.variables[path]
+        return SBValue(valid=False, error=SBError(1, f'no variable named {path}'))
+
+    def GetCompileUnit(self) -> 'SBFrame':
+        return self
+
+    def GetLanguage(self) -> int:
+        return self.process.language
+
+
+class SBEvent:
+    def __init__(self, type: int = 0, modules: Optional[list['SBModule']] = None) -> None:
+        self.type = type
+        self.modules = modules or []
+
+    def GetType(self) -> int:
+        return self.type
+
+
+class SBListener:
+    def __init__(self, name: str = '') -> None:
+        self.name = name
+        self.events: list[SBEvent] = []
+
+    def GetNextEvent(self, event: SBEvent) -> bool:
+        """Pops the next event without waiting, like LLDB's implementation."""
+        if not self.events:
+            return False
+        next = self.events.pop(0)
+        event.type = next.type
+        event.modules = next.modules
+        return True
+
+
+class SBBroadcaster:
+    def __init__(self) -> None:
+        self.listeners: list[tuple[SBListener, int]] = []
+
+    def AddListener(self, listener: SBListener, event_mask: int) -> int:
+        self.listeners.append((listener, event_mask))
+        return event_mask
+
+    def broadcast(self, event: SBEvent) -> None:
+        for listener, mask in self.listeners:
+            if event.type & mask:
+                listener.events.append(SBEvent(event.type, list(event.modules)))
+
+
+class SBThread:
+    def __init__(self, process: 'SBProcess') -> None:
+        self.frame = SBFrame(process)
+
+    def GetSelectedFrame(self) -> SBFrame:
+        return self.frame
+
+
+class SBProcess:
+    """
+    A stopped process with sparse memory.
+
+    Attributes:
+        expressions (list[tuple[str, SBExpressionOptions]]): Evaluated scripts and their options.
+        responders (list[tuple[str, Union[SBValue, Callable[[str], SBValue]]]]): Registered responders.
+        language (int): The language of the selected frame.
+        stop_id (int): The stop ID. Increment it to simulate resuming.
+        memory (dict[int, bytes]): Memory regions by base address.
+        variables (dict[str, SBValue]): Variables of the selected frame by path.
+    """
+
+    def __init__(self) -> None:
+        self.expressions: list[tuple[str, SBExpressionOptions]] = []
+        self.responders: list[tuple[str, Union[SBValue, Callable[[str], SBValue]]]] = []
+        self.language = eLanguageTypeObjC
+        self.thread = SBThread(self)
+        self.unique_id = 1
+        self.pid = 100
+        self.stop_id = 1
+        self.memory: dict[int, bytes] = {}
+        self.variables: dict[str, SBValue] = {}
+        self.is_alive = True
+        self.last_write = 0
+        self._next_address = 0x600000000000
+
+    def IsValid(self) -> bool:
+        return True
+
+    def GetUniqueID(self) -> int:
+        return self.unique_id
+
+    def GetProcessID(self) -> int:
+        return self.pid
+
+    def GetStopID(self, include_expression_stops: bool = False) -> int:
+        return self.stop_id
+
+    def GetState(self) -> int:
+        return eStateStopped if self.is_alive else eStateExited
+
+    def GetSelectedThread(self) -> SBThread:
+        return self.thread
+
+    def AllocateMemory(self, size: int, permissions: int, error: SBError) -> int:
+        return self.place(bytes(size))
+
+    def DeallocateMemory(self, address: int) -> SBError:
+        self.memory.pop(address, None)
+        return SBError()
+
+    def ReadMemory(self, address: int, length: int, error: SBError) -> Optional[bytes]:
+        for base, data in self.memory.items():
+            if base <= address and address + length <= base + len(data):
+                return data[address - base:address - base + length]
+        error.value = 1
+        error.message = f'memory read failed for {address:#x}'
+        return None
+
+    def ReadPointerFromMemory(self, address: int, error: SBError) -> int:
+        data = self.ReadMemory(address, 8, error)
+        return struct.unpack('<Q', data)[0] if data is not None else 0
+
+    def ReadUnsignedFromMemory(self, address: int, size: int, error: SBError) -> int:
+        data = self.ReadMemory(address, size, error)
+        return int.from_bytes(data, 'little') if data is not None else 0
+
+    def ReadCStringFromMemory(self, address: int, max_length: int, error: SBError) -> Optional[str]:
+        for base, data in self.memory.items():
+            if base <= address < base + len(data):
+                end = data.find(b'\0', address - base, address - base + max_length)
+                if end < 0:
+                    end = min(len(data), address - base + max_length)
+                return data[address - base:end].decode('utf-8', 'replace')
+        error.value = 1
+        error.message = f'memory read failed for {address:#x}'
+        return None
+
+    def WriteMemory(self, address: int, data: bytes, error: SBError) -> int:
+        for base, old in self.memory.items():
+            if base <= address and address + len(data) <= base + len(old):
+                offset = address - base
+                self.memory[base] = old[:offset] + bytes(data) + old[offset + len(data):]
+                self.last_write = address
+                return len(data)
+        error.value = 1
+        error.message = f'memory write failed for {address:#x}'
+        return 0
+
+    def respond(self, pattern: str, responder: Union[SBValue, Callable[[str], SBValue]]) -> None:
+        """
+        Registers a responder for scripts matching `pattern`.
+
+        Args:
+            pattern (str): A regular expression searched in the script.
+            responder (Union[SBValue, Callable[[str], SBValue]]): The result, or a function returning it.
+        """
+        self.responders.append((pattern, responder))
+
+    def evaluate(self, script: str, options: SBExpressionOptions) -> SBValue:
+        self.expressions.append((script, options))
+        for pattern, responder in self.responders:
+            if re.search(pattern, script, re.S):
+                return responder(script) if callable(responder) else responder
+        return SBValue(error=SBError(0x1001, 'error: Execution was interrupted, reason: no value.'))
+
+    def arguments(self) -> list[Union[None, int, str, bytes]]:
+        """
+        Decodes the argument block written last, as packed by `util.pack_arguments`.
+        Integers are returned unsigned and strings are decoded as UTF-8.
+        """
+        error = SBError()
+        header = self.ReadMemory(self.last_write, 8, error) or bytes(8)
+        count = struct.unpack('<Q', header)[0]
+        arguments: list[Union[None, int, str, bytes]] = []
+        for i in range(count):
+            kind, length, value = struct.unpack('<QQQ', self.ReadMemory(self.last_write + 8 + 24 * i, 24, error) or bytes(24))
+            if kind == 1:
+                arguments.append(value)
+            elif kind in (2, 3):
+                payload = self.ReadMemory(value, length, error) or b''
+                arguments.append(payload.decode('utf-8') if kind == 2 else payload)
+            else:
+                arguments.append(None)
+        return arguments
+
+    def place(self, data: bytes, address: Optional[int] = None) -> int:
+        """
+        Places `data` in memory.
+
+        Args:
+            data (bytes): The contents.
+            address (Optional[int]): The address. If None, a free region is used.
+
+        Returns:
+            int: The address.
+        """
+        if address is not None:
+            self.memory[address] = data
+            return address
+        address = self._next_address
+        self._next_address += (len(data) + 0xFFFF) & ~0xFFFF or 0x10000
+        self.memory[address] = data
+        return address
+
+    def buffer_result(self, data: bytes) -> SBValue:
+        """
+        Returns an NSRange-like result pointing to `data`, as produced by the transfer epilogues.
+
+        Args:
+            data (bytes): The transferred bytes.
+        """
+        address = self.place(data)
+        return SBValue(children=[
+            SBValue(value=hex(address), name='location'),
+            SBValue(value=str(len(data)), name='length')
+        ])
+
+    def object_result(self, value: Any) -> SBValue:
+        """
+        Returns `value` serialized as a binary property list, as `util.exp_object` expects.
+
+        Args:
+            value (Any): A property list object.
+        """
+        return self.buffer_result(plistlib.dumps(value, fmt=plistlib.FMT_BINARY))
+
+
+class SBTarget:
+    eBroadcastBitBreakpointChanged = 1 << 0
+    eBroadcastBitModulesLoaded = 1 << 1
+    eBroadcastBitModulesUnloaded = 1 << 2
+    eBroadcastBitWatchpointChanged = 1 << 3
+    eBroadcastBitSymbolsLoaded = 1 << 4
+
+    def __init__(self) -> None:
+        self.process = SBProcess()
+        self.triple = 'arm64-apple-ios17.0.0-simulator'
+        self.modules = [
+            SBModule('/usr/lib/dyld', '0A1B2C3D-0000-4000-8000-000000000001'),
+            SBModule('/usr/lib/libobjc.A.dylib', '0A1B2C3D-0000-4000-8000-000000000002'),
+            # A copy of the file on the host, like the symbols of a device under DeviceSupport
+            SBModule(f'{DEVICE_SUPPORT}/System/Library/PrivateFrameworks/UIKitCore.framework/UIKitCore',
+                     '0A1B2C3D-0000-4000-8000-000000000003', base=0x180000000, size=0x10000000,
+                     platform_path='/System/Library/PrivateFrameworks/UIKitCore.framework/UIKitCore')
+        ]
+        self.platform = SBPlatform('ios-simulator')
+        self.broadcaster = SBBroadcaster()
+        # symbol name -> load address
+        self.symbols: dict[str, int] = {}
+        self.breakpoints: dict[int, SBBreakpoint] = {}
+        self.deleted_breakpoints = 0
+        self.breakpoint_addresses: dict[int, list[SBBreakpoint]] = {}
+
+    def IsValid(self) -> bool:
+        return True
+
+    def GetProcess(self) -> SBProcess:
+        return self.process
+
+    def GetTriple(self) -> str:
+        return self.triple
+
+    def GetNumModules(self) -> int:
+        return len(self.modules)
+
+    def GetModuleAtIndex(self, index: int) -> SBModule:
+        return self.modules[index]
+
+    def GetPlatform(self) -> SBPlatform:
+        return self.platform
+
+    def FindSymbols(self, name: str, symbol_type: int = eSymbolTypeAny) -> SBSymbolContextList:
+        if name not in self.symbols:
+            return SBSymbolContextList()
+        address = self.ResolveLoadAddress(self.symbols[name])
+        return SBSymbolContextList([SBSymbolContext(SBSymbol(name, address))])
+
+    def ResolveLoadAddress(self, address: int) -> SBAddress:
+        for module in self.modules:
+            if module.base <= address < module.base + module.size:
+                return SBAddress(address, module)
+        return SBAddress(address)
+
+    def GetBroadcaster(self) -> SBBroadcaster:
+        return self.broadcaster
+
+    def BreakpointCreateByAddress(self, address: int) -> SBBreakpoint:
+        breakpoint = SBBreakpoint(len(self.breakpoints) + 1 + self.deleted_breakpoints, address)
+        self.breakpoints[breakpoint.id] = breakpoint
+        self.breakpoint_addresses.setdefault(address, []).append(breakpoint)
+        return breakpoint
+
+    def BreakpointDelete(self, id: int) -> bool:
+        breakpoint = self.breakpoints.pop(id, None)
+        if breakpoint is None:
+            return False
+        self.breakpoint_addresses[breakpoint.address].remove(breakpoint)
+        self.deleted_breakpoints += 1
+        return True
+
+    def FindBreakpointsByName(self, name: str, breakpoints: SBBreakpointList) -> bool:
+        breakpoints.breakpoints += [breakpoint for breakpoint in self.breakpoints.values() if name in breakpoint.names]
+        return True
+
+    def GetNumBreakpoints(self) -> int:
+        return len(self.breakpoints)
+
+    def hit(self, address: int) -> bool:
+        """
+        Simulates the process reaching `address`: runs the callback of its breakpoint like LLDB,
+        honoring ignore counts. Returns whether the process stopped.
+        """
+        for breakpoint in self.breakpoint_addresses.get(address, []):
+            breakpoint.hit_count += 1
+            if breakpoint.ignore_count > 0:
+                breakpoint.ignore_count -= 1
+                return False
+            should_stop = True
+            if breakpoint.callback is not None:
+                module_name, function_name = breakpoint.callback.rsplit('.', 1)
+                function = getattr(sys.modules[module_name], function_name)
+                should_stop = function(SBFrame(self.process), SBBreakpointLocation(breakpoint), {}) is not False
+            return should_stop and not breakpoint.auto_continue
+        return False
+
+    @staticmethod
+    def GetNumModulesFromEvent(event: SBEvent) -> int:
+        return len(event.modules)
+
+    @staticmethod
+    def GetModuleAtIndexFromEvent(index: int, event: SBEvent) -> SBModule:
+        return event.modules[index]
+
+    def load_module(self, path: str) -> None:
+        """Adds a module and broadcasts `eBroadcastBitModulesLoaded`."""
+        module = SBModule(path)
+        self.modules.append(module)
+        self.broadcaster.broadcast(SBEvent(SBTarget.eBroadcastBitModulesLoaded, [module]))
+
+    def unload_module(self, path: str) -> None:
+        """Removes a module and broadcasts `eBroadcastBitModulesUnloaded`."""
+        modules = [m for m in self.modules if m.path == path] or [SBModule(path)]
+        self.modules = [m for m in self.modules if m.path != path]
+        self.broadcaster.broadcast(SBEvent(SBTarget.eBroadcastBitModulesUnloaded, modules))
+
+
+class SBDebugger:
+    def __init__(self) -> None:
+        self.target = SBTarget()
+        self.commands: list[str] = []
+
+    def GetSelectedTarget(self) -> SBTarget:
+        return self.target
+
+    def GetSelectedPlatform(self) -> SBPlatform:
+        return self.target.platform
+
+    def HandleCommand(self, command: str) -> None:
+        self.commands.append(command)
+
+
+class SBCommandReturnObject:
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+        self.errors: list[str] = []
+
+    def AppendMessage(self, message: str) -> None:
+        self.messages.append(message)
+
+    def SetError(self, message: str) -> None:
+        self.errors.append(message)
+
+    def Succeeded(self) -> bool:
+        return len(self.errors) == 0
+
+
+class SBExecutionContext:
+    pass
@@ -0,0 +1,203 @@
+"""
+Writes synthetic 64-bit Mach-O images with Objective-C and Swift metadata, for benchmarking static class listing.
+
+Pointers are encoded as chained fixups (`DYLD_CHAINED_PTR_64_OFFSET`) like images linked for recent OS versions,
+and categories of classes of other images refer to them through binds.
+"""
+
+import os
+import struct
+from typing import Optional
+
+BASE = 0x100000000
+PAGE = 0x4000
+IMPORTS = ['_OBJC_CLASS_$_UIView', '_OBJC_CLASS_$_NSObject']
+MODULE = 'Static'
+
+
+def swift_class_name(name: str) -> str:
+    """Returns the Objective-C name of a Swift class of the module (e.g. `_TtC6Static5Type0`)."""
+    return f'_TtC{len(MODULE)}{MODULE}{len(name)}{name}'
+
+
+def align(value: int, alignment: int) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+class Section:
+    def __init__(self, segment: str, name: str, size: int) -> None:
+        self.segment = segment
+        self.name = name
+        self.size = size
+        self.address = 0
+
+
+def write_image(path: str, uuid: str, count: int) -> dict[str, int]:
+    """
+    Writes an image declaring `count` classes, `count // 10` categories and protocols, and `count // 2` Swift types.
+
+    Every tenth class is a Swift class, every fifth Swift type is nested in the previous one,
+    and categories alternate between `UIView` (in another image) and classes of the image.
+
+    Args:
+        path (str): The path of the file.
+        uuid (str): The UUID of the image.
+        count (int): The number of classes.
+
+    Returns:
+        dict[str, int]: The number of declarations of each kind.
+    """
+    classes = [swift_class_name(f'SwiftClass{i}') if i % 10 == 9 else f'SyntheticStaticClass{i}' for i in range(count)]
+    categories = [(f'Static{i}', i) for i in range(count // 10)]
+    protocols = [f'SyntheticStaticProtocol{i}' for i in range(count // 10)]
+    # kind, name, index of the parent type (or None for the module)
+    swift_types: list[tuple[int, str, Optional[int]]] = []
+    for i in range(count // 2):
+        swift_types.append((17 + i % 2, f'Type{i}', i - 1 if i % 5 == 4 else None))
+
+    strings: dict[str, int] = {}
+    for name in [MODULE, 'SyntheticProtocol'] + classes + [c[0] for c in categories] + protocols + [t[1] for t in swift_types]:
+        strings.setdefault(name, 0)
+
+    sections = [
+        Section('__TEXT', '__cstring', sum(len(s.encode()) + 1 for s in strings)),
+        Section('__TEXT', '__const', 12 + 20 * (len(swift_types) + 1)),
+        Section('__TEXT', '__swift5_types', 4 * len(swift_types)),
+        Section('__TEXT', '__swift5_protos', 4),
+        Section('__DATA_CONST', '__objc_classlist', 8 * len(classes)),
+        Section('__DATA_CONST', '__objc_catlist', 8 * len(categories)),
+        Section('__DATA_CONST', '__objc_protolist', 8 * len(protocols)),
+        Section('__DATA', '__objc_const', 72 * len(classes) + 48 * len(categories) + 72 * len(protocols)),
+        Section('__DATA', '__objc_data', 40 * len(classes)),
+    ]
+    segment_names = ['__TEXT', '__DATA_CONST', '__DATA']
+    # segment -> (address, size)
+    segments: dict[str, tuple[int, int]] = {}
+    address = BASE + 0x1000
+    for segment_name in segment_names:
+        start = BASE if segment_name == '__TEXT' else address
+        for section in sections:
+            if section.segment == segment_name:
+                section.address = align(address, 8)
+                address = section.address + section.size
+        address = align(address, PAGE)
+        segments[segment_name] = (start, address - start)
+
+    # Chained fixups: header, starts in image (one per segment and __LINKEDIT), starts in segment, imports, symbols
+    starts_offset = 32
+    segment_starts_offset = 4 + 4 * (len(segment_names) + 1)
+    imports_offset = starts_offset + segment_starts_offset + 24
+    symbols_offset = imports_offset + 4 * len(IMPORTS)
+    symbols = b''.join(name.encode() + b'\0' for name in IMPORTS)
+    fixups = bytearray(symbols_offset + len(symbols))
+    struct.pack_into('<IIIIIII', fixups, 0, 0, starts_offset, imports_offset, symbols_offset, len(IMPORTS), 1, 0)
+    struct.pack_into('<I', fixups, starts_offset, len(segment_names) + 1)
+    for i in range(1, len(segment_names)):
+        struct.pack_into('<I', fixups, starts_offset + 4 + i * 4, segment_starts_offset)
+    # size, page_size, pointer_format, segment_offset, max_valid_pointer, page_count
+    struct.pack_into('<IHHQIH', fixups, starts_offset + segment_starts_offset, 24, PAGE, 6, 0, 0, 0)
+    name_offset = 0
+    for i, name in enumerate(IMPORTS):
+        struct.pack_into('<I', fixups, imports_offset + i * 4, name_offset << 9)
+        name_offset += len(name) + 1
+    fixups[symbols_offset:] = symbols
+    linkedit = (address, align(len(fixups), PAGE))
+
+    image = bytearray(address - BASE + linkedit[1])
+    image[address - BASE:address - BASE + len(fixups)] = fixups
+    by_name = {section.name: section for section in sections}
+
+    def offset(address: int) -> int:
+        return address - BASE
+
+    def pointer(field: int, target: int) -> None:
+        struct.pack_into('<Q', image, offset(field), target - BASE)
+
+    def bind(field: int, ordinal: int) -> None:
+        struct.pack_into('<Q', image, offset(field), 1 << 63 | ordinal)
+
+    def relative(field: int, target: int, indirect: bool = False) -> None:
+        struct.pack_into('<i', image, offset(field), target - field + (1 if indirect else 0))
+
+    position = by_name['__cstring'].address
+    for name in strings:
+        strings[name] = position
+        encoded = name.encode() + b'\0'
+        image[offset(position):offset(position) + len(encoded)] = encoded
+        position += len(encoded)
+
+    # Objective-C
+    const = by_name['__objc_const'].address
+    data = by_name['__objc_data'].address
+    class_addresses = []
+    for i, name in enumerate(classes):
+        class_address = data + i * 40
+        ro = const + i * 72
+        class_addresses.append(class_address)
+        pointer(by_name['__objc_classlist'].address + i * 8, class_address)
+        # data with the Swift stable ABI flag for Swift classes
+        pointer(class_address + 32, ro + (2 if name.startswith('_Tt') else 0))
+        pointer(ro + 24, strings[name])
+    const += len(classes) * 72
+    for i, (name, class_index) in enumerate(categories):
+        category = const + i * 48
+        pointer(by_name['__objc_catlist'].address + i * 8, category)
+        pointer(category, strings[name])
+        if i % 2 == 0:
+            bind(category + 8, 0)
+        else:
+            pointer(category + 8, class_addresses[class_index])
+    const += len(categories) * 48
+    for i, name in enumerate(protocols):
+        protocol = const + i * 72
+        pointer(by_name['__objc_protolist'].address + i * 8, protocol)
+        pointer(protocol + 8, strings[name])
+
+    # Swift: the module descriptor, then a descriptor per type, then a protocol
+    descriptors = by_name['__const'].address
+    module = descriptors
+    struct.pack_into('<I', image, offset(module), 0)
+    relative(module + 8, strings[MODULE])
+    type_addresses = []
+    for i, (kind, name, parent) in enumerate(swift_types):
+        descriptor = descriptors + 12 + i * 20
+        type_addresses.append(descriptor)
+        struct.pack_into('<I', image, offset(descriptor), kind)
+        relative(descriptor + 4, type_addresses[parent] if parent is not None else module)
+        relative(descriptor + 8, strings[name])
+        relative(by_name['__swift5_types'].address + i * 4, descriptor)
+    protocol_descriptor = descriptors + 12 + len(swift_types) * 20
+    struct.pack_into('<I', image, offset(protocol_descriptor), 3)
+    relative(protocol_descriptor + 4, module)
+    relative(protocol_descriptor + 8, strings['SyntheticProtocol'])
+    relative(by_name['__swift5_protos'].address, protocol_descriptor)
+
+    # Header and load commands
+    commands = bytearray()
+    for segment_name in segment_names + ['__LINKEDIT']:
+        if segment_name == '__LINKEDIT':
+            segment_address, segment_size = linkedit
+        else:
+            segment_address, segment_size = segments[segment_name]
+        members = [s for s in sections if s.segment == segment_name]
+        commands += struct.pack('<II16sQQQQiiII', 0x19, 72 + 80 * len(members), segment_name.encode(),
+                                segment_address, segment_size, offset(segment_address), segment_size, 7, 3, len(members), 0)
+        for section in members:
+            commands += struct.pack('<16s16sQQIIIIIIII', section.name.encode(), segment_name.encode(),
+                                    section.address, section.size, offset(section.address), 3, 0, 0, 0, 0, 0, 0)
+    commands += struct.pack('<II16s', 0x1b, 24, bytes.fromhex(uuid.replace('-', '')))
+    commands += struct.pack('<IIII', 0x80000034, 16, offset(linkedit[0]), len(fixups))
+    # MH_MAGIC_64, CPU_TYPE_ARM64, MH_DYLIB
+    header = struct.pack('<IiiIIIII', 0xfeedfacf, 0x0100000c, 0, 6, len(segment_names) + 3, len(commands), 0, 0)
+    image[0:len(header) + len(commands)] = header + commands
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(image)
+
+    return {
+        'classes': len(classes),
+        'categories': len(categories),
+        'protocols': len(protocols),
+        'swift_types': len(swift_types) + 1,
+    }
@@ -0,0 +1,905 @@
+"""
+Benchmarks iLLDB commands and parsers against the fake lldb module in benchmarks/fake.
+
+Usage:
+    python benchmarks/run.py [--runs RUNS] [--filter TEXT] [--save FILE] [--compare FILE] [--tolerance RATIO]
+
+Every scenario runs a command (or parser) with a synthetic large payload and checks its output.
+For each scenario the mean and minimum time per run, the peak of traced memory and the number of
+memory blocks allocated by a run are reported.
+With `--compare`, exits with status 1 if a scenario fails its check or is slower than the saved results
+by more than the tolerance.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+import plistlib
+import builtins
+import tempfile
+import subprocess
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from typing import Any, Callable, Iterator, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks', 'fake'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import lldb  # noqa: E402
+import iLLDB  # noqa: E402
+import objc  # noqa: E402
+import objc_cache  # noqa: E402
+import objc_index  # noqa: E402
+import objc_static  # noqa: E402
+import objc_trace  # noqa: E402
+import synthetic_macho  # noqa: E402
+import ui_hierarchy  # noqa: E402
+from lldbhelper import SBValue  # noqa: E402, F401
+
+SIZE = 5000
+
+
+class Scenario:
+    """
+    A benchmarked operation.
+
+    Attributes:
+        name (str): The scenario name.
+        run (Callable[[], Any]): The operation. Its return value is passed to `check`.
+        check (Callable[[Any], bool]): Returns whether the result is correct.
+        setup (Optional[Callable[[], None]]): Called before every run, outside of the measurement.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[], Any],
+        check: Callable[[Any], bool],
+        setup: Optional[Callable[[], None]] = None
+    ) -> None:
+        self.name = name
+        self.run = run
+        self.check = check
+        self.setup = setup
+
+
+def method_description(count: int) -> str:
+    lines = ["in SyntheticView:", "\tClass Methods:"]
+    lines += [f"\t\t+ (id) classMethod{i}:(id)arg1 with:(long)arg2; (0x{0x100000000 + i * 16:x})" for i in range(count)]
+    lines += ["\tProperties:"]
+    lines += [f"\t\t@property (nonatomic, copy) NSString* property{i};" for i in range(count // 2)]
+    lines += [f"\t\t@property (readonly) long dynamicProperty{i};  (@dynamic dynamicProperty{i};)" for i in range(count // 2)]
+    lines += ["\tInstance Methods:"]
+    lines += [f"\t\t- (void) instanceMethod{i}:(id)arg1; (0x{0x200000000 + i * 16:x})" for i in range(count)]
+    lines += ["(NSObject ...)"]
+    return '\n'.join(lines)
+
+
+def ivar_description(count: int) -> str:
+    lines = ["in SyntheticView:"]
+    for i in range(count):
+        if i % 10 == 0:
+            lines += [f"\t_frame{i} (struct CGRect): {{", "\t\torigin = {0, 0}", "\t\tsize = {320, 480}", "\t}"]
+        else:
+            lines += [f"\t_name{i} (NSString*): @\"value {i}\""]
+    return '\n'.join(lines)
+
+
+def class_records(count: int) -> tuple[dict[str, Any], dict[str, Any], bytes]:
+    """Returns the metadata and the object descriptions returned by `objc/class_info.m`, and the object memory."""
+    ivars = ''
+    summaries = ''
+    body = bytearray(8 + count * 32)
+    offset = 8
+    for i in range(count):
+        if i % 10 == 0:
+            ivars += f'_frame{i}\t{{CGRect={{CGPoint=dd}}{{CGSize=dd}}}}\t{offset}\n'
+            body[offset:offset + 32] = struct.pack('<4d', 0, 0, 320, 480)
+            offset += 32
+        else:
+            ivars += f'_name{i}\t@"NSString"\t{offset}\n'
+            struct.pack_into('<Q', body, offset, 0x600000100000 + i * 16)
+            summaries += f'_name{i}\t@"value {i}"\n'
+            offset += 8
+    properties = ''.join(f'property{i}\tT@"NSString",C,N,V_property{i}\n' for i in range(count // 2))
+    properties += ''.join(f'dynamicProperty{i}\tTq,R,D\n' for i in range(count // 2))
+    metadata = {
+        'classMethods': ''.join(f'classMethod{i}:with:\t@32@0:8@16q24\t{0x100000000 + i * 16:x}\n' for i in range(count)),
+        'instanceMethods': ''.join(f'instanceMethod{i}:\tv24@0:8@16\t{0x200000000 + i * 16:x}\n' for i in range(count)),
+        'properties': properties,
+        'ivars': ivars
+    }
+    values = {
+        'summaries': summaries
+    }
+    return (metadata, values, bytes(body[:offset]))
+
+
+def image_records(count: int) -> str:
+    """Returns the records of an image as returned by `objc/class_index.m`, with `count` classes."""
+    lines = []
+    for i in range(count):
+        name = f'UISynthetic{i}Controller' if i % 2 == 0 else f'_UISyntheticView{i}'
+        lines.append(f'C\t{name}')
+        lines.append(f'+\t{name}\tsharedInstance{i}')
+        lines += [f'-\t{name}\tsyntheticMethod{j}:with{i}:' for j in range(8)]
+        if i % 100 == 0:
+            lines.append(f'-\t{name}\tdidReceiveMemoryWarning')
+        lines += [f'p\t{name}\tsyntheticProperty{j}' for j in range(3)]
+    return '\n'.join(lines) + '\n'
+
+
+def hierarchy_nodes(fanouts: tuple[int, ...]) -> list[tuple[int, int, str, str, int]]:
+    """
+    Returns a window hierarchy in depth-first order, as (parent, depth, kind, class name, number of children) of each node.
+    The window has a view controller, and the node at depth `d` has `fanouts[d]` children.
+    """
+    nodes: list[tuple[int, int, str, str, int]] = []
+    stack = [(-1, 0)]
+    while stack:
+        parent, depth = stack.pop()
+        kind = 'w' if depth == 0 else 'c' if depth == 1 else 'v'
+        name = 'UIWindow' if depth == 0 else 'SyntheticViewController' if depth == 1 else f'SyntheticCell{len(nodes) % 7}'
+        count = fanouts[depth] if depth < len(fanouts) else 0
+        index = len(nodes)
+        nodes.append((parent, depth, kind, name, count))
+        stack += [(index, depth + 1)] * count
+    return nodes
+
+
+def hierarchy_table(
+    nodes: list[tuple[int, int, str, str, int]],
+    depth: Optional[int],
+    detail: bool,
+    root: int = 0,
+    first_index: int = 0
+) -> list[str]:
+    """
+    Returns the rows of the nodes under `root` down to `depth`, as returned by `hierarchyRows` in `swift/tree.swift`.
+    Nodes are numbered from `first_index`.
+    """
+    lines: list[str] = []
+    indexes: dict[int, int] = {}
+    root_depth = nodes[root][1]
+    for i in range(root, len(nodes)):
+        parent, level, kind, name, count = nodes[i]
+        if i > root and level <= root_depth:
+            break
+        if depth is not None and level - root_depth > depth:
+            continue
+        indexes[i] = first_index + len(lines)
+        address = hierarchy_address(i)
+        line = (f'{indexes.get(parent, -1) if i > root else -1}\t{kind}\t{name}\t0.0\t{float(i % 50)}\t320.0\t44.0'
+                f'\t{address:x}\t{1 if i % 97 == 0 else 0}\t{count}')
+        if detail:
+            line += f'\t<{name}: 0x{address:x}; frame = (0 {i % 50}; 320 44); layer = <CALayer: 0x{address + 0x80:x}>>'
+        lines.append(line)
+    return lines
+
+
+def changed_hierarchy_table(lines: list[str]) -> list[str]:
+    """
+    Returns the rows of a full table of `hierarchy_nodes` after the hierarchy changed:
+    the subtree of node 4 is removed, node 500 is moved under node 2, node 970 is shown,
+    every 100th node is resized, every 150th node is moved down, and a view with a subview
+    and another view are added under the view controller.
+    """
+    rows: list[str] = []
+    # index in `lines` -> index in `rows`
+    indexes: dict[int, int] = {}
+    for i, line in enumerate(lines):
+        fields = line.split('\t')
+        parent = int(fields[0])
+        if i == 4 or (parent >= 0 and parent not in indexes):
+            continue
+        fields[0] = str(indexes[2] if i == 500 else indexes.get(parent, -1))
+        if i % 150 == 75:
+            fields[4] = str(float(fields[4]) + 10)
+        if i % 100 == 50:
+            fields[5] = '300.0'
+        if i == 970:
+            fields[8] = '0'
+        indexes[i] = len(rows)
+        rows.append('\t'.join(fields))
+    banner = len(rows)
+    for k, parent in enumerate([indexes[1], banner, indexes[1]]):
+        rows.append(f'{parent}\tv\tSyntheticBanner\t0.0\t0.0\t320.0\t60.0\t{0x7f9000000000 + k * 0x100:x}\t0\t{1 if k == 0 else 0}')
+    return rows
+
+
+def layered_hierarchy_table(lines: list[str]) -> list[str]:
+    """Returns the rows of a table of `hierarchy_nodes` with two sublayers under each view without subviews."""
+    rows: list[str] = []
+    # index in `lines` -> index in `rows`
+    indexes: dict[int, int] = {}
+    for i, line in enumerate(lines):
+        fields = line.split('\t')
+        parent = int(fields[0])
+        fields[0] = str(indexes.get(parent, -1))
+        leaf = fields[1] == 'v' and fields[9] == '0'
+        if leaf:
+            fields[9] = '2'
+        indexes[i] = len(rows)
+        rows.append('\t'.join(fields))
+        if leaf:
+            address = int(fields[7], 16)
+            rows += [f'{indexes[i]}\tl\tCALayer\t0.0\t0.0\t320.0\t1.0\t{address + 0x10 + k * 0x20:x}\t0\t0' for k in range(2)]
+    return rows
+
+
+def hierarchy_address(index: int) -> int:
+    """Returns the address of a node of `hierarchy_nodes`."""
+    return 0x7f8000000000 + index * 0x100
+
+
+INHERITS = ['NSObject', 'UIResponder', 'UIView', 'UIControl'] + [f'SyntheticView{i}' for i in range(16)]
+IMAGE = '/tmp/Synthetic.app/Synthetic'
+# window, view controller, then 6000 views
+HIERARCHY_FANOUTS = (1, 5, 10, 10, 12)
+# changes of `changed_hierarchy_table`
+DIFF_SUMMARY = "'before' (6557 nodes) -> 'after' (6547 nodes): 2 added, 1 removed, 45 moved, 66 resized, 1 hidden or shown"
+
+
+class Harness:
+    """
+    A debugger with a fake process answering iLLDB's expressions with synthetic payloads.
+    """
+
+    def __init__(self) -> None:
+        self.debugger = lldb.SBDebugger()
+        self.process: lldb.SBProcess = self.debugger.GetSelectedTarget().GetProcess()
+        self.shell_commands: list[str] = []
+        self.expression_count = 0
+        self.invalidations = 0
+        # 1 while the synthetic hierarchy is changed (see `changed_hierarchy_table`)
+        self.hierarchy_version = 0
+
+        methods = method_description(SIZE)
+        ivars = ivar_description(SIZE)
+        metadata, values, body = class_records(SIZE)
+        defaults = {f'key{i}': (i if i % 3 == 0 else f'value {i}' if i % 3 == 1 else {'nested': [i, str(i)]}) for i in range(SIZE)}
+        cookies = [
+            {'name': f'cookie{i}', 'value': 'v' * 64, 'domain': 'example.com', 'path': '/',
+             'secure': True, 'expires': '(null)'}
+            for i in range(SIZE // 2)
+        ]
+        text = '\n'.join(f'line {i}: ' + 'x' * 100 for i in range(SIZE * 2))
+
+        p = self.process
+        self.add_image(SIZE)
+        p.variables['view'] = lldb.SBValue(value='0x600000001000')
+        self.place_object(0x600000001000, INHERITS, body)
+        hierarchy = hierarchy_nodes(HIERARCHY_FANOUTS)
+        p.respond(r'hierarchyTable', self.hierarchy_responder(hierarchy))
+        p.respond(r'hierarchySubtrees', self.hierarchy_subtrees_responder(hierarchy))
+        p.respond(r'hierarchyFind\(', self.hierarchy_find_responder(hierarchy))
+        p.respond(r'hierarchyDigest\(', self.hierarchy_digest_responder(hierarchy))
+        p.respond(r'objc_copyClassList', self.class_index_responder(image_records(SIZE * 4)))
+        p.respond(r'knownClasses', self.class_ancestors_responder(metadata))
+        p.respond(r'class_copyMethodList', self.class_info_responder(metadata, values))
+        p.respond(r'__methodDescriptionForClass:', self.payload({'inherits': INHERITS, 'description': methods}))
+        p.respond(r'__ivarDescriptionForClass:', self.payload({'inherits': INHERITS, 'description': ivars}))
+        # A nested Swift class, as named by the Objective-C runtime
+        p.respond(r'\(swiftView\)', lambda s: p.object_result({'inherits': INHERITS[:3] + ['_TtCC9Synthetic9Container9SwiftView']}))
+        p.respond(r'class_getSuperclass', lambda s: p.object_result({'inherits': INHERITS}))
+        p.respond(r'objectForKey:__illdb_arg_string\(1\)', lambda s: p.object_result({'value': 'value'}))
+        p.respond(r'dictionaryRepresentation\];\s*\n\s*NSData', self.payload(defaults))
+        p.respond(r'deleteCookie:', lambda s: p.object_result(len(cookies)))
+        p.respond(r'NSHTTPCookieStorage', self.payload(cookies))
+        p.respond(r'fileExistsAtPath', self.payload({'text': text}))
+        p.respond(r'appInfo\(\)', lambda s: p.object_result('[App Info]\nApp Name:          Synthetic'))
+        p.respond(r'Bundle.main.bundlePath', lldb.SBValue(summary='"/tmp/Synthetic.app"', description='/tmp/Synthetic.app'))
+
+        # Class indexes are saved under a directory removed at exit
+        self.cache_directory = tempfile.TemporaryDirectory(prefix='illdb-bench-')
+        os.environ['ILLDB_CACHE_DIR'] = self.cache_directory.name
+        self.add_static_image(SIZE * 4)
+
+        iLLDB.load_commands(self.debugger)
+
+    def payload(self, value: Any) -> Callable[[str], lldb.SBValue]:
+        """
+        Returns a responder transferring `value` like `util.exp_object` expects.
+        The value is serialized once so that only iLLDB's work is measured.
+        """
+        data = plistlib.dumps(value, fmt=plistlib.FMT_BINARY)
+        return lambda script: self.process.buffer_result(data)
+
+    def add_image(self, count: int) -> None:
+        """Adds the image defining the synthetic class, with symbols and source lines for its methods."""
+        module = lldb.SBModule(IMAGE, '0A1B2C3D-0000-4000-8000-000000000010', base=0x100000000, size=0x1000000)
+        module.sections.append(lldb.SBSection('__TEXT_EXEC', module, 0x200000000, 0x1000000))
+        class_name = INHERITS[-1]
+        for i in range(count):
+            module.add_function(0x100000000 + i * 16, f'+[{class_name} classMethod{i}:with:]', '/tmp/Synthetic/SyntheticView.m', i + 1)
+            module.add_function(0x200000000 + i * 16, f'-[{class_name} instanceMethod{i}:]', '/tmp/Synthetic/SyntheticView.m', count + i + 1)
+        module.add_function(0x200100000, '-[UIView(Synthetic) syntheticCategoryMethod]', '/tmp/Synthetic/UIView+Synthetic.m', 1)
+        self.debugger.GetSelectedTarget().modules.append(module)
+
+    def add_static_image(self, count: int) -> None:
+        """Writes a Mach-O image with `count` classes and adds it as a module of the target."""
+        path = os.path.join(self.cache_directory.name, 'images', 'Static.framework', 'Static')
+        uuid = '0A1B2C3D-0000-4000-8000-000000000020'
+        self.static_declarations = synthetic_macho.write_image(path, uuid, count)
+        self.debugger.GetSelectedTarget().modules.append(lldb.SBModule(path, uuid))
+
+    def forget_static_classes(self, remove_files: bool = False) -> None:
+        """Drops the static class lists in memory (and on disk), as in a new debug session."""
+        objc_static.static_class_list.clear()
+        if remove_files:
+            objc_static.static_class_list.remove_saved(self.debugger)
+
+    def place_object(self, address: int, inherits: list[str], body: bytes = bytes(8)) -> None:
+        """
+        Places an object and its classes in memory, laid out like the Objective-C runtime
+        (realized classes with class_rw_t, class_ro_t and names) inside UIKitCore.
+        The first 8 bytes of `body` are replaced by the isa.
+        """
+        base = 0x180000000
+        superclass = 0
+        for i, name in enumerate(inherits):
+            cls = base + i * 0x100
+            rw = cls + 0x40
+            ro = cls + 0x60
+            name_address = cls + 0x90
+            data = bytearray(0x100)
+            # isa, superclass, cache, bits (with flag bits)
+            struct.pack_into('<QQQQQ', data, 0, 0, superclass, 0, 0, rw | 0x3)
+            # class_rw_t: flags (RW_REALIZED), witness, index, ro_or_rw_ext
+            struct.pack_into('<IHHQ', data, 0x40, 1 << 31, 0, 0, ro)
+            # class_ro_t: flags, instanceStart, instanceSize, reserved, ivarLayout, name
+            struct.pack_into('<IIIIQQ', data, 0x60, 0, 8, 8, 0, 0, name_address)
+            encoded = name.encode('utf-8')[:0x60]
+            data[0x90:0x90 + len(encoded)] = encoded
+            self.process.place(bytes(data), cls)
+            superclass = cls
+        # non-pointer isa (extra bits outside the class mask)
+        self.process.place(struct.pack('<Q', superclass | 0x0100000000000001) + body[8:], address)
+
+    def class_info_responder(self, metadata: dict[str, Any], values: dict[str, Any]) -> Callable[[str], lldb.SBValue]:
+        """
+        Returns a responder for `objc/class_info.m`, which omits the metadata
+        when the caller passes the class and image it already has.
+        """
+        payloads: dict[tuple[str, bool, bool], Callable[[str], lldb.SBValue]] = {}
+
+        def respond(script: str) -> lldb.SBValue:
+            _, class_name, describes_objects, known_class, known_image = self.process.arguments()
+            name = class_name if isinstance(class_name, str) else INHERITS[-1]
+            reads_metadata = (known_class, known_image) != (name, IMAGE)
+            key = (name, reads_metadata, bool(describes_objects))
+            if key not in payloads:
+                records: dict[str, Any] = {'inherits': INHERITS, 'name': name, 'image': IMAGE}
+                if reads_metadata:
+                    records.update(metadata)
+                if describes_objects:
+                    records.update(values)
+                payloads[key] = self.payload(records)
+            return payloads[key](script)
+        return respond
+
+    def class_ancestors_responder(self, metadata: dict[str, Any]) -> Callable[[str], lldb.SBValue]:
+        """
+        Returns a responder for `objc/class_ancestors.m`, which omits the metadata of the classes the caller has.
+        Every superclass overrides the methods `sharedMethod0` to `sharedMethod49`, and UIView has a category
+        method implemented in the synthetic image.
+        """
+        uikit = '/System/Library/PrivateFrameworks/UIKitCore.framework/UIKitCore'
+        classes: list[dict[str, Any]] = []
+        for i, name in enumerate(INHERITS):
+            if name == INHERITS[-1]:
+                classes.insert(0, {'name': name, 'image': IMAGE, **metadata})
+                continue
+            base = 0x181000000 + i * 0x10000
+            instance_methods = ''.join(f'sharedMethod{j}\tv16@0:8\t{base + j * 16:x}\n' for j in range(50))
+            instance_methods += ''.join(f'{name}Method{j}\tv16@0:8\t{base + 0x1000 + j * 16:x}\n' for j in range(100))
+            if name == 'UIView':
+                instance_methods += f'syntheticCategoryMethod\tv16@0:8\t{0x200100000:x}\n'
+            classes.insert(0, {
+                'name': name,
+                'image': '/usr/lib/libobjc.A.dylib' if name == 'NSObject' else uikit,
+                'classMethods': f'new{name}\t@16@0:8\t{base + 0x8000:x}\n',
+                'instanceMethods': instance_methods,
+                'properties': '',
+                'ivars': ''
+            })
+
+        payloads: dict[frozenset[str], Callable[[str], lldb.SBValue]] = {}
+
+        def respond(script: str) -> lldb.SBValue:
+            known = frozenset(str(self.process.arguments()[2] or '').split('\n'))
+            if known not in payloads:
+                payloads[known] = self.payload({
+                    'inherits': INHERITS,
+                    'classes': [
+                        {'name': c['name'], 'image': c['image']} if f"{c['name']}\t{c['image']}" in known else c
+                        for c in classes
+                    ]
+                })
+            return payloads[known](script)
+        return respond
+
+    def hierarchy_responder(self, nodes: list[tuple[int, int, str, str, int]]) -> Callable[[str], lldb.SBValue]:
+        """Returns a responder for `hierarchyTable`, answering the depth, detail and layers arguments."""
+        tables: dict[tuple[Optional[int], bool, bool, int], bytes] = {}
+
+        def respond(script: str) -> lldb.SBValue:
+            arguments = self.process.arguments()
+            if 'let __illdb_result' not in script or len(arguments) < 2:
+                # Installation of the helper
+                return lldb.SBValue()
+            depth = arguments[0] if isinstance(arguments[0], int) else None
+            detail = arguments[1] == 1
+            layers = len(arguments) > 3 and arguments[3] == 1
+            key = (depth, detail, layers, self.hierarchy_version)
+            if key not in tables:
+                lines = hierarchy_table(nodes, depth, detail)
+                if self.hierarchy_version == 1:
+                    lines = changed_hierarchy_table(lines)
+                if layers:
+                    lines = layered_hierarchy_table(lines)
+                tables[key] = ('\n'.join(lines) + '\n').encode()
+            return self.process.buffer_result(tables[key])
+        return respond
+
+    def hierarchy_digest_responder(self, nodes: list[tuple[int, int, str, str, int]]) -> Callable[[str], lldb.SBValue]:
+        """Returns a responder for `hierarchyDigest`, whose hash only depends on `hierarchy_version`."""
+        def respond(script: str) -> lldb.SBValue:
+            if 'let __illdb_result' not in script:
+                return lldb.SBValue()
+            count = len(nodes) if self.hierarchy_version == 0 else len(nodes) - 10
+            return self.process.buffer_result(f'{0x5eed0000 + self.hierarchy_version:x}\t{count}\n'.encode())
+        return respond
+
+    def hierarchy_subtrees_responder(self, nodes: list[tuple[int, int, str, str, int]]) -> Callable[[str], lldb.SBValue]:
+        """Returns a responder for `hierarchySubtrees`, answering the roots and detail arguments."""
+        def respond(script: str) -> lldb.SBValue:
+            arguments = self.process.arguments()
+            lines: list[str] = []
+            for root in str(arguments[0]).split(' '):
+                address, _, depth = root.partition(':')
+                index = (int(address, 16) - hierarchy_address(0)) // 0x100
+                if 0 <= index < len(nodes):
+                    lines += hierarchy_table(nodes, int(depth) if depth else None, arguments[1] == 1, index, len(lines))
+            return self.process.buffer_result(('\n'.join(lines) + '\n').encode())
+        return respond
+
+    def hierarchy_find_responder(self, nodes: list[tuple[int, int, str, str, int]]) -> Callable[[str], lldb.SBValue]:
+        """
+        Returns a responder for `hierarchyFind`, matching the class name and the accessibility identifier.
+        Every tenth view has the identifier `cell-<index>`.
+        """
+        def respond(script: str) -> lldb.SBValue:
+            arguments = self.process.arguments()
+            if 'let __illdb_result' not in script or len(arguments) < 8:
+                return lldb.SBValue()
+            limit, _, _, class_name, identifier = arguments[:5]
+            lines: list[str] = []
+            visited = 0
+            limited = False
+            for i, (parent, _, kind, name, _) in enumerate(nodes):
+                visited += 1
+                node_identifier = f'cell-{i}' if kind == 'v' and i % 10 == 0 else ''
+                if (class_name is not None and name != class_name) or (identifier is not None and node_identifier != identifier):
+                    continue
+                if isinstance(limit, int) and 0 < limit <= len(lines):
+                    limited = True
+                    break
+                path = []
+                current = i
+                while current >= 0:
+                    path.append(nodes[current][3])
+                    current = nodes[current][0]
+                lines.append(f'{kind}\t{name}\t0.0\t{float(i % 50)}\t320.0\t44.0\t{hierarchy_address(i):x}'
+                             f'\t{node_identifier}\t\t{" > ".join(reversed(path))}')
+            lines.append(f'#\t{visited}\t{1 if limited else 0}')
+            return self.process.buffer_result(('\n'.join(lines) + '\n').encode())
+        return respond
+
+    def class_index_responder(self, records: str) -> Callable[[str], lldb.SBValue]:
+        """
+        Returns a responder for `objc/class_index.m`, giving `records` to UIKitCore.
+        Like dyld, it only knows images by their path in the process.
+        """
+        def respond(script: str) -> lldb.SBValue:
+            wanted = str(self.process.arguments()[0]).split('\n')
+            loaded = {module.platform_path or module.path for module in self.debugger.GetSelectedTarget().modules}
+            return self.process.object_result({
+                path: records if path.endswith('/UIKitCore') else ''
+                for path in wanted if path in loaded
+            })
+        return respond
+
+    def forget_class_index(self, remove_files: bool = False) -> None:
+        """Drops the class index in memory (and on disk), as in a new debug session."""
+        objc_index.class_index.clear()
+        if remove_files:
+            objc_index.class_index.remove_saved(self.debugger)
+
+    def load_module(self) -> None:
+        """Simulates resuming while the process loads an image, which invalidates cached class metadata."""
+        self.resume()
+        self.debugger.GetSelectedTarget().load_module('/tmp/Plugin.framework/Plugin')
+
+    def unload_module(self) -> None:
+        """
+        Reads the metadata of the synthetic view, then simulates resuming while the process unloads an image
+        that defines none of its classes but may have extended them with categories.
+        """
+        self.resume()
+        self.command('objc', 'methods view')()
+        self.resume()
+        self.invalidations = objc_cache.class_metadata_cache.invalidations
+        self.debugger.GetSelectedTarget().unload_module('/tmp/Plugin.framework/Plugin')
+
+    def metadata_invalidated(self) -> bool:
+        """Returns whether cached class metadata was dropped once since `unload_module`."""
+        invalidations: int = objc_cache.class_metadata_cache.invalidations
+        return invalidations == self.invalidations + 1
+
+    def start_trace(self, sample: int = 1) -> None:
+        """Removes trace breakpoints, then traces the methods of the synthetic view."""
+        objc_trace.method_tracer.stop(self.debugger)
+        self.command('objc', f'trace view --sample {sample}')()
+
+    def relaunch_traced(self) -> None:
+        """Traces the methods of the synthetic view, then simulates relaunching the process, which keeps the breakpoints."""
+        self.start_trace()
+        self.process.unique_id += 1
+        self.resume()
+
+    def breakpoint_count(self) -> int:
+        """Returns the number of breakpoints of the target."""
+        return self.debugger.GetSelectedTarget().GetNumBreakpoints()
+
+    def call_methods(self, count: int) -> int:
+        """Simulates `count` calls spread over 100 traced instance methods. Returns the number of stops."""
+        target = self.debugger.GetSelectedTarget()
+        stops = 0
+        for i in range(count):
+            stops += target.hit(0x200000000 + (i % 100) * 16)
+        return stops
+
+    def trace_calls(self) -> None:
+        """Traces the methods of the synthetic view and simulates 100000 calls."""
+        self.start_trace()
+        self.call_methods(100000)
+
+    def fetch_hierarchy(self, arguments: str = '', expand: Optional[str] = None, clear: bool = False) -> None:
+        """Resumes, then fetches the key window hierarchy (and expands a node, or drops it with `illdb cache --clear`)."""
+        self.resume()
+        self.command('ui', f'tree {arguments}')()
+        if expand is not None:
+            self.command('ui', f'tree --expand {expand}')()
+        if clear:
+            self.command('illdb', 'cache --clear')()
+        self.expression_count = len(self.process.expressions)
+
+    def snapshot_hierarchy(self, *names: str, changed: bool = False, resume: bool = True) -> None:
+        """
+        Saves a snapshot `before` of the key window hierarchy, resumes and saves the other snapshots.
+        Without `resume`, the hierarchy changes at the same stop, as with `expr`.
+        """
+        ui_hierarchy.hierarchy_snapshots.clear()
+        self.resume()
+        self.command('ui', 'snapshot before')()
+        if resume:
+            self.resume()
+        self.hierarchy_version = 1 if changed else 0
+        for name in names:
+            self.command('ui', f'snapshot {name}')()
+        self.expression_count = len(self.process.expressions)
+
+    def hierarchy_cached(self) -> bool:
+        """Returns whether no expression was evaluated since `fetch_hierarchy`."""
+        return len(self.process.expressions) == self.expression_count
+
+    def evaluated(self, count: int) -> bool:
+        """Returns whether `count` expressions were evaluated since `fetch_hierarchy`."""
+        return len(self.process.expressions) == self.expression_count + count
+
+    def command(self, name: str, arguments: str) -> Callable[[], lldb.SBCommandReturnObject]:
+        """
+        Returns an operation running a command through its lazy stub.
+
+        Args:
+            name (str): The command name.
+            arguments (str): The command arguments.
+        """
+        stub = getattr(iLLDB, f'Lazy_{name}')(self.debugger, {})
+
+        def run() -> lldb.SBCommandReturnObject:
+            result = lldb.SBCommandReturnObject()
+            with redirect_stdout(io.StringIO()), self.patched():
+                stub(self.debugger, arguments, lldb.SBExecutionContext(), result)
+            return result
+        return run
+
+    def resume(self) -> None:
+        """Simulates resuming and stopping again, which invalidates cached results and restores the synthetic hierarchy."""
+        self.process.stop_id += 1
+        self.hierarchy_version = 0
+
+    @contextmanager
+    def patched(self) -> Iterator[None]:
+        """Answers confirmations and records shell commands instead of running them."""
+        original_input = builtins.input
+        original_run = subprocess.run
+        builtins.input = lambda prompt='': 'Yes'
+        subprocess.run = lambda args, **kwargs: self.shell_commands.append(args)  # type: ignore[assignment]
+        try:
+            yield
+        finally:
+            builtins.input = original_input
+            subprocess.run = original_run
+
+
+def scenarios(harness: Harness) -> list[Scenario]:
+    def ok(result: lldb.SBCommandReturnObject, *texts: str) -> bool:
+        output = '\n'.join(map(str, result.messages))
+        return result.Succeeded() and all(text in output for text in texts)
+
+    def command(name: str, arguments: str, *texts: str) -> Scenario:
+        return Scenario(
+            f'{name} {arguments}',
+            harness.command(name, arguments),
+            lambda result: ok(result, *texts),
+            setup=harness.resume
+        )
+
+    last = SIZE - 1
+    methods = method_description(SIZE)
+    # like NSObject with the categories of every framework
+    large_methods = method_description(SIZE * 4)
+    parsed_methods = objc.ClassInfoParser.parse(methods).class_methods
+    ivars = ivar_description(SIZE)
+    summaries = [lldb.SBValue(summary=f'@"string value {i}"') for i in range(SIZE)]
+    static_count = sum(harness.static_declarations.values())
+    export_path = os.path.join(harness.cache_directory.name, 'hierarchy')
+
+    def exported_json(path: str) -> int:
+        with open(path, encoding='utf-8') as file:
+            stack = json.load(file)
+        count = 0
+        while stack:
+            count += 1
+            stack += stack.pop()['children']
+        return count
+
+    def exported_dot(path: str) -> tuple[int, int]:
+        with open(path, encoding='utf-8') as file:
+            lines = file.read().split('\n')
+        return (sum('[label=' in line for line in lines), sum(' -> ' in line for line in lines))
+
+    return [
+        command('objc', 'inherits view', 'NSObject -> UIResponder -> UIView -> UIControl -> SyntheticView0'),
+        command('objc', 'inherits view --resolver expression', 'NSObject -> UIResponder -> UIView'),
+        command('objc', 'inherits view --resolver memory', 'SyntheticView14 -> SyntheticView15'),
+        command('objc', 'inherits swiftView --resolver expression', 'UIView -> Synthetic.Container.SwiftView'),
+        command('objc', 'methods view', f'classMethod{last}:', f'instanceMethod{last}:'),
+        command('objc', 'methods view --class UIView -i', f'instanceMethod{last}:'),
+        command('objc', 'methods view --resolve',
+                f'Synthetic`+[SyntheticView15 classMethod{last}:with:] at SyntheticView.m:{SIZE}',
+                f'Synthetic`-[SyntheticView15 instanceMethod{last}:] at SyntheticView.m:{SIZE * 2}'),
+        command('objc', 'methods view --all-ancestors',
+                'sharedMethod0;  [overrides SyntheticView13]', f'instanceMethod{last}:', 'UIViewMethod99',
+                'syntheticCategoryMethod;  [category (Synthetic)]'),
+        command('objc', 'methods view --all-ancestors --resolve -i',
+                'syntheticCategoryMethod;  Synthetic`-[UIView(Synthetic) syntheticCategoryMethod] at UIView+Synthetic.m:1  '
+                '[category Synthetic (Synthetic)]'),
+        command('objc', 'properties view', f'property{SIZE // 2 - 1};', f'dynamicProperty{SIZE // 2 - 1};'),
+        command('objc', 'ivars view', f'_name{last} = (NSString*) 0x{0x600000100000 + last * 16:x}',
+                '_frame0 = (struct CGRect) {{0, 0}, {320, 480}}'),
+        command('objc', 'ivars view --describe', f'_name{last} = (NSString*) @"value {last}"', '_frame0 = (struct CGRect) {{0, 0}, {320, 480}}'),
+        Scenario('objc methods view (after dlopen)', harness.command('objc', 'methods view'),
+                 lambda result: ok(result, f'classMethod{last}:'),
+                 setup=harness.load_module),
+        Scenario('objc methods view (after dlclose)', harness.command('objc', 'methods view'),
+                 lambda result: ok(result, f'classMethod{last}:') and harness.metadata_invalidated(),
+                 setup=harness.unload_module),
+        command('objc', 'search didReceiveMemoryWarning', '-[UISynthetic0Controller didReceiveMemoryWarning] (UIKitCore)'),
+        command('objc', 'search --prefix _UISyntheticView --type class --limit 10', '(showing 10)'),
+        command('objc', 'search -i SYNTHETICPROPERTY2$ --type property', '@property UISynthetic0Controller.syntheticProperty2'),
+        Scenario('objc search (saved index)', harness.command('objc', 'search didReceiveMemoryWarning'),
+                 lambda result: ok(result, f'{SIZE * 4 // 100} matches'),
+                 setup=harness.forget_class_index),
+        Scenario('objc search (scan)', harness.command('objc', 'search didReceiveMemoryWarning'),
+                 lambda result: ok(result, f'{SIZE * 4 // 100} matches'),
+                 setup=lambda: harness.forget_class_index(remove_files=True)),
+        command('objc', 'classes --static --image Static.framework --limit 0',
+                f'{static_count} declarations in 1 images', f'@interface SyntheticStaticClass{SIZE * 4 - 2}',
+                '@interface Static.SwiftClass9', '@interface UIView (Static0)', '@interface SyntheticStaticClass1 (Static1)',
+                '@protocol SyntheticStaticProtocol0', 'struct Static.Type3.Type4', 'protocol Static.SyntheticProtocol'),
+        command('objc', 'classes SwiftClass --static --type class', f'{SIZE * 4 // 10} declarations', '(showing 100)'),
+        Scenario('objc classes --static (saved)', harness.command('objc', 'classes --static --image Static.framework'),
+                 lambda result: ok(result, f'{static_count} declarations'),
+                 setup=harness.forget_static_classes),
+        Scenario('objc classes --static (parse)', harness.command('objc', 'classes --static --image Static.framework'),
+                 lambda result: ok(result, f'{static_count} declarations'),
+                 setup=lambda: harness.forget_static_classes(remove_files=True)),
+        command('objc', 'classes ^_UISyntheticView --limit 10', f'{SIZE * 2} declarations', '(showing 10)'),
+        command('objc', 'cache --list', 'hits:', 'SyntheticView15 (/tmp/Synthetic.app/Synthetic)'),
+        command('objc', 'methods unresolved', f'classMethod{last}:', f'instanceMethod{last}:'),
+        command('objc', 'ivars unresolved', f'_name{last} = (NSString*)'),
+        Scenario('objc trace view', harness.command('objc', 'trace view'),
+                 lambda result: ok(result, f'Tracing {SIZE * 2} implementations'),
+                 setup=lambda: objc_trace.method_tracer.stop(harness.debugger)),
+        Scenario('objc trace view (after relaunch)', harness.command('objc', 'trace view'),
+                 lambda result: ok(result, f'Tracing {SIZE * 2} implementations') and harness.breakpoint_count() == SIZE * 2,
+                 setup=harness.relaunch_traced),
+        Scenario('objc trace callback (100000 calls)', lambda: harness.call_methods(100000),
+                 lambda stops: stops == 0 and objc_trace.method_tracer.session is not None,
+                 setup=harness.start_trace),
+        Scenario('objc trace callback --sample 10 (100000 calls)', lambda: harness.call_methods(100000),
+                 lambda stops: stops == 0,
+                 setup=lambda: harness.start_trace(10)),
+        Scenario('objc trace --stop', harness.command('objc', 'trace --stop --limit 5'),
+                 lambda result: ok(result, '100000 calls of', '1000 ', f'-[{INHERITS[-1]} instanceMethod0:]'),
+                 setup=harness.trace_calls),
+        command('ud', 'read key', '"value"'),
+        command('ud', 'read-all', f'key{last}'),
+        command('ud', 'write key value'),
+        Scenario('ud write key 1.5 --type number', harness.command('ud', 'write key 1.5 --type number'),
+                 lambda result: result.Succeeded() and harness.process.arguments()[2] == 0x3FF8000000000000,
+                 setup=harness.resume),
+        Scenario('ud write key 0x10 --type number', harness.command('ud', 'write key 0x10 --type number'),
+                 lambda result: result.Succeeded() and harness.process.arguments()[2] == 16,
+                 setup=harness.resume),
+        Scenario('ud write key YES --type number', harness.command('ud', 'write key YES --type number'),
+                 lambda result: result.Succeeded() and harness.process.arguments()[2] == 1,
+                 setup=harness.resume),
+        Scenario('ud write key abc --type number', harness.command('ud', 'write key abc --type number'),
+                 lambda result: not result.Succeeded(),
+                 setup=harness.resume),
+        command('ud', 'delete key'),
+        command('ud', 'delete-all'),
+        command('cookie', 'read --domain example.com', f'cookie{SIZE // 2 - 1}'),
+        command('cookie', 'delete --domain example.com', f'{SIZE // 2} Cookies was deleted'),
+        command('file', 'tree --bundle --depth 3'),
+        command('file', 'tree --path /tmp'),
+        command('file', 'open --bundle'),
+        command('file', 'cat /tmp/file.txt', f'line {SIZE * 2 - 1}'),
+        command('ui', 'tree', '└─UIWindow (0.0, 0.0, 320.0, 44.0)\n   └─SyntheticViewController', '            └─SyntheticCell'),
+        command('ui', 'tree -d', '<SyntheticViewController: 0x7f8000000100; frame = (0 1; 320 44)'),
+        command('ui', 'tree --view 0x12345678 --depth 3 --with-address', ': 0x00007f8000000200'),
+        Scenario('ui tree -s --depth 3 --with-address (fetched)', harness.command('ui', 'tree -s --depth 3 --with-address'),
+                 lambda result: ok(result, '   └─SyntheticViewController: 0x00007f8000000100') and harness.hierarchy_cached(),
+                 setup=harness.fetch_hierarchy),
+        Scenario('ui tree -s (after illdb cache --clear)', harness.command('ui', 'tree -s'),
+                 lambda result: ok(result, '└─SyntheticViewController') and len(harness.process.expressions) == harness.expression_count + 1,
+                 setup=lambda: harness.fetch_hierarchy(clear=True)),
+        command('ui', 'find --class SyntheticCell3', '100 matches in', '(stopped at 100)'),
+        command('ui', 'find --id cell-4000 --visible --onscreen',
+                "1 matches in 6557 objects\n    SyntheticCell3 (0.0, 0.0, 320.0, 44.0): 0x00007f80000fa000 id='cell-4000'\n"
+                "        UIWindow > SyntheticViewController > SyntheticCell"),
+        Scenario('ui tree --export hierarchy.json --layers -d (18557 nodes)',
+                 harness.command('ui', f'tree --export {export_path}.json --layers -d'),
+                 lambda result: ok(result, 'Exported 18557 nodes') and exported_json(f'{export_path}.json') == 18557,
+                 setup=harness.resume),
+        Scenario('ui tree --export hierarchy.dot', harness.command('ui', f'tree --export {export_path}.dot'),
+                 lambda result: ok(result, 'Exported 6557 nodes') and exported_dot(f'{export_path}.dot') == (6557, 6556),
+                 setup=harness.resume),
+        command('ui', 'snapshot before', "Saved snapshot 'before' (6557 nodes)"),
+        Scenario('ui snapshot (unchanged)', harness.command('ui', 'snapshot after'),
+                 lambda result: ok(result, "Saved snapshot 'after' (6557 nodes, unchanged since 'before')") and harness.evaluated(1),
+                 setup=harness.snapshot_hierarchy),
+        Scenario('ui diff (unchanged)', harness.command('ui', 'diff before'),
+                 lambda result: ok(result, "No changes between 'before' and 'current'") and harness.evaluated(1),
+                 setup=harness.snapshot_hierarchy),
+        Scenario('ui diff (changed)', harness.command('ui', 'diff before'),
+                 lambda result: ok(result, DIFF_SUMMARY.replace("'after'", "'current'"), '(+12 descendants)') and harness.evaluated(2),
+                 setup=lambda: harness.snapshot_hierarchy(changed=True)),
+        Scenario('ui diff before after', harness.command('ui', 'diff before after --limit 0'),
+                 lambda result: ok(result, DIFF_SUMMARY) and harness.hierarchy_cached(),
+                 setup=lambda: harness.snapshot_hierarchy('after', changed=True)),
+        Scenario('ui diff before after (changed at the same stop)', harness.command('ui', 'diff before after --limit 0'),
+                 lambda result: ok(result, DIFF_SUMMARY) and harness.hierarchy_cached(),
+                 setup=lambda: harness.snapshot_hierarchy('after', changed=True, resume=False)),
+        Scenario('ui tree --expand (fetch)', harness.command('ui', 'tree --expand 0x7f8000000200 --depth 1'),
+                 lambda result: ok(result, '└─SyntheticCell2 (0.0, 2.0, 320.0, 44.0)\n'
+                                   '   ├─SyntheticCell3 (0.0, 3.0, 320.0, 44.0) [+10]') and harness.evaluated(1),
+                 setup=lambda: harness.fetch_hierarchy('--depth 2')),
+        Scenario('ui tree --expand (fetched)', harness.command('ui', 'tree --expand 0x7f8000000200 --depth 2'),
+                 lambda result: ok(result, '      └─SyntheticCell') and harness.hierarchy_cached(),
+                 setup=lambda: harness.fetch_hierarchy('--depth 2', '0x7f8000000200 --depth 2')),
+        command('app', 'info', 'App Name:          Synthetic'),
+        command('device', 'info'),
+        command('mirror', 'object'),
+        Scenario('ClassInfoParser.parse', lambda: objc.ClassInfoParser.parse(methods),
+                 lambda info: len(info.class_methods) == SIZE and len(info.properties) == SIZE),
+        Scenario(f'ClassInfoParser.parse ({large_methods.count(chr(10)) + 1} lines)', lambda: objc.ClassInfoParser.parse(large_methods),
+                 lambda info: len(info.instance_methods) == SIZE * 4 and len(info.properties) == SIZE * 4),
+        Scenario('Method.signature', lambda: [objc.Method(m.name, m.ptr).signature for m in parsed_methods],
+                 lambda signatures: signatures[-1].selector == f'classMethod{last}:with:' and signatures[-1].argument_types == ('id', 'long')),
+        Scenario('IVarParser.parse', lambda: objc.IVarParser.parse(ivars),
+                 lambda parsed: len(parsed) == SIZE),
+        Scenario('SBValue.asStr', lambda: [value.asStr() for value in summaries],
+                 lambda strings: strings[-1] == f'string value {last}'),
+    ]
+
+
+def measure(scenario: Scenario, runs: int) -> dict[str, Any]:
+    times = []
+    passed = True
+    for _ in range(runs):
+        if scenario.setup is not None:
+            scenario.setup()
+        start = time.perf_counter()
+        result = scenario.run()
+        times.append((time.perf_counter() - start) * 1000)
+        passed = passed and scenario.check(result)
+
+    if scenario.setup is not None:
+        scenario.setup()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = scenario.run()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'lineno') if stat.count_diff > 0)
+
+    return {
+        'mean_ms': sum(times) / len(times),
+        'min_ms': min(times),
+        'peak_kib': peak / 1024,
+        'blocks': blocks,
+        'passed': passed
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="iLLDB benchmarks with the fake lldb module")
+    parser.add_argument('--runs', type=int, default=5, help="Number of timed runs per scenario")
+    parser.add_argument('--filter', type=str, help="Run only scenarios whose name contains the text")
+    parser.add_argument('--save', type=str, help="Save the results as JSON")
+    parser.add_argument('--compare', type=str, help="Compare with results saved by --save")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown ratio in --compare")
+    args = parser.parse_args()
+
+    baseline: dict[str, dict[str, Any]] = {}
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    harness = Harness()
+    results: dict[str, dict[str, Any]] = {}
+    failed = False
+
+    print(f"{'scenario':<48} {'mean':>10} {'min':>10} {'peak':>11} {'blocks':>8}")
+    for scenario in scenarios(harness):
+        if args.filter is not None and args.filter not in scenario.name:
+            continue
+
+        result = measure(scenario, args.runs)
+        results[scenario.name] = result
+
+        note = '' if result['passed'] else '  FAILED'
+        if scenario.name in baseline:
+            ratio = result['mean_ms'] / max(baseline[scenario.name]['mean_ms'], 1e-6)
+            note += f'  x{ratio:.2f}'
+            if ratio > 1 + args.tolerance:
+                note += ' REGRESSION'
+                failed = True
+        failed = failed or not result['passed']
+
+        print(f"{scenario.name:<48} {result['mean_ms']:>8.2f}ms {result['min_ms']:>8.2f}ms "
+              f"{result['peak_kib']:>8.1f}KiB {result['blocks']:>8}{note}")
+
+    if args.save is not None:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Measures how long loading iLLDB takes in lldb.
+
+Usage:
+    python benchmarks/startup.py [--runs RUNS] [--lldb LLDB] [--target-ms TARGET_MS]
+
+Each run starts `lldb --batch --no-lldbinit` and reports the time spent in
+`command script import` measured inside lldb, for
+- lazy:      importing src/iLLDB.py (stub commands only)
+- eager:     importing every command module as the previous loader did
+- first use: `help objc` right after the lazy import (imports objc.py and builds its parser)
+
+Exits with status 1 if the median of the lazy import exceeds the target.
+"""
+
+import os
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+
+# Importing iLLDB requires the lldb module, so the command table is parsed from the source instead.
+with open(os.path.join(SRC, 'iLLDB.py')) as f:
+    MODULES = sorted(set(re.findall(r"^\s+\('[\w-]+', '(\w+)'", f.read(), re.M)))
+
+
+def measure(lldb_path: str, commands: list[str], timed: list[str]) -> float:
+    """
+    Runs lldb and returns the time spent in `timed` commands in milliseconds.
+    """
+    args = [lldb_path, '--batch', '--no-lldbinit']
+    for command in commands:
+        args += ['-o', command]
+    args += ['-o', 'script import time; __t = time.perf_counter()']
+    for command in timed:
+        args += ['-o', command]
+    args += ['-o', 'script print("__elapsed=%f" % ((time.perf_counter() - __t) * 1000))']
+
+    output = subprocess.run(args, capture_output=True, text=True, check=True).stdout
+    match = re.search(r'__elapsed=([\d.]+)', output)
+    if match is None:
+        raise RuntimeError(f"unexpected output:\n{output}")
+    return float(match.group(1))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="iLLDB startup benchmark")
+    parser.add_argument('--runs', type=int, default=10, help="Number of runs per scenario")
+    parser.add_argument('--lldb', type=str, default='lldb', help="Path to lldb")
+    parser.add_argument('--target-ms', type=float, default=25.0, help="Maximum median time of the lazy import")
+    args = parser.parse_args()
+
+    lazy_import = f"command script import {os.path.join(SRC, 'iLLDB.py')}"
+    scenarios = {
+        'lazy': ([], [lazy_import]),
+        'eager': ([], [f"command script import {os.path.join(SRC, m + '.py')}" for m in MODULES]),
+        'first use': ([lazy_import], ['help objc']),
+    }
+
+    medians = {}
+    print(f"{'scenario':<10} {'median':>10} {'min':>10} {'max':>10}")
+    for name, (commands, timed) in scenarios.items():
+        times = [measure(args.lldb, commands, timed) for _ in range(args.runs)]
+        medians[name] = statistics.median(times)
+        print(f"{name:<10} {medians[name]:>8.2f}ms {min(times):>8.2f}ms {max(times):>8.2f}ms")
+
+    if medians['lazy'] > args.target_ms:
+        print(f"lazy import exceeds the target ({args.target_ms:.2f}ms)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,8 @@
 import lldb
-import shlex
 import argparse
-from typing import Union, cast
 from lldbhelper import LLDBCommandBase
 import util
+import command_list
 
 
 def __lldb_init_module(debugger: lldb.SBDebugger, internal_dict: dict) -> None:
@@ -18,7 +17,7 @@ class AppCommnad(LLDBCommandBase):
 
     @classmethod
     def description(cls) -> str:
-        return 'Application debugging. [iLLDB]'
+        return command_list.short_help(cls.cmdname())
 
     def create_argparser(self) -> argparse.ArgumentParser:
         parser = argparse.ArgumentParser(description="App debugging",
@@ -38,10 +37,7 @@ class AppCommnad(LLDBCommandBase):
         exe_ctx: lldb.SBExecutionContext,
         result: lldb.SBCommandReturnObject
     ) -> None:
-        args: Union[list[str], argparse.Namespace] = shlex.split(command, posix=False)
-        args = self.argparser.parse_args(cast(list[str], args))
-
-        args = cast(argparse.Namespace, args)
+        args = self.parse_args(command)
         if args.subcommand == "info":
             self.info(args, debugger, result)
         else:
@@ -53,12 +49,13 @@ class AppCommnad(LLDBCommandBase):
         debugger: lldb.SBDebugger,
         result: lldb.SBCommandReturnObject
     ) -> None:
-        script = util.read_script_file('swift/app.swift')
-        script += """
-        printAppInfo()
-        """
-
-        _ = util.exp_script(
+        policy = util.expression_policy(self.cmdname())
+        script = util.helper_script(
             debugger,
-            script
+            util.HelperScript('swift/app.swift', ('appInfo',)),
+            "let __illdb_result = appInfo()",
+            policy=policy
         )
+        info = util.exp_object(debugger, script, policy=policy, cacheable=True)
+        if info:
+            result.AppendMessage(info)
@@ -0,0 +1,31 @@
+# Commands of iLLDB.
+# (command name, module name, class or function name, short help)
+# The short help is shown by the stubs registered at startup, before the modules are imported,
+# and returned by the `description` of each command, so it is only written here.
+COMMANDS = [
+    ('app', 'app', 'AppCommnad', 'Application debugging. [iLLDB]'),
+    ('cookie', 'cookie', 'CookieCommnad', 'HTTP Cookie debugging. [iLLDB]'),
+    ('device', 'device', 'DeviceCommnad', 'Device debugging. [iLLDB]'),
+    ('file', 'file', 'FileCommnad', 'File debugging. [iLLDB]'),
+    ('illdb', 'extension', 'ExtensionCommnad', 'iLLDB settings, caches and statistics. [iLLDB]'),
+    ('mirror', 'commands', 'mirror', 'Display child elements using Mirror. [iLLDB]'),
+    ('objc', 'objc', 'ObjcCommnad', 'Objective-C runtime debugging. [iLLDB]'),
+    ('ud', 'ud', 'UserDefaultsCommnad', 'UserDefault debugging. [iLLDB]'),
+    ('ui', 'ui', 'UICommnad', 'UI debugging. [iLLDB]'),
+]
+
+
+def short_help(cmd_name: str) -> str:
+    """
+    Returns the short help of a command.
+
+    Args:
+        cmd_name (str): The name of the command.
+
+    Returns:
+        str: The short help message.
+    """
+    for name, _, _, help in COMMANDS:
+        if name == cmd_name:
+            return help
+    raise KeyError(cmd_name)
@@ -3,7 +3,6 @@ import shlex
 import util
 
 
-@lldb.command('mirror', doc='Display child elements using Mirror. [iLLDB]')
 def mirror(
     debugger: lldb.SBDebugger,
     command: str,
@@ -34,5 +33,6 @@ def mirror(
     util.exp_script(
         debugger,
         script,
-        lang=lldb.eLanguageTypeSwift
+        lang=lldb.eLanguageTypeSwift,
+        policy=util.expression_policy('mirror')
     )
@@ -1,9 +1,9 @@
 import lldb
-import shlex
 import argparse
-from typing import Union, cast
+from typing import Optional
 from lldbhelper import LLDBCommandBase
 import util
+import command_list
 
 
 def __lldb_init_module(debugger: lldb.SBDebugger, internal_dict: dict) -> None:
@@ -18,7 +18,7 @@ class CookieCommnad(LLDBCommandBase):
 
     @classmethod
     def description(cls) -> str:
-        return 'HTTP Cookie debugging. [iLLDB]'
+        return command_list.short_help(cls.cmdname())
 
     def create_argparser(self) -> argparse.ArgumentParser:
         description = "HTTP Cookie debugging"
@@ -53,14 +53,14 @@ class CookieCommnad(LLDBCommandBase):
         exe_ctx: lldb.SBExecutionContext,
         result: lldb.SBCommandReturnObject
     ) -> None:
-        args: Union[list[str], argparse.Namespace] = shlex.split(command, posix=False)
-        args = self.argparser.parse_args(cast(list[str], args))
-
-        args = cast(argparse.Namespace, args)
+        args = self.parse_args(command)
         if args.subcommand == "read":
             self.read(args, debugger, result)
         elif args.subcommand == "delete":
-            self.read(args, debugger, result)
+            description = self.cookies_description(args, debugger)
+            if description is None:
+                return
+            print(description)
             confirm = input('The above cookies will be deleted. Please type "Yes" if OK\n')
             if confirm == "Yes":
                 self.delete(args, debugger, result)
@@ -70,67 +70,56 @@ class CookieCommnad(LLDBCommandBase):
             self.argparser.print_help()
 
     def read(self, args: argparse.Namespace, debugger: lldb.SBDebugger, result: lldb.SBCommandReturnObject) -> None:
-        script = ""
-        if args.group_id is not None:
-            script += f'NSHTTPCookieStorage *storage = [NSHTTPCookieStorage sharedCookieStorageForGroupContainerIdentifier:@"{args.group_id}"];\n'
-        else:
-            script += "NSHTTPCookieStorage *storage = [NSHTTPCookieStorage sharedHTTPCookieStorage];\n"
-
-        script += util.read_script_file('objc/cookie_read.m')
-
-        # domain
-        if args.domain is not None:
-            script = script.replace("<DOMAIN>", args.domain)
-        else:
-            script = script.replace("@\"<DOMAIN>\"", "NULL")
-
-        # name
-        if args.name is not None:
-            script = script.replace("<NAME>", args.name)
-        else:
-            script = script.replace("@\"<NAME>\"", "NULL")
+        description = self.cookies_description(args, debugger)
+        if description is not None:
+            result.AppendMessage(description)
 
-        # path
-        if args.path is not None:
-            script = script.replace("<PATH>", args.path)
-        else:
-            script = script.replace("@\"<PATH>\"", "NULL")
+    def cookies_description(self, args: argparse.Namespace, debugger: lldb.SBDebugger) -> Optional[str]:
+        script = util.read_script_file('objc/cookie_read.m')
 
-        _ = util.exp_script(
+        cookies = util.exp_object(
             debugger,
             script,
-            lang=lldb.eLanguageTypeObjC
+            lang=lldb.eLanguageTypeObjC,
+            policy=util.expression_policy(self.cmdname()),
+            arguments=self.arguments(args),
+            cacheable=True
         )
+        if cookies is None:
+            return None
 
-    def delete(self, args: argparse.Namespace, debugger: lldb.SBDebugger, result: lldb.SBCommandReturnObject) -> None:
-        script = ""
-        if args.group_id is not None:
-            script += f'NSHTTPCookieStorage *storage = [NSHTTPCookieStorage sharedCookieStorageForGroupContainerIdentifier:@"{args.group_id}"];\n'
-        else:
-            script += "NSHTTPCookieStorage *storage = [NSHTTPCookieStorage sharedHTTPCookieStorage];\n"
-
-        script += util.read_script_file('objc/cookie_delete.m')
+        text = "Cookie Information:\n"
+        for cookie in cookies:
+            text += "-------------------\n"
+            text += f"  Name:    {cookie['name']}\n"
+            text += f"  Value:   {cookie['value']}\n"
+            text += f"  Domain:  {cookie['domain']}\n"
+            text += f"  Path:    {cookie['path']}\n"
+            text += f"  Secure:  {cookie['secure']}\n"
+            text += f"  Expires: {cookie['expires']}\n"
+            text += "-------------------\n"
 
-        # domain
-        if args.domain is not None:
-            script = script.replace("<DOMAIN>", args.domain)
-        else:
-            script = script.replace("@\"<DOMAIN>\"", "NULL")
+        if len(cookies) == 0:
+            text += "  None\n"
 
-        # name
-        if args.name is not None:
-            script = script.replace("<NAME>", args.name)
-        else:
-            script = script.replace("@\"<NAME>\"", "NULL")
+        return text
 
-        # path
-        if args.path is not None:
-            script = script.replace("<PATH>", args.path)
-        else:
-            script = script.replace("@\"<PATH>\"", "NULL")
+    def delete(self, args: argparse.Namespace, debugger: lldb.SBDebugger, result: lldb.SBCommandReturnObject) -> None:
+        script = util.read_script_file('objc/cookie_delete.m')
 
-        _ = util.exp_script(
+        count = util.exp_object(
             debugger,
             script,
-            lang=lldb.eLanguageTypeObjC
+            lang=lldb.eLanguageTypeObjC,
+            policy=util.expression_policy(self.cmdname()),
+            arguments=self.arguments(args)
         )
+        util.flush_expression_cache()
+        if count is not None:
+            result.AppendMessage(f"{count} Cookies was deleted")
+
+    def arguments(self, args: argparse.Namespace) -> list[util.ArgumentValue]:
+        return [
+            util.unquote(value) if value is not None else None
+            for value in [args.group_id, args.domain, args.name, args.path]
+        ]
@@ -1,9 +1,8 @@
 import lldb
-import shlex
 import argparse
-from typing import Union, cast
 from lldbhelper import LLDBCommandBase
 import util
+import command_list
 
 
 def __lldb_init_module(debugger: lldb.SBDebugger, internal_dict: dict) -> None:
@@ -17,7 +16,7 @@ class DeviceCommnad(LLDBCommandBase):
 
     @classmethod
     def description(cls) -> str:
-        return "Device debugging. [iLLDB]"
+        return command_list.short_help(cls.cmdname())
 
     def create_argparser(self) -> argparse.ArgumentParser:
         parser = argparse.ArgumentParser(description="Device debugging",
@@ -37,10 +36,7 @@ class DeviceCommnad(LLDBCommandBase):
         exe_ctx: lldb.SBExecutionContext,
         result: lldb.SBCommandReturnObject
     ) -> None:
-        args: Union[list[str], argparse.Namespace] = shlex.split(command, posix=False)
-        args = self.argparser.parse_args(cast(list[str], args))
-
-        args = cast(argparse.Namespace, args)
+        args = self.parse_args(command)
         if args.subcommand == "info":
             self.info(args, debugger, result)
         else:
@@ -54,12 +50,9 @@ class DeviceCommnad(LLDBCommandBase):
     ) -> None:
         swift_file_name = "deviceMacOS" if util.isAppKit(debugger) else "deviceIOS"
 
-        script = util.read_script_file(f'swift/{swift_file_name}.swift')
-        script += """
-        printDeviceInfo()
-        """
-
-        _ = util.exp_script(
+        _ = util.exp_helper(
             debugger,
-            script
+            util.HelperScript(f'swift/{swift_file_name}.swift', ('printDeviceInfo', 'screenSize', 'sysctlByString')),
+            "printDeviceInfo()",
+            policy=util.expression_policy(self.cmdname())
         )
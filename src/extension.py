@@ -0,0 +1,192 @@
+import lldb
+import argparse
+from dataclasses import fields
+from typing import Union
+from lldbhelper import LLDBCommandBase, profiler
+from lldbhelper.profiler import Histogram
+import util
+import command_list
+
+
+def __lldb_init_module(debugger: lldb.SBDebugger, internal_dict: dict) -> None:
+    ExtensionCommnad.register_lldb_command(debugger, ExtensionCommnad.__module__)
+
+
+class ExtensionCommnad(LLDBCommandBase):
+
+    @classmethod
+    def cmdname(cls) -> str:
+        return 'illdb'
+
+    @classmethod
+    def description(cls) -> str:
+        return command_list.short_help(cls.cmdname())
+
+    def create_argparser(self) -> argparse.ArgumentParser:
+        parser = argparse.ArgumentParser(description="iLLDB settings",
+                                         formatter_class=util.HelpFormatter)
+        subparsers = parser.add_subparsers(title="Subcommands", dest="subcommand")
+
+        settings_command = subparsers.add_parser("settings",
+                                                 help="Show or change how expressions are evaluated",
+                                                 formatter_class=util.HelpFormatter)
+        settings_subparsers = settings_command.add_subparsers(title="Actions", dest="action")
+
+        show_command = settings_subparsers.add_parser("show",
+                                                      help="Show settings",
+                                                      formatter_class=util.HelpFormatter)
+        show_command.add_argument("--command", type=str, help="Show settings applied to the command")
+
+        set_command = settings_subparsers.add_parser("set",
+                                                     help="Change a setting",
+                                                     formatter_class=util.HelpFormatter)
+        set_command.add_argument("key",
+                                 type=str,
+                                 choices=self.setting_keys(),
+                                 help="Setting name (timeouts are in microseconds, 0 means no timeout)")
+        set_command.add_argument("value",
+                                 type=str,
+                                 help="Value to set")
+        set_command.add_argument("--command", type=str, help="Override the setting only for the command")
+
+        reset_command = settings_subparsers.add_parser("reset",
+                                                       help="Reset settings",
+                                                       formatter_class=util.HelpFormatter)
+        reset_command.add_argument("--command", type=str, help="Reset only the overrides for the command")
+
+        cache_command = subparsers.add_parser("cache",
+                                              help="Show statistics of the expression result cache",
+                                              formatter_class=util.HelpFormatter)
+        cache_command.add_argument("--clear", action="store_true", help="Drop all cached results")
+
+        stats_command = subparsers.add_parser("stats",
+                                              help="Show where iLLDB commands spend their time",
+                                              formatter_class=util.HelpFormatter)
+        stats_command.add_argument("--reset", action="store_true", help="Clear collected timings and counters")
+        stats_command.add_argument("--trace", type=str, help="Append a JSON line per command to the file")
+        stats_command.add_argument("--no-trace", action="store_true", help="Stop writing the trace file")
+
+        return parser
+
+    def __call__(
+        self,
+        debugger: lldb.SBDebugger,
+        command: str,
+        exe_ctx: lldb.SBExecutionContext,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        args = self.parse_args(command)
+
+        if args.subcommand == "settings":
+            self.settings(args, debugger, result)
+        elif args.subcommand == "cache":
+            self.cache(args, debugger, result)
+        elif args.subcommand == "stats":
+            self.stats(args, debugger, result)
+        else:
+            self.argparser.print_help()
+
+    def settings(
+        self,
+        args: argparse.Namespace,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        if args.action == "set":
+            field = next(f for f in fields(util.ExpressionPolicy) if f.name == args.key.replace('-', '_'))
+            try:
+                value: Union[int, bool]
+                if field.type in (bool, 'bool'):
+                    value = self.parse_bool(args.value)
+                else:
+                    value = int(args.value, 0)
+            except ValueError:
+                result.SetError(f"Invalid value for {args.key}: {args.value}")
+                return
+            util.set_expression_policy(field.name, value, command=args.command)
+        elif args.action == "reset":
+            util.reset_expression_policy(command=args.command)
+        elif args.action != "show":
+            self.argparser.print_help()
+            return
+
+        policy = util.expression_policy(getattr(args, 'command', None))
+        text = "Expression Policy"
+        if getattr(args, 'command', None) is not None:
+            text += f" ({args.command})"
+        text += "\n"
+        text += '\n'.join(map(lambda f: f"    {f.name.replace('_', '-')}: {getattr(policy, f.name)}", fields(policy)))
+
+        result.AppendMessage(text)
+
+    def cache(
+        self,
+        args: argparse.Namespace,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        cache = util.expression_cache
+        if args.clear:
+            util.flush_expression_cache()
+
+        lookups = cache.hits + cache.misses
+        ratio = cache.hits / lookups * 100 if lookups > 0 else 0
+        text = "Expression Cache\n"
+        text += f"    entries: {len(cache)} / {cache.capacity}\n"
+        text += f"    hits: {cache.hits}\n"
+        text += f"    misses: {cache.misses}\n"
+        text += f"    hit-ratio: {ratio:.1f}%"
+
+        result.AppendMessage(text)
+
+    def stats(
+        self,
+        args: argparse.Namespace,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        if args.no_trace:
+            profiler.trace_path = None
+        elif args.trace is not None:
+            profiler.trace_path = util.unquote(args.trace)
+        if args.reset:
+            profiler.reset()
+            return
+
+        text = "Commands\n"
+        for name, histogram in sorted(profiler.commands.items()):
+            text += self.histogram_description(name, histogram)
+
+        text += "Phases\n"
+        for name, histogram in sorted(profiler.phases.items()):
+            text += self.histogram_description(name, histogram)
+
+        text += "Counters\n"
+        for name, value in sorted(profiler.counters.items()):
+            text += f"    {name}: {value}\n"
+
+        if profiler.trace_path is not None:
+            text += f"Trace: {profiler.trace_path}\n"
+
+        result.AppendMessage(text.rstrip())
+
+    def histogram_description(self, name: str, histogram: Histogram) -> str:
+        text = f"    {name}: count {histogram.count}, total {histogram.total:.2f}ms, "
+        text += f"mean {histogram.mean:.2f}ms, min {histogram.min:.2f}ms, max {histogram.max:.2f}ms\n"
+
+        peak = max(histogram.buckets.values())
+        for bucket, count in sorted(histogram.buckets.items()):
+            bar = '#' * max(1, round(count / peak * 30))
+            text += f"        {Histogram.bucket_label(bucket):>14} {bar} {count}\n"
+
+        return text
+
+    def setting_keys(self) -> list[str]:
+        return [f.name.replace('_', '-') for f in fields(util.ExpressionPolicy)]
+
+    def parse_bool(self, value: str) -> bool:
+        if value.lower() in ('true', 'yes', '1'):
+            return True
+        elif value.lower() in ('false', 'no', '0'):
+            return False
+        raise ValueError(value)
@@ -1,10 +1,9 @@
 import lldb
-import shlex
 import argparse
 import subprocess
-from typing import Union, cast
 from lldbhelper import LLDBCommandBase
 import util
+import command_list
 
 
 def __lldb_init_module(debugger: lldb.SBDebugger, internal_dict: dict) -> None:
@@ -19,7 +18,7 @@ class FileCommnad(LLDBCommandBase):
 
     @classmethod
     def description(cls) -> str:
-        return 'File debugging. [iLLDB]'
+        return command_list.short_help(cls.cmdname())
 
     def create_argparser(self) -> argparse.ArgumentParser:
         parser = argparse.ArgumentParser(description="File debugging",
@@ -63,9 +62,7 @@ class FileCommnad(LLDBCommandBase):
         exe_ctx: lldb.SBExecutionContext,
         result: lldb.SBCommandReturnObject
     ) -> None:
-        args: Union[list[str], argparse.Namespace] = shlex.split(command, posix=False)
-        args = self.argparser.parse_args(cast(list[str], args))
-        args = cast(argparse.Namespace, args)
+        args = self.parse_args(command)
 
         if args.subcommand == "tree":
             self.tree(args, debugger, result)
@@ -77,32 +74,27 @@ class FileCommnad(LLDBCommandBase):
             self.argparser.print_help()
 
     def tree(self, args: argparse.Namespace, debugger: lldb.SBDebugger, result: lldb.SBCommandReturnObject) -> None:
-        script = util.read_script_file('swift/file.swift')
-
-        depth = 'nil'
-        if args.depth is not None:
-            try:
-                depth = str(int(args.depth))
-            except ValueError:
-                pass
+        script = ''
 
         if args.bundle:
-            script += f"listFilesInDirectory(Bundle.main.bundleURL, depth: {depth})"
+            script += "listFilesInDirectory(Bundle.main.bundleURL, depth: __illdb_argInt(0))"
         elif args.library:
-            script += f"listFilesInDirectory(FileManager.default.urls(for: .libraryDirectory, in: .userDomainMask).first!, depth: {depth})"
+            script += "listFilesInDirectory(FileManager.default.urls(for: .libraryDirectory, in: .userDomainMask).first!, depth: __illdb_argInt(0))"
         elif args.documents:
-            script += f"listFilesInDirectory(FileManager.default.urls(for: .documentDirectory, in: .userDomainMask).first!, depth: {depth})"
+            script += "listFilesInDirectory(FileManager.default.urls(for: .documentDirectory, in: .userDomainMask).first!, depth: __illdb_argInt(0))"
         elif args.tmp:
-            script += f"listFilesInDirectory(FileManager.default.temporaryDirectory, depth: {depth})"
+            script += "listFilesInDirectory(FileManager.default.temporaryDirectory, depth: __illdb_argInt(0))"
         elif args.path:
-            path: str = args.path
-            if not path.startswith('"') and not path.endswith('"'):
-                path = f"\"{path}\""
-            script += f"listFilesInDirectory(URL(fileURLWithPath: {path}), depth: {depth})"
+            script += "listFilesInDirectory(URL(fileURLWithPath: __illdb_argString(1)!), depth: __illdb_argInt(0))"
+
+        path = util.unquote(args.path) if args.path else None
 
-        _ = util.exp_script(
+        _ = util.exp_helper(
             debugger,
-            script
+            util.HelperScript('swift/file.swift', ('listFilesInDirectory',), prelude='import Foundation'),
+            script,
+            policy=util.expression_policy(self.cmdname()),
+            arguments=[args.depth, path]
         )
 
     def open(self, args: argparse.Namespace, debugger: lldb.SBDebugger, result: lldb.SBCommandReturnObject) -> None:
@@ -128,7 +120,7 @@ class FileCommnad(LLDBCommandBase):
             shell += f"{path}"
 
         if script != "":
-            ret = util.exp_script(debugger, script)
+            ret = util.exp_script(debugger, script, policy=util.expression_policy(self.cmdname()))
             if ret:
                 print(ret.asStr())
                 shell += f"{ret.GetObjectDescription()}"
@@ -137,11 +129,20 @@ class FileCommnad(LLDBCommandBase):
 
     def cat(self, args: argparse.Namespace, debugger: lldb.SBDebugger, result: lldb.SBCommandReturnObject) -> None:
         script = util.read_script_file('objc/cat.m')
-        script = script.replace("<FILE_PATH>", args.path)
-        script = script.replace("<MODE>", args.mode)
 
-        _ = util.exp_script(
+        contents = util.exp_object(
             debugger,
             script,
-            lang=lldb.eLanguageTypeObjC
+            lang=lldb.eLanguageTypeObjC,
+            policy=util.expression_policy(self.cmdname()),
+            arguments=[util.unquote(args.path), args.mode]
         )
+        if contents is None:
+            return
+
+        if 'error' in contents:
+            result.AppendMessage(contents['error'])
+        elif 'text' in contents:
+            result.AppendMessage(contents['text'])
+        else:
+            result.AppendMessage(contents['data'].decode('utf-8', errors='replace'))
@@ -1,33 +1,25 @@
 import lldb
-import os
-import lldbhelper  # noqa: F401
+import lldbhelper
+from lldbhelper import lazy_command
+from command_list import COMMANDS
 
 iLLDB_VERSION = "0.8.0"
 
 
 def __lldb_init_module(debugger: lldb.SBDebugger, internal_dict: dict) -> None:
-    file_path = os.path.realpath(__file__)
-    dir_name = os.path.dirname(file_path)
-    load_commands(dir_name, debugger)
+    load_commands(debugger)
     print(f"[iLLDB] loaded: Version {iLLDB_VERSION}")
 
 
-def load_commands(dir_name: str, debugger: lldb.SBDebugger) -> None:
-    ignored_files = {"iLLDB.py"}
+def load_commands(debugger: lldb.SBDebugger) -> None:
+    """
+    Registers a stub for each command in `command_list.COMMANDS`.
+    Modules are imported when their command is used for the first time.
 
-    for file in os.listdir(dir_name):
-        full_path = dir_name + '/' + file
-
-        if file in ignored_files:
-            continue
-        elif file.endswith('.py'):
-            cmd = 'command script import '
-        elif file.endswith('.h'):
-            cmd = 'command source -e0 -s1 '
-        elif os.path.isdir(full_path):
-            load_commands(full_path, debugger)
-            continue
-        else:
-            continue
-
-        debugger.HandleCommand(cmd + full_path)
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+    """
+    for cmd_name, module_name, attribute_name, short_help in COMMANDS:
+        command: type[lldbhelper.LazyCommand] = lazy_command(cmd_name, module_name, attribute_name, short_help)
+        globals()[command.__name__] = command
+        command.register_lldb_command(debugger, __name__)
@@ -1,3 +1,5 @@
-__all__ = ['LLDBCommandBase']
+__all__ = ['LLDBCommandBase', 'LazyCommand', 'lazy_command', 'profiler']
 
 from lldbhelper.lldb_command_base import LLDBCommandBase
+from lldbhelper.lazy_command import LazyCommand, lazy_command
+from lldbhelper.profiler import profiler
@@ -0,0 +1,141 @@
+import lldb
+import importlib
+from typing import Any, Optional
+from lldbhelper.profiler import profiler
+
+# ref: https://lldb.llvm.org/use/python-reference.html#create-a-new-lldb-command-using-a-python-function
+
+
+class LazyCommand:
+    """
+    Stub of an LLDB command that only knows the command's name and short help.
+
+    The module implementing the command is imported on first use,
+    so registering commands does not import their modules or build their argument parsers.
+    Concrete stubs are created by `lazy_command`.
+
+    Attributes:
+        cmd_name (str): The name of the command.
+        module_name (str): The name of the module implementing the command.
+        attribute_name (str):
+            The name of the `LLDBCommandBase` subclass,
+            or of the function (debugger, command, exe_ctx, result, internal_dict) implementing the command.
+        short_help (str): The short help message.
+    """
+
+    cmd_name: str = ''
+    module_name: str = ''
+    attribute_name: str = ''
+    short_help: str = ''
+
+    @classmethod
+    def register_lldb_command(cls, debugger: lldb.SBDebugger, module_name: str) -> None:
+        """
+        Registers the stub with LLDB.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            module_name (str): The name of the module the stub class can be found in.
+        """
+        cls.__doc__ = cls.short_help
+
+        command = f"command script add -o -c {module_name}.{cls.__name__} {cls.cmd_name}"
+        debugger.HandleCommand(command)
+
+    def __init__(self, debugger: lldb.SBDebugger, internal_dict: dict):
+        # Kept for loading the command outside of a command invocation (e.g. for `help`),
+        # since `lldb.debugger` is only set in the interactive script interpreter
+        self.debugger = debugger
+        self.internal_dict = internal_dict
+        self.command: Optional[Any] = None
+        self.is_function = False
+
+    def resolve(self, debugger: lldb.SBDebugger) -> Any:
+        """
+        Imports the module and creates the command unless it has been done.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+
+        Returns:
+            Any: The command instance, or the function implementing the command.
+        """
+        if self.command is None:
+            module = importlib.import_module(self.module_name)
+            target = getattr(module, self.attribute_name)
+            if isinstance(target, type):
+                self.command = target(debugger, self.internal_dict)
+            else:
+                self.command = target
+                self.is_function = True
+        return self.command
+
+    def __call__(
+        self,
+        debugger: lldb.SBDebugger,
+        command: str,
+        exe_ctx: lldb.SBExecutionContext,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        try:
+            target = self.resolve(debugger)
+        except (ImportError, AttributeError) as e:
+            result.SetError(f"[iLLDB] failed to load `{self.cmd_name}`: {e}")
+            return
+
+        if self.is_function:
+            with profiler.command(self.cmd_name, command):
+                target(debugger, command, exe_ctx, result, self.internal_dict)
+        else:
+            target(debugger, command, exe_ctx, result)
+
+    def get_short_help(self) -> str:
+        """
+        Returns the short help message without loading the command.
+
+        Returns:
+            str: The short help message.
+        """
+        return self.short_help
+
+    def get_long_help(self) -> str:
+        """
+        Returns the long help message of the command, loading it if needed.
+
+        Returns:
+            str: The long help message.
+        """
+        try:
+            target = self.resolve(self.debugger)
+        except (ImportError, AttributeError):
+            return self.short_help
+
+        if hasattr(target, 'get_long_help'):
+            long_help: str = target.get_long_help()
+            return long_help
+        return target.__doc__ or self.short_help
+
+
+def lazy_command(cmd_name: str, module_name: str, attribute_name: str, short_help: str) -> type[LazyCommand]:
+    """
+    Creates a stub class for a command.
+
+    Args:
+        cmd_name (str): The name of the command.
+        module_name (str): The name of the module implementing the command.
+        attribute_name (str): The name of the class or function implementing the command.
+        short_help (str): The short help message.
+
+    Returns:
+        type[LazyCommand]: The stub class. It must be reachable from a module to be registered.
+    """
+    return type(
+        f"Lazy_{cmd_name}",
+        (LazyCommand,),
+        {
+            'cmd_name': cmd_name,
+            'module_name': module_name,
+            'attribute_name': attribute_name,
+            'short_help': short_help
+        }
+    )
@@ -1,6 +1,10 @@
 import lldb
 from abc import ABC, abstractmethod
+import shlex
 import argparse
+import functools
+from typing import Any, Callable
+from lldbhelper.profiler import profiler
 
 # ref: https://lldb.llvm.org/use/python-reference.html#create-a-new-lldb-command-using-a-python-function
 
@@ -36,6 +40,14 @@ class LLDBCommandBase(ABC):
         """
         pass
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """
+        Wraps `__call__` of the subclass so that every invocation is measured by the profiler.
+        """
+        super().__init_subclass__(**kwargs)
+        if '__call__' in cls.__dict__:
+            cls.__call__ = _profiled(cls.__dict__['__call__'])  # type: ignore[method-assign]
+
     @classmethod
     def register_lldb_command(cls, debugger: lldb.SBDebugger, module_name: str) -> None:
         """
@@ -100,6 +112,19 @@ class LLDBCommandBase(ABC):
         """
         pass
 
+    def parse_args(self, command: str) -> argparse.Namespace:
+        """
+        Splits the command string and parses it with the argparser.
+
+        Args:
+            command (str): The command string.
+
+        Returns:
+            argparse.Namespace: The parsed arguments.
+        """
+        with profiler.phase('parse'):
+            return self.argparser.parse_args(shlex.split(command, posix=False))
+
     def get_short_help(self) -> str:
         """
         Returns the short help message for the command.
@@ -119,3 +144,17 @@ class LLDBCommandBase(ABC):
             str: The long help message.
         """
         return self.argparser.format_help()
+
+
+def _profiled(call: Callable[..., None]) -> Callable[..., None]:
+    @functools.wraps(call)
+    def wrapper(
+        self: LLDBCommandBase,
+        debugger: lldb.SBDebugger,
+        command: str,
+        exe_ctx: lldb.SBExecutionContext,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        with profiler.command(self.cmdname(), command):
+            call(self, debugger, command, exe_ctx, result)
+    return wrapper
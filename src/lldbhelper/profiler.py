@@ -0,0 +1,194 @@
+import json
+import time
+import functools
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+class Histogram:
+    """
+    Distribution of durations in power-of-two millisecond buckets.
+
+    Attributes:
+        count (int): The number of samples.
+        total (float): The sum of the samples in milliseconds.
+        min (float): The shortest sample in milliseconds.
+        max (float): The longest sample in milliseconds.
+        buckets (dict[int, int]):
+            The number of samples by bucket.
+            Bucket 0 holds samples shorter than 1ms and bucket `i` holds samples in [2^(i-1), 2^i) ms.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets: dict[int, int] = {}
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+    def add(self, milliseconds: float) -> None:
+        """
+        Adds a sample.
+
+        Args:
+            milliseconds (float): The duration.
+        """
+        self.count += 1
+        self.total += milliseconds
+        self.min = min(self.min, milliseconds)
+        self.max = max(self.max, milliseconds)
+        bucket = int(milliseconds).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    @staticmethod
+    def bucket_label(bucket: int) -> str:
+        if bucket == 0:
+            return '<1ms'
+        return f'{2 ** (bucket - 1)}-{2 ** bucket}ms'
+
+
+class CommandRecord:
+    """
+    Timings and counters of a command invocation.
+
+    Attributes:
+        name (str): The command name.
+        arguments (str): The command arguments.
+        start (float): The wall-clock time the command started at (seconds since the epoch).
+        duration (float): The duration in milliseconds.
+        phases (dict[str, float]): Total time in milliseconds by phase.
+        counters (dict[str, int]): Counter values.
+    """
+
+    def __init__(self, name: str, arguments: str) -> None:
+        self.name = name
+        self.arguments = arguments
+        self.start = time.time()
+        self.duration = 0.0
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'command': self.name,
+            'arguments': self.arguments,
+            'start': self.start,
+            'duration_ms': round(self.duration, 3),
+            'phases': {name: round(value, 3) for name, value in self.phases.items()},
+            'counters': self.counters
+        })
+
+
+class Profiler:
+    """
+    Collects timings of commands and of their phases, and counters.
+
+    Phases are named spans measured with a monotonic clock
+    (e.g. `parse`, `expression`, `transfer`, `decode`).
+    Phases may be nested; each is recorded separately.
+
+    Attributes:
+        commands (dict[str, Histogram]): Durations by command name.
+        phases (dict[str, Histogram]): Durations by phase name.
+        counters (dict[str, int]): Counter values.
+        trace_path (Optional[str]): Path of the JSONL file a record is appended to after each command, if any.
+    """
+
+    def __init__(self) -> None:
+        self.commands: dict[str, Histogram] = {}
+        self.phases: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+        self.trace_path: Optional[str] = None
+        self._records: list[CommandRecord] = []
+
+    def reset(self) -> None:
+        """Clears the collected timings and counters."""
+        self.commands.clear()
+        self.phases.clear()
+        self.counters.clear()
+
+    @contextmanager
+    def command(self, name: str, arguments: str = '') -> Iterator[CommandRecord]:
+        """
+        Measures a command invocation.
+
+        Args:
+            name (str): The command name.
+            arguments (str): The command arguments, written to the trace file.
+
+        Yields:
+            CommandRecord: The record of the invocation.
+        """
+        record = CommandRecord(name, arguments)
+        self._records.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.duration = (time.perf_counter() - start) * 1000
+            self._records.pop()
+            self.commands.setdefault(name, Histogram()).add(record.duration)
+            self._write_trace(record)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Measures a phase of the current command.
+
+        Args:
+            name (str): The phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.phases.setdefault(name, Histogram()).add(elapsed)
+            for record in self._records:
+                record.phases[name] = record.phases.get(name, 0.0) + elapsed
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            name (str): The counter name (e.g. `expressions`, `bytes_read`).
+            value (int): The amount to add.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+        for record in self._records:
+            record.counters[name] = record.counters.get(name, 0) + value
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """
+        Decorator measuring every call of a function as a phase.
+
+        Args:
+            name (str): The phase name.
+        """
+        def decorator(function: F) -> F:
+            @functools.wraps(function)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.phase(name):
+                    return function(*args, **kwargs)
+            return wrapper  # type: ignore[return-value]
+        return decorator
+
+    def _write_trace(self, record: CommandRecord) -> None:
+        if self.trace_path is None:
+            return
+        try:
+            with open(self.trace_path, mode='a') as file:
+                file.write(record.to_json() + '\n')
+        except OSError as e:
+            print(f"[iLLDB] failed to write trace: {e}")
+            self.trace_path = None
+
+
+profiler = Profiler()
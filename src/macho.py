@@ -0,0 +1,322 @@
+import mmap
+import struct
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Optional
+
+MH_MAGIC_64 = 0xfeedfacf
+FAT_MAGIC = 0xcafebabe
+FAT_MAGIC_64 = 0xcafebabf
+
+LC_SEGMENT_64 = 0x19
+LC_UUID = 0x1b
+LC_DYLD_CHAINED_FIXUPS = 0x80000034
+
+# Formats of chained fixup pointers (mach-o/fixup-chains.h)
+DYLD_CHAINED_PTR_ARM64E = 1
+DYLD_CHAINED_PTR_64 = 2
+DYLD_CHAINED_PTR_64_OFFSET = 6
+DYLD_CHAINED_PTR_ARM64E_USERLAND = 9
+DYLD_CHAINED_PTR_ARM64E_USERLAND24 = 12
+
+# Formats of chained fixup imports
+DYLD_CHAINED_IMPORT = 1
+DYLD_CHAINED_IMPORT_ADDEND = 2
+DYLD_CHAINED_IMPORT_ADDEND64 = 3
+
+MAX_CSTRING_LENGTH = 4096
+
+_UINT32 = struct.Struct('<I')
+_INT32 = struct.Struct('<i')
+_UINT64 = struct.Struct('<Q')
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    A segment of a Mach-O image.
+
+    Attributes:
+        name (str): The segment name (e.g. `__DATA_CONST`).
+        address (int): The virtual address.
+        size (int): The size in memory.
+        offset (int): The offset in the file (including the offset of the slice in a fat file).
+        file_size (int): The size in the file.
+    """
+
+    name: str
+    address: int
+    size: int
+    offset: int
+    file_size: int
+
+
+@dataclass(frozen=True)
+class Section:
+    """
+    A section of a Mach-O image.
+
+    Attributes:
+        segment (str): The segment name.
+        name (str): The section name (e.g. `__objc_classlist`).
+        address (int): The virtual address.
+        size (int): The size.
+        offset (int): The offset in the file (including the offset of the slice in a fat file).
+    """
+
+    segment: str
+    name: str
+    address: int
+    size: int
+    offset: int
+
+
+class MachOFile:
+    """
+    A 64-bit Mach-O image read from a memory-mapped file.
+
+    Only the parts that are read are paged in, so large binaries are cheap to open.
+    Pointers stored in data sections are decoded from chained fixups when the image uses them:
+    rebases become virtual addresses and binds become the names of the imported symbols.
+
+    Attributes:
+        path (str): The path of the file.
+        uuid (Optional[str]): The UUID of the image in the format of `SBModule.GetUUIDString`.
+        segments (list[Segment]): The segments.
+        sections (list[Section]): The sections.
+        base (int): The virtual address of the `__TEXT` segment.
+        pointer_format (Optional[int]): The format of chained fixup pointers, or None if the image does not use them.
+    """
+
+    def __init__(self, path: str, data: mmap.mmap, offset: int) -> None:
+        self.path = path
+        self.data = data
+        self.uuid: Optional[str] = None
+        self.segments: list[Segment] = []
+        self.sections: list[Section] = []
+        self.base = 0
+        self.pointer_format: Optional[int] = None
+        self._slice = offset
+        self._segment_starts: list[int] = []
+        self._last_segment: Optional[Segment] = None
+        self._imports: tuple[int, int, int, int] = (0, 0, 0, 0)
+        self._import_names: dict[int, Optional[str]] = {}
+        self._parse_load_commands()
+
+    @classmethod
+    def open(cls, path: str, uuid: Optional[str] = None) -> Optional['MachOFile']:
+        """
+        Opens a Mach-O file.
+
+        Args:
+            path (str): The path of the file.
+            uuid (Optional[str]): The UUID of the wanted image. In a fat file, the slice with this UUID is used.
+
+        Returns:
+            Optional[MachOFile]:
+                The image, or None if the file cannot be read, is not a 64-bit Mach-O file,
+                or has no image with the UUID.
+        """
+        try:
+            with open(path, 'rb') as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            for offset in cls._slices(data):
+                image = MachOFile(path, data, offset)
+                if uuid is None or image.uuid is None or image.uuid == uuid.upper():
+                    return image
+        except (struct.error, IndexError, ValueError):
+            pass
+        data.close()
+        return None
+
+    @staticmethod
+    def _slices(data: mmap.mmap) -> list[int]:
+        magic = struct.unpack_from('>I', data, 0)[0]
+        if magic in (FAT_MAGIC, FAT_MAGIC_64):
+            count = struct.unpack_from('>I', data, 4)[0]
+            if magic == FAT_MAGIC:
+                # cputype, cpusubtype, offset, size, align
+                return [struct.unpack_from('>iiIII', data, 8 + i * 20)[2] for i in range(count)]
+            # cputype, cpusubtype, offset, size, align, reserved
+            return [struct.unpack_from('>iiQQII', data, 8 + i * 32)[2] for i in range(count)]
+        if struct.unpack_from('<I', data, 0)[0] == MH_MAGIC_64:
+            return [0]
+        return []
+
+    def _parse_load_commands(self) -> None:
+        magic, _, _, _, command_count, _, _, _ = struct.unpack_from('<IiiIIIII', self.data, self._slice)
+        if magic != MH_MAGIC_64:
+            raise ValueError(f"not a 64-bit Mach-O image: {self.path}")
+
+        fixups: Optional[tuple[int, int]] = None
+        offset = self._slice + 32
+        for _ in range(command_count):
+            command, size = struct.unpack_from('<II', self.data, offset)
+            if command == LC_SEGMENT_64:
+                name, address, vm_size, file_offset, file_size, _, _, section_count, _ = struct.unpack_from(
+                    '<16sQQQQiiII', self.data, offset + 8
+                )
+                segment_name = name.rstrip(b'\0').decode('utf-8', 'replace')
+                self.segments.append(Segment(segment_name, address, vm_size, self._slice + file_offset, file_size))
+                if segment_name == '__TEXT':
+                    self.base = address
+                for i in range(section_count):
+                    section_name, section_segment, section_address, section_size, section_offset = struct.unpack_from(
+                        '<16s16sQQI', self.data, offset + 72 + i * 80
+                    )
+                    self.sections.append(Section(
+                        section_segment.rstrip(b'\0').decode('utf-8', 'replace'),
+                        section_name.rstrip(b'\0').decode('utf-8', 'replace'),
+                        section_address,
+                        section_size,
+                        self._slice + section_offset
+                    ))
+            elif command == LC_UUID:
+                value = self.data[offset + 8:offset + 24].hex().upper()
+                self.uuid = f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
+            elif command == LC_DYLD_CHAINED_FIXUPS:
+                fixups = struct.unpack_from('<II', self.data, offset + 8)
+            offset += size
+
+        self.segments.sort(key=lambda s: s.address)
+        self._segment_starts = [s.address for s in self.segments]
+        if fixups is not None:
+            self._parse_chained_fixups(self._slice + fixups[0])
+
+    def _parse_chained_fixups(self, offset: int) -> None:
+        _, starts_offset, imports_offset, symbols_offset, imports_count, imports_format, _ = struct.unpack_from(
+            '<IIIIIII', self.data, offset
+        )
+        self._imports = (offset + imports_offset, offset + symbols_offset, imports_count, imports_format)
+
+        # All segments of an image use the same pointer format
+        starts = offset + starts_offset
+        segment_count = struct.unpack_from('<I', self.data, starts)[0]
+        for i in range(segment_count):
+            segment_offset = struct.unpack_from('<I', self.data, starts + 4 + i * 4)[0]
+            if segment_offset != 0:
+                self.pointer_format = struct.unpack_from('<IHH', self.data, starts + segment_offset)[2]
+                break
+
+    def section(self, name: str) -> Optional[Section]:
+        """Returns the first section with a name (e.g. `__objc_classlist`, in `__DATA` or `__DATA_CONST`)."""
+        for section in self.sections:
+            if section.name == name:
+                return section
+        return None
+
+    def file_offset(self, address: int) -> Optional[int]:
+        """Returns the offset in the file of a virtual address, or None if it is not backed by the file."""
+        # Metadata is read in runs of addresses of the same segment
+        segment = self._last_segment
+        if segment is None or not segment.address <= address < segment.address + segment.size:
+            index = bisect_right(self._segment_starts, address) - 1
+            if index < 0:
+                return None
+            segment = self.segments[index]
+            self._last_segment = segment
+        delta = address - segment.address
+        if delta >= segment.file_size:
+            return None
+        return segment.offset + delta
+
+    def read_uint32(self, offset: int) -> int:
+        value: int = _UINT32.unpack_from(self.data, offset)[0]
+        return value
+
+    def read_int32(self, offset: int) -> int:
+        value: int = _INT32.unpack_from(self.data, offset)[0]
+        return value
+
+    def read_pointer(self, offset: int) -> tuple[int, Optional[str]]:
+        """
+        Reads a pointer stored at a file offset.
+
+        Args:
+            offset (int): The offset in the file.
+
+        Returns:
+            tuple[int, Optional[str]]:
+                The virtual address it points to (0 for binds and null pointers),
+                and the name of the imported symbol for binds.
+        """
+        return self.decode_pointer(_UINT64.unpack_from(self.data, offset)[0])
+
+    def read_pointers(self, section: Section) -> list[tuple[int, Optional[str]]]:
+        """Reads the pointers of a section of pointers (e.g. `__objc_classlist`)."""
+        count = section.size // 8
+        values = struct.unpack_from(f'<{count}Q', self.data, section.offset)
+        return [self.decode_pointer(value) for value in values]
+
+    def decode_pointer(self, value: int) -> tuple[int, Optional[str]]:
+        """Decodes a pointer read from the file. See `read_pointer`."""
+        format = self.pointer_format
+        if format is None or value == 0:
+            return (value, None)
+
+        if format in (DYLD_CHAINED_PTR_64, DYLD_CHAINED_PTR_64_OFFSET):
+            if value >> 63:
+                return (0, self.import_name(value & 0xFFFFFF))
+            address = ((value >> 36) & 0xFF) << 56 | (value & 0xFFFFFFFFF)
+            return (address + self.base if format == DYLD_CHAINED_PTR_64_OFFSET else address, None)
+
+        if format in (DYLD_CHAINED_PTR_ARM64E, DYLD_CHAINED_PTR_ARM64E_USERLAND, DYLD_CHAINED_PTR_ARM64E_USERLAND24):
+            is_auth = (value >> 63) & 1
+            if (value >> 62) & 1:
+                mask = 0xFFFFFF if format == DYLD_CHAINED_PTR_ARM64E_USERLAND24 else 0xFFFF
+                return (0, self.import_name(value & mask))
+            if is_auth:
+                return (self.base + (value & 0xFFFFFFFF), None)
+            address = ((value >> 43) & 0xFF) << 56 | (value & 0x7FFFFFFFFFF)
+            return (address if format == DYLD_CHAINED_PTR_ARM64E else address + self.base, None)
+
+        return (value, None)
+
+    def read_pointer_at(self, address: int) -> tuple[int, Optional[str]]:
+        """Reads a pointer stored at a virtual address. Returns `(0, None)` if the address is not backed by the file."""
+        offset = self.file_offset(address)
+        if offset is None:
+            return (0, None)
+        return self.read_pointer(offset)
+
+    def read_cstring(self, address: int) -> Optional[str]:
+        """Reads a NUL-terminated UTF-8 string at a virtual address."""
+        offset = self.file_offset(address)
+        if offset is None:
+            return None
+        end = self.data.find(b'\0', offset, offset + MAX_CSTRING_LENGTH)
+        if end < 0:
+            return None
+        return self.data[offset:end].decode('utf-8', 'replace')
+
+    def import_name(self, ordinal: int) -> Optional[str]:
+        """Returns the name of an imported symbol of the chained fixups (e.g. `_OBJC_CLASS_$_UIView`)."""
+        if ordinal not in self._import_names:
+            self._import_names[ordinal] = self._read_import_name(ordinal)
+        return self._import_names[ordinal]
+
+    def _read_import_name(self, ordinal: int) -> Optional[str]:
+        imports, symbols, count, format = self._imports
+        if ordinal >= count:
+            return None
+        if format == DYLD_CHAINED_IMPORT:
+            name_offset = self.read_uint32(imports + ordinal * 4) >> 9
+        elif format == DYLD_CHAINED_IMPORT_ADDEND:
+            name_offset = self.read_uint32(imports + ordinal * 8) >> 9
+        elif format == DYLD_CHAINED_IMPORT_ADDEND64:
+            name_offset = _UINT64.unpack_from(self.data, imports + ordinal * 16)[0] >> 32
+        else:
+            return None
+        end = self.data.find(b'\0', symbols + name_offset)
+        if end < 0:
+            return None
+        return self.data[symbols + name_offset:end].decode('utf-8', 'replace')
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self._import_names.clear()
+        self.data.close()
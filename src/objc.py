@@ -1,9 +1,18 @@
+import os
 import lldb
-import shlex
 import argparse
-from typing import Union, Optional, cast
-from lldbhelper import LLDBCommandBase
+from functools import cached_property
+from typing import ClassVar, Iterable, Iterator, Optional, Union
+from lldbhelper import LLDBCommandBase, profiler
 import util
+import objc_runtime
+import objc_cache
+import objc_index
+import objc_memory
+import objc_static
+import objc_symbols
+import objc_trace
+import command_list
 
 
 def __lldb_init_module(debugger: lldb.SBDebugger, internal_dict: dict) -> None:
@@ -18,7 +27,7 @@ class ObjcCommnad(LLDBCommandBase):
 
     @classmethod
     def description(cls) -> str:
-        return 'Objective-C runtime debugging. [iLLDB]'
+        return command_list.short_help(cls.cmdname())
 
     def create_argparser(self) -> argparse.ArgumentParser:
         parser = argparse.ArgumentParser(
@@ -34,6 +43,11 @@ class ObjcCommnad(LLDBCommandBase):
         inherits_command.add_argument("object",
                                       type=str,
                                       help="object")
+        inherits_command.add_argument("--resolver",
+                                      choices=['auto', 'memory', 'expression'],
+                                      default='auto',
+                                      help="Read the runtime structures from memory, evaluate an expression, "
+                                           "or read memory and fall back to an expression")
 
         # methods
         method_command = subparsers.add_parser("methods",
@@ -48,6 +62,13 @@ class ObjcCommnad(LLDBCommandBase):
                                     help="Specify a target class in the inheritance hierarchy")
         method_command.add_argument("-c", "--class-only", action="store_true", help="Show only class methods")
         method_command.add_argument("-i", "--instance-only", action="store_true", help="Show only instance methods")
+        method_command.add_argument("--resolve",
+                                    action="store_true",
+                                    help="Show the image, symbol and source location of each implementation")
+        method_command.add_argument("-a", "--all-ancestors",
+                                    action="store_true",
+                                    help="Show the effective methods of the class and all its superclasses, "
+                                         "marking overrides and category methods")
 
         # properties
         properties_command = subparsers.add_parser("properties",
@@ -72,6 +93,76 @@ class ObjcCommnad(LLDBCommandBase):
                                    dest='class_name',
                                    type=str,
                                    help="Specify a target class in the inheritance hierarchy")
+        ivars_command.add_argument("-d", "--describe",
+                                   action="store_true",
+                                   help="Describe the values of object ivars (evaluates an expression)")
+
+        # search
+        search_command = subparsers.add_parser("search",
+                                               help="Search classes, selectors and properties of all images",
+                                               formatter_class=util.HelpFormatter)
+        search_command.add_argument("pattern",
+                                    type=str,
+                                    help="Regular expression (or prefix with --prefix) matched against names")
+        search_command.add_argument("--prefix", action="store_true", help="Match names starting with the pattern")
+        search_command.add_argument("-i", "--ignore-case", action="store_true", help="Ignore case")
+        search_command.add_argument("--type",
+                                    dest='kind',
+                                    choices=['class', 'method', 'property', 'all'],
+                                    default='all',
+                                    help="Kind of names to search")
+        search_command.add_argument("--image", type=str, help="Only images whose path contains the text")
+        search_command.add_argument("--limit", type=int, default=100, help="Maximum number of results (0 for no limit)")
+        search_command.add_argument("--rebuild", action="store_true", help="Scan all images again")
+
+        # classes
+        classes_command = subparsers.add_parser("classes",
+                                                help="List classes, categories, protocols and Swift types of images",
+                                                formatter_class=util.HelpFormatter)
+        classes_command.add_argument("pattern",
+                                     type=str,
+                                     nargs='?',
+                                     help="Regular expression matched against names")
+        classes_command.add_argument("--static",
+                                     action="store_true",
+                                     help="Read the Mach-O files of the images on the host instead of the runtime "
+                                          "(no process is needed)")
+        classes_command.add_argument("-i", "--ignore-case", action="store_true", help="Ignore case")
+        classes_command.add_argument("--type",
+                                     dest='kind',
+                                     choices=['class', 'category', 'protocol', 'swift', 'all'],
+                                     default='all',
+                                     help="Kind of declarations to list (other than class requires --static)")
+        classes_command.add_argument("--image", type=str, help="Only images whose path contains the text")
+        classes_command.add_argument("--limit", type=int, default=100, help="Maximum number of results (0 for no limit)")
+        classes_command.add_argument("--rebuild", action="store_true", help="Read all images again")
+
+        # trace
+        trace_command = subparsers.add_parser("trace",
+                                              help="Count calls of the methods of a class",
+                                              formatter_class=util.HelpFormatter)
+        trace_command.add_argument("object",
+                                   type=str,
+                                   nargs='?',
+                                   help="object whose class methods are traced. If omitted, the counts are shown")
+        trace_command.add_argument("--class",
+                                   dest='class_name',
+                                   type=str,
+                                   help="Specify a target class in the inheritance hierarchy")
+        trace_command.add_argument("-c", "--class-only", action="store_true", help="Trace only class methods")
+        trace_command.add_argument("-i", "--instance-only", action="store_true", help="Trace only instance methods")
+        trace_command.add_argument("--filter", type=str, help="Trace only selectors matching the regular expression")
+        trace_command.add_argument("--sample", type=int, default=1, help="Count only 1 in N calls to reduce the overhead")
+        trace_command.add_argument("--sort", choices=['count', 'name'], default='count', help="Order of the counts")
+        trace_command.add_argument("--limit", type=int, default=50, help="Maximum number of methods shown (0 for no limit)")
+        trace_command.add_argument("--stop", action="store_true", help="Remove the breakpoints and show the final counts")
+
+        # cache
+        cache_command = subparsers.add_parser("cache",
+                                              help="Show or clear cached class metadata",
+                                              formatter_class=util.HelpFormatter)
+        cache_command.add_argument("--clear", action="store_true", help="Drop all cached classes")
+        cache_command.add_argument("--list", action="store_true", help="List cached classes")
 
         return parser
 
@@ -82,9 +173,7 @@ class ObjcCommnad(LLDBCommandBase):
         exe_ctx: lldb.SBExecutionContext,
         result: lldb.SBCommandReturnObject
     ) -> None:
-        args: Union[list[str], argparse.Namespace] = shlex.split(command, posix=False)
-        args = self.argparser.parse_args(cast(list[str], args))
-        args = cast(argparse.Namespace, args)
+        args = self.parse_args(command)
 
         if args.subcommand == "methods":
             self.methods(args, debugger, result)
@@ -94,6 +183,14 @@ class ObjcCommnad(LLDBCommandBase):
             self.properties(args, debugger, result)
         elif args.subcommand == "ivars":
             self.ivars(args, debugger, result)
+        elif args.subcommand == "search":
+            self.search(args, debugger, result)
+        elif args.subcommand == "classes":
+            self.classes(args, debugger, result)
+        elif args.subcommand == "trace":
+            self.trace(args, debugger, result)
+        elif args.subcommand == "cache":
+            self.cache(args, debugger, result)
         else:
             self.argparser.print_help()
 
@@ -103,7 +200,7 @@ class ObjcCommnad(LLDBCommandBase):
         debugger: lldb.SBDebugger,
         result: lldb.SBCommandReturnObject
     ) -> None:
-        inherits = self.class_inherits(debugger, args.object)
+        inherits = self.class_inherits(debugger, args.object, args.resolver)
         result.AppendMessage(' -> '.join(inherits))
 
     def methods(
@@ -112,6 +209,10 @@ class ObjcCommnad(LLDBCommandBase):
         debugger: lldb.SBDebugger,
         result: lldb.SBCommandReturnObject
     ) -> None:
+        if args.all_ancestors:
+            self.ancestor_methods(args, debugger, result)
+            return
+
         class_info = self.class_info(
             debugger,
             args.object,
@@ -126,19 +227,76 @@ class ObjcCommnad(LLDBCommandBase):
             return
 
         show_all = (not args.class_only and not args.instance_only)
-        text = ""
+        sections: list[tuple[str, list[Method]]] = []
         if args.class_only or show_all:
-            text += "Class Methods\n"
-            text += '\n'.join(map(lambda m: f"    {m.name}", class_info.class_methods))
-            text += '\n'
-
+            sections.append(("Class Methods", class_info.class_methods))
         if args.instance_only or show_all:
-            text += "Instance Methods\n"
-            text += '\n'.join(map(lambda m: f"    {m.name}", class_info.instance_methods))
+            sections.append(("Instance Methods", class_info.instance_methods))
+
+        symbols: dict[int, objc_symbols.ResolvedSymbol] = {}
+        if args.resolve:
+            symbols = objc_symbols.symbol_resolver.resolve(
+                debugger,
+                [m.address for _, methods in sections for m in methods if m.address != 0]
+            )
+
+        text = ""
+        for title, methods in sections:
+            text += f"{title}\n"
+            if args.resolve:
+                text += '\n'.join(
+                    map(lambda m: f"    {m.name}  {symbols[m.address] if m.address in symbols else m.ptr}", methods)
+                )
+            else:
+                text += '\n'.join(map(lambda m: f"    {m.name}", methods))
             text += '\n'
 
         result.AppendMessage(text)
 
+    def ancestor_methods(
+        self,
+        args: argparse.Namespace,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        classes = self.class_ancestors(debugger, args.object, args.class_name)
+        if not classes:
+            if args.class_name is not None:
+                result.AppendMessage("Invalid class name")
+            else:
+                result.AppendMessage('Invalid object')
+            return
+
+        show_all = (not args.class_only and not args.instance_only)
+        sections: list[tuple[str, list[AncestorMethod]]] = []
+        if args.class_only or show_all:
+            sections.append(("Class Methods", AncestorMethod.effective_methods(classes, True)))
+        if args.instance_only or show_all:
+            sections.append(("Instance Methods", AncestorMethod.effective_methods(classes, False)))
+
+        addresses = [m.method.address for _, methods in sections for m in methods if m.method.address != 0]
+        images = objc_symbols.symbol_resolver.images(debugger, addresses)
+        symbols = objc_symbols.symbol_resolver.resolve(debugger, addresses) if args.resolve else {}
+
+        lines = []
+        for title, methods in sections:
+            lines.append(title)
+            current_class = None
+            for m in methods:
+                if m.class_name != current_class:
+                    current_class = m.class_name
+                    lines.append(f"  {current_class}")
+                address = m.method.address
+                line = f"    {m.method.name}"
+                if address in symbols:
+                    line += f"  {symbols[address]}"
+                notes = m.notes(images.get(address), symbols.get(address))
+                if notes:
+                    line += f"  [{'; '.join(notes)}]"
+                lines.append(line)
+
+        result.AppendMessage('\n'.join(lines) + '\n')
+
     def properties(
         self,
         args: argparse.Namespace,
@@ -173,13 +331,232 @@ class ObjcCommnad(LLDBCommandBase):
         ivars = self.class_ivars(
             debugger,
             args.object,
-            args.class_name
+            args.class_name,
+            args.describe
         )
 
         text = "Ivars:\n"
         text += '\n'.join(map(lambda v: f"    {v}", ivars))
         result.AppendMessage(text)
 
+    def search(
+        self,
+        args: argparse.Namespace,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        pattern_text = util.unquote(args.pattern)
+        if args.prefix:
+            pattern_text = '^' + re.escape(pattern_text)
+        try:
+            pattern = re.compile(pattern_text, re.IGNORECASE if args.ignore_case else 0)
+        except re.error as e:
+            result.SetError(f"Invalid pattern: {e}")
+            return
+
+        if args.rebuild:
+            objc_index.class_index.remove_saved(debugger)
+
+        tables = objc_index.class_index.tables(debugger, util.expression_policy(self.cmdname()))
+        if tables is None:
+            result.SetError("Failed to index classes")
+            return
+
+        groups = list(objc_index.KIND_GROUPS) if args.kind == 'all' else [args.kind]
+        image = util.unquote(args.image) if args.image is not None else None
+
+        matches: list[objc_index.SearchResult] = []
+        count = 0
+        names = 0
+        for group in groups:
+            table = tables[group]
+            names += len(table)
+            for index in table.search(pattern):
+                if image is not None and image not in table.image_paths[table.images[index]]:
+                    continue
+                count += 1
+                if args.limit <= 0 or len(matches) < args.limit:
+                    matches.append(table.result(index))
+
+        text = f"{count} matches in {names} names"
+        if len(matches) < count:
+            text += f" (showing {len(matches)})"
+        if matches:
+            text += '\n' + '\n'.join(map(lambda m: f"    {m}", matches))
+
+        result.AppendMessage(text)
+
+    def classes(
+        self,
+        args: argparse.Namespace,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        pattern: Optional[re.Pattern] = None
+        if args.pattern is not None:
+            try:
+                pattern = re.compile(util.unquote(args.pattern), re.IGNORECASE if args.ignore_case else 0)
+            except re.error as e:
+                result.SetError(f"Invalid pattern: {e}")
+                return
+        image = util.unquote(args.image) if args.image is not None else None
+
+        # (image path, lines) of each image
+        declarations: list[tuple[str, list[str]]] = []
+        unreadable: list[str] = []
+        if args.static:
+            if args.rebuild:
+                objc_static.static_class_list.remove_saved(debugger)
+            images, unreadable = objc_static.static_class_list.images(debugger, image)
+            for static_image in images:
+                lines: list[str] = []
+                if args.kind in ('class', 'all'):
+                    lines += [f"@interface {name}" for name in static_image.classes]
+                if args.kind in ('category', 'all'):
+                    lines += [f"@interface {name}" for name in static_image.categories]
+                if args.kind in ('protocol', 'all'):
+                    lines += [f"@protocol {name}" for name in static_image.protocols]
+                if args.kind in ('swift', 'all'):
+                    lines += [f"{kind} {name}" for kind, name in static_image.swift_types]
+                declarations.append((static_image.path, lines))
+        else:
+            if args.kind not in ('class', 'all'):
+                result.SetError(f"--type {args.kind} requires --static")
+                return
+            if args.rebuild:
+                objc_index.class_index.remove_saved(debugger)
+            tables = objc_index.class_index.tables(debugger, util.expression_policy(self.cmdname()))
+            if tables is None:
+                result.SetError("Failed to index classes")
+                return
+            table = tables['class']
+            by_image: dict[int, list[str]] = {}
+            for index in range(len(table)):
+                by_image.setdefault(table.images[index], []).append(f"@interface {table.names[index]}")
+            for image_index, path in enumerate(table.image_paths):
+                if image is None or image in path:
+                    declarations.append((path, by_image.get(image_index, [])))
+
+        count = 0
+        shown = 0
+        text_lines: list[str] = []
+        for path, lines in declarations:
+            if pattern is not None:
+                # Match the name, not the keyword
+                lines = [line for line in lines if pattern.search(line.partition(' ')[2])]
+            count += len(lines)
+            if not lines or (args.limit > 0 and shown >= args.limit):
+                continue
+            if args.limit > 0:
+                lines = lines[:args.limit - shown]
+            shown += len(lines)
+            text_lines.append(f"{os.path.basename(path)} ({path})")
+            text_lines += [f"    {line}" for line in lines]
+
+        text = f"{count} declarations in {len(declarations)} images"
+        if shown < count:
+            text += f" (showing {shown})"
+        if unreadable:
+            text += f", {len(unreadable)} images not found on the host"
+        result.AppendMessage('\n'.join([text] + text_lines))
+
+    def trace(
+        self,
+        args: argparse.Namespace,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        tracer = objc_trace.method_tracer
+
+        if args.object is not None:
+            try:
+                pattern = re.compile(util.unquote(args.filter)) if args.filter is not None else None
+            except re.error as e:
+                result.SetError(f"Invalid pattern: {e}")
+                return
+            if args.sample < 1:
+                result.SetError("--sample must be 1 or more")
+                return
+
+            metadata = self.class_metadata(debugger, args.object, args.class_name)
+            if metadata is None or metadata.metadata is None:
+                if args.class_name is not None:
+                    result.AppendMessage("Invalid class name")
+                else:
+                    result.AppendMessage('Invalid object')
+                return
+
+            class_name = metadata.metadata.name
+            info = metadata.metadata.class_info
+            methods: list[Method] = []
+            if not args.instance_only:
+                methods += info.class_methods
+            if not args.class_only:
+                methods += info.instance_methods
+            targets = [
+                (f"{m.name[0]}[{class_name} {m.selector}]", m.address)
+                for m in methods
+                if pattern is None or pattern.search(m.selector)
+            ]
+
+            created = tracer.start(debugger, targets, args.sample)
+            text = f"Tracing {created} implementations of {len(targets)} methods of {class_name}"
+            if args.sample > 1:
+                text += f" (counting 1 in {args.sample} calls)"
+            result.AppendMessage(text)
+            return
+
+        session = tracer.stop(debugger) if args.stop else tracer.session
+        if session is None:
+            result.AppendMessage("No methods are traced")
+            return
+
+        elapsed = session.elapsed()
+        traced = list(session.methods.values())
+        if args.sort == 'name':
+            traced.sort(key=lambda m: m.names[0])
+        else:
+            traced.sort(key=lambda m: (-m.estimated_hits, m.names[0]))
+        shown = traced if args.limit <= 0 else traced[:args.limit]
+
+        lines = [f"{sum(m.estimated_hits for m in traced)} calls of {len(traced)} implementations in {elapsed:.1f}s"]
+        lines.append(f"    {'calls':>10} {'calls/s':>10}  method")
+        for m in shown:
+            calls = f"~{m.estimated_hits}" if m.sample > 1 else str(m.hits)
+            rate = m.estimated_hits / elapsed if elapsed > 0 else 0.0
+            lines.append(f"    {calls:>10} {rate:>10.1f}  {', '.join(m.names)}")
+        if len(shown) < len(traced):
+            lines.append(f"    ({len(traced) - len(shown)} more)")
+        if args.stop:
+            lines.append("Breakpoints were removed")
+
+        result.AppendMessage('\n'.join(lines))
+
+    def cache(
+        self,
+        args: argparse.Namespace,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        cache = objc_cache.class_metadata_cache
+        cache.sync(debugger)
+        if args.clear:
+            cache.clear()
+
+        lookups = cache.hits + cache.misses
+        ratio = cache.hits / lookups * 100 if lookups > 0 else 0
+        text = "Class Metadata Cache\n"
+        text += f"    classes: {len(cache)} / {cache.capacity}\n"
+        text += f"    hits: {cache.hits}\n"
+        text += f"    misses: {cache.misses}\n"
+        text += f"    hit-ratio: {ratio:.1f}%\n"
+        text += f"    invalidations: {cache.invalidations}"
+        if args.list:
+            text += "\nClasses\n"
+            text += '\n'.join(map(lambda key: f"    {key[1]} ({key[2]})", cache.keys()))
+
+        result.AppendMessage(text)
+
     def class_info(
         self,
         debugger: lldb.SBDebugger,
@@ -203,37 +580,92 @@ class ObjcCommnad(LLDBCommandBase):
                 The parsed class information, including class methods, instance methods, and properties.
                 Returns None if the class name is invalid or the object is invalid.
         """
-        inherits = self.class_inherits(debugger, object)
-        if class_name is not None and class_name not in inherits:
+        metadata = self.class_metadata(debugger, object, class_name)
+        if metadata is not None:
+            return metadata.class_info
+
+        description = self.class_description(
+            debugger,
+            object,
+            class_name,
+            "__methodDescriptionForClass:"
+        )
+        if description is None:
             return None
-        if class_name is None:
-            class_name = inherits[-1]
 
-        script: str
+        return ClassInfoParser.parse(description)
 
-        language: int = lldb.eLanguageTypeObjC
-        if util.currentLanguage(debugger) == lldb.eLanguageTypeSwift:
-            script = f"""
-            {object}.perform(Selector(("__methodDescriptionForClass:")), with: NSClassFromString("{class_name}"))
-            """
-            language = lldb.eLanguageTypeSwift
-        else:
-            script = f"""
-            (NSString *)[{object} __methodDescriptionForClass: NSClassFromString(@"{class_name}")];
-            """
+    def class_ancestors(
+        self,
+        debugger: lldb.SBDebugger,
+        object: str,
+        class_name: Optional[str]
+    ) -> Optional[list['ClassMetadata']]:
+        """
+        Retrieves the metadata of a class and all its superclasses in a single injected routine.
+
+        Classes in `objc_cache.class_metadata_cache` are passed to the routine, which returns only
+        their names and images; the metadata of the other classes is read and cached.
+
+        Args:
+            debugger (lldb.SBDebugger): An instance of `lldb.SBDebugger` used for debugging.
+            object (str): The object, given as an address, a variable path or an expression.
+            class_name (Optional[str]):
+                The name of the class. It must be in the object's class hierarchy.
+                If not provided, the class of the object is used.
+
+        Returns:
+            Optional[list[ClassMetadata]]:
+                The metadata of each class from the class to the root class,
+                or None if the object or the class name is invalid.
+        """
+        address = util.object_address(debugger, object)
+        if address is None:
+            return None
+
+        cache = objc_cache.class_metadata_cache
+        process = cache.sync(debugger)
+        known = cache.classes(process) if process is not None else []
 
-        ret = util.exp_script(
+        records = util.exp_object(
             debugger,
-            script,
-            lang=language
+            ClassMetadata.script('objc/class_ancestors.m'),
+            lang=lldb.eLanguageTypeObjC,
+            policy=util.expression_policy(self.cmdname()),
+            arguments=[address, class_name, '\n'.join(f"{key[1]}\t{key[2]}" for key in known)],
+            cacheable=True
         )
+        if not isinstance(records, dict) or 'classes' not in records:
+            return None
+        inherits = list(map(objc_memory.demangle_class_name, records.get('inherits', [])))
+        if class_name is not None and objc_memory.demangle_class_name(class_name) not in inherits:
+            return None
 
-        return ClassInfoParser.parse(ret.GetObjectDescription())
+        classes: list[ClassMetadata] = []
+        for class_records in records['classes']:
+            metadata: Optional[ClassMetadata]
+            if 'classMethods' in class_records:
+                cache.miss()
+                metadata = ClassMetadata.from_records(class_records)
+                # Entries are keyed by the runtime name, which the routine compares with known classes
+                cache.store(debugger, address if not classes and class_name is None else None, class_records['name'], metadata.image, metadata)
+            elif process is not None:
+                key = (process, class_records.get('name', ''), class_records.get('image', ''))
+                metadata = cache.get(key)
+                if metadata is None:
+                    return None
+                cache.hit(key)
+            else:
+                return None
+            classes.append(metadata)
+
+        return classes
 
     def class_inherits(
         self,
         debugger: lldb.SBDebugger,
         object: str,
+        resolver: str = 'auto'
     ) -> list[str]:
         """
         Retrieve the class hierarchy of an object in Objective-C or Swift.
@@ -241,109 +673,441 @@ class ObjcCommnad(LLDBCommandBase):
         Args:
             debugger (lldb.SBDebugger): An instance of `lldb.SBDebugger` used for debugging.
             object (str): The name of the object for which to retrieve the class hierarchy.
+            resolver (str):
+                `memory` reads the isa and class structures from memory without running code (see `objc_memory`),
+                `expression` walks the hierarchy in an expression,
+                and `auto` reads memory and falls back to an expression.
 
         Returns:
             list[str]: A list of class names representing the class hierarchy of the object.
         """
+        if resolver in ('auto', 'memory'):
+            address = util.object_address(debugger, object)
+            resolved = objc_memory.class_resolver.class_hierarchy(debugger, address) if address is not None else None
+            if resolved is not None or resolver == 'memory':
+                return resolved or []
 
-        script: str
-
-        language: int = lldb.eLanguageTypeObjC_plus_plus
-        if util.currentLanguage(debugger) == lldb.eLanguageTypeSwift:
-            script = f"""
-            var currentClass: AnyClass? = object_getClass({object})
-            var result = String(describing: type(of: {object}))
-
-            while true {{
-                if let current = currentClass,
-                   let superClass = class_getSuperclass(current) {{
-                    result = "\\(String(describing: superClass)), " + result
-                    currentClass = superClass
-                }} else {{
-                    break
-                }}
-            }}
-
-            result
-            """
-            language = lldb.eLanguageTypeSwift
-        else:
-            script = f"""
-            Class currentClass = (Class)object_getClass({object});
-            NSMutableString *result = [NSMutableString stringWithFormat:@"%s", (char *)class_getName(currentClass)];
-
-            while ((currentClass = (Class)class_getSuperclass(currentClass))) {{
-                [result insertString:[NSString stringWithFormat:@"%s, ", (char *)class_getName(currentClass)] atIndex:0];
-            }}
-            result;
-            """
-
-        ret = util.exp_script(
+        results = self.class_batch(debugger, object).run(
             debugger,
-            script,
-            lang=language
+            policy=util.expression_policy(self.cmdname()),
+            cacheable=True
         )
-
-        if ret:
-            result: str = ret.asStr()
-            return result.split(', ')
-        else:
+        if results is None:
             return []
 
+        return list(map(objc_memory.demangle_class_name, results.get('inherits', [])))
+
     def class_ivars(
         self,
         debugger: lldb.SBDebugger,
         object: str,
-        class_name: Optional[str]
+        class_name: Optional[str],
+        describes_objects: bool = False
     ) -> list['IVar']:
-        inherits = self.class_inherits(debugger, object)
-        if class_name is not None and class_name not in inherits:
+        """
+        Retrieves the instance variables declared by a class with their values in an object.
+
+        Args:
+            debugger (lldb.SBDebugger): An instance of `lldb.SBDebugger` used for debugging.
+            object (str): The object, given as an address, a variable path or an expression.
+            class_name (Optional[str]): The name of the class. If not provided, the class of the object is used.
+            describes_objects (bool):
+                Whether to describe the values of object ivars, which requires evaluating an expression.
+                Otherwise, values are decoded from the object memory and objects are shown as pointers.
+
+        Returns:
+            list[IVar]: The instance variables.
+        """
+        metadata = self.class_metadata(debugger, object, class_name, reads_values=True, describes_objects=describes_objects)
+        if metadata is not None:
+            return metadata.ivars
+
+        description = self.class_description(
+            debugger,
+            object,
+            class_name,
+            "__ivarDescriptionForClass:"
+        )
+        if description is None:
             return []
-        if class_name is None:
-            class_name = inherits[-1]
 
-        script = ''
+        return IVarParser.parse(description)
 
-        language: int = lldb.eLanguageTypeObjC
-        if util.currentLanguage(debugger) == lldb.eLanguageTypeSwift:
-            script = f"""
-            {object}.perform(Selector(("__ivarDescriptionForClass:")), with: NSClassFromString("{class_name}"))
-            """
-            language = lldb.eLanguageTypeSwift
-        else:
-            script = f"""
-            (NSString *)[{object} __ivarDescriptionForClass: NSClassFromString(@"{class_name}")];
-            """
+    def class_metadata(
+        self,
+        debugger: lldb.SBDebugger,
+        object: str,
+        class_name: Optional[str],
+        reads_values: bool = False,
+        describes_objects: bool = False
+    ) -> Optional['ObjectMetadata']:
+        """
+        Retrieves the class hierarchy, methods, properties and ivars of a class
+        by walking the Objective-C runtime in a single injected routine.
 
-        ret = util.exp_script(
+        Class metadata is kept in `objc_cache.class_metadata_cache` until modules are loaded or unloaded.
+        When a cached class is expected, the class of the object is confirmed by reading the runtime
+        structures from memory (see `objc_memory`), and no expression is evaluated.
+        Otherwise the routine runs, skipping the metadata of a cached class.
+
+        Args:
+            debugger (lldb.SBDebugger): An instance of `lldb.SBDebugger` used for debugging.
+            object (str): The object, given as an address, a variable path or an expression.
+            class_name (Optional[str]):
+                The name of the class. It must be in the object's class hierarchy.
+                If not provided, the class of the object is used.
+            reads_values (bool): Whether to read the memory of the object to decode the values of its ivars.
+            describes_objects (bool): Whether to describe the values of object ivars in the routine.
+
+        Returns:
+            Optional[ObjectMetadata]:
+                The metadata. Its `metadata` is None if the class name is invalid.
+                None if the object cannot be resolved or the routine cannot be run.
+        """
+        address = util.object_address(debugger, object)
+        if address is None:
+            return None
+
+        info = util.platform_info(debugger)
+        arch = info.arch if info is not None else ''
+        # Tagged pointers have no object body
+        reads_values = reads_values and not objc_runtime.is_tagged_pointer(address, arch)
+        describes_objects = describes_objects and reads_values
+
+        cache = objc_cache.class_metadata_cache
+        cached = cache.lookup(debugger, address, class_name)
+
+        inherits: Optional[list[str]] = None
+        metadata: ClassMetadata
+        summaries: dict[str, str] = {}
+        if cached is not None and not describes_objects:
+            inherits = objc_memory.class_resolver.class_hierarchy(debugger, address)
+            known_name = objc_memory.demangle_class_name(cached[0][1])
+            if inherits is not None and (known_name in inherits if class_name is not None else inherits[-1] == known_name):
+                cache.hit(cached[0], address)
+                metadata = cached[1]
+            else:
+                inherits = None
+
+        if inherits is None:
+            known_class, known_image = (cached[0][1], cached[0][2]) if cached is not None else (None, None)
+            records = util.exp_object(
+                debugger,
+                ClassMetadata.script('objc/class_info.m'),
+                lang=lldb.eLanguageTypeObjC,
+                policy=util.expression_policy(self.cmdname()),
+                arguments=[address, class_name, describes_objects, known_class, known_image],
+                cacheable=True
+            )
+            if not isinstance(records, dict) or 'inherits' not in records:
+                return None
+
+            inherits = list(map(objc_memory.demangle_class_name, records['inherits']))
+            name: Optional[str] = records.get('name')
+            if name is None or (class_name is not None and objc_memory.demangle_class_name(class_name) not in inherits):
+                return ObjectMetadata(inherits, None)
+
+            if 'classMethods' in records:
+                cache.miss()
+                metadata = ClassMetadata.from_records(records)
+                cache.store(debugger, address, name, metadata.image, metadata)
+            elif cached is not None and (known_class, known_image) == (name, records.get('image')):
+                cache.hit(cached[0], address)
+                metadata = cached[1]
+            else:
+                return None
+
+            summaries = {
+                ivar_name: summary.replace('\\n', '\n').replace('\\t', '\t')
+                for ivar_name, summary in ClassMetadata.split(records.get('summaries', ''), 2)
+            }
+
+        body = b''
+        if reads_values:
+            # Only the part of the object up to the last ivar of the class is needed
+            body = util.read_memory(debugger, address, metadata.body_size) or b''
+        return ObjectMetadata(inherits, metadata, body, summaries)
+
+    def class_description(
+        self,
+        debugger: lldb.SBDebugger,
+        object: str,
+        class_name: Optional[str],
+        selector: str
+    ) -> Optional[str]:
+        """
+        Retrieves the class hierarchy and a description of a class in a single expression.
+
+        Args:
+            debugger (lldb.SBDebugger): An instance of `lldb.SBDebugger` used for debugging.
+            object (str): The name of the object.
+            class_name (Optional[str]):
+                The name of the class to describe. It must be in the object's class hierarchy.
+                If not provided, the class of the object is used.
+            selector (str): The private selector returning the description (e.g. `__methodDescriptionForClass:`).
+
+        Returns:
+            Optional[str]: The description, or None if the class name or the object is invalid.
+        """
+        batch = self.class_batch(debugger, object)
+        if batch.lang == lldb.eLanguageTypeSwift:
+            batch.add('description', f"""{{ () -> String? in
+                let targetClass: AnyClass? = __illdb_argString(0) != nil
+                    ? NSClassFromString(__illdb_argString(0)!)
+                    : object_getClass(__illdb_object)
+                guard let targetClass else {{ return nil }}
+                return __illdb_object.perform(Selector(("{selector}")), with: targetClass)?.takeUnretainedValue() as? String
+            }}()""")
+        else:
+            batch.add('description', f"""({{
+                Class targetClass = __illdb_arg_string(0) != nil
+                    ? NSClassFromString(__illdb_arg_string(0))
+                    : (Class)object_getClass(__illdb_object);
+                targetClass != nil ? (NSString *)[__illdb_object {selector} targetClass] : (NSString *)nil;
+            }})""")
+
+        results = batch.run(
             debugger,
-            script,
-            lang=language
+            policy=util.expression_policy(self.cmdname()),
+            arguments=[class_name],
+            cacheable=True
         )
+        if results is None:
+            return None
+
+        inherits = list(map(objc_memory.demangle_class_name, results.get('inherits', [])))
+        if class_name is not None and objc_memory.demangle_class_name(class_name) not in inherits:
+            return None
+
+        description: Optional[str] = results.get('description')
+        return description
 
-        return IVarParser.parse(ret.GetObjectDescription())
+    def class_batch(
+        self,
+        debugger: lldb.SBDebugger,
+        object: str
+    ) -> util.ProbeBatch:
+        """
+        Creates a probe batch binding the object and retrieving its class hierarchy as `inherits`.
 
+        Args:
+            debugger (lldb.SBDebugger): An instance of `lldb.SBDebugger` used for debugging.
+            object (str): The name of the object.
 
-from dataclasses import dataclass
+        Returns:
+            util.ProbeBatch: The batch in the language of the current frame.
+        """
+        if util.currentLanguage(debugger) == lldb.eLanguageTypeSwift:
+            batch = util.ProbeBatch(
+                lldb.eLanguageTypeSwift,
+                prelude=f"let __illdb_object = ({object}) as AnyObject"
+            )
+            batch.add('inherits', """{ () -> [String] in
+                var result = [NSStringFromClass(type(of: __illdb_object))]
+                var currentClass: AnyClass? = object_getClass(__illdb_object)
+                while let current = currentClass, let superClass = class_getSuperclass(current) {
+                    result.insert(NSStringFromClass(superClass), at: 0)
+                    currentClass = superClass
+                }
+                return result
+            }()""")
+        else:
+            batch = util.ProbeBatch(
+                lldb.eLanguageTypeObjC_plus_plus,
+                prelude=f"id __illdb_object = (id)({object});"
+            )
+            batch.add('inherits', """({
+                NSMutableArray *result = [NSMutableArray array];
+                Class currentClass = (Class)object_getClass(__illdb_object);
+                while (currentClass != nil) {
+                    [result insertObject:[NSString stringWithUTF8String:(char *)class_getName(currentClass)] atIndex:0];
+                    currentClass = (Class)class_getSuperclass(currentClass);
+                }
+                result;
+            })""")
+
+        return batch
+
+
+from dataclasses import dataclass, field
 import re
 
 
 @dataclass
 class Method:
+    """
+    Represents a method in Objective-C.
+
+    Attributes:
+        name (str): The declaration (e.g. `- (void) setFrame:(struct CGRect)arg1;`).
+        ptr (str): The address of the implementation in hex.
+        selector (str): The selector name, if known.
+        types (str): The type encoding, if known.
+        imp (int): The address of the implementation, if known.
+    """
+
     name: str
     ptr: str
+    selector: str = ''
+    types: str = ''
+    imp: int = 0
 
     def isClassMethod(self) -> bool:
         return self.name[0] == '+'
 
+    @property
+    def address(self) -> int:
+        """The address of the implementation, or 0 if unknown."""
+        if self.imp != 0:
+            return self.imp
+        try:
+            return int(self.ptr, 16)
+        except ValueError:
+            return 0
+
+    @cached_property
+    def signature(self) -> 'MethodSignature':
+        """The return type, selector and argument types, decoded on first access."""
+        if self.types:
+            type_names = objc_runtime.method_type_names(self.types)
+            return MethodSignature(type_names[0] if type_names else 'id', self.selector, type_names[3:])
+        return MethodSignature.parse(self.name)
+
     def __str__(self) -> str:
         return f"{self.name} ({self.ptr})"
 
 
+@dataclass(frozen=True)
+class MethodSignature:
+    """
+    The structured signature of a method.
+
+    Attributes:
+        return_type (str): The name of the return type.
+        selector (str): The selector name.
+        argument_types (tuple[str, ...]): The names of the argument types, excluding `self` and `_cmd`.
+    """
+
+    return_type: str
+    selector: str
+    argument_types: tuple[str, ...] = ()
+
+    # `+ (return type) label:(type)arg1 label:(type)arg2;`, with one level of nested parentheses in types
+    DECLARATION_PATTERN: ClassVar[re.Pattern] = re.compile(r'[+-] \(((?:[^()]|\([^()]*\))*)\) ?(.*);$')
+    ARGUMENT_PATTERN: ClassVar[re.Pattern] = re.compile(r'([^\s:]*):\(((?:[^()]|\([^()]*\))*)\)')
+
+    @classmethod
+    def parse(cls, declaration: str) -> 'MethodSignature':
+        """
+        Decodes a declaration in the style of `__methodDescriptionForClass:`.
+
+        Args:
+            declaration (str): The declaration (e.g. `- (void) setFrame:(struct CGRect)arg1;`).
+
+        Returns:
+            MethodSignature: The signature. Its fields are empty if the declaration cannot be decoded.
+        """
+        match = cls.DECLARATION_PATTERN.match(declaration)
+        if match is None:
+            return MethodSignature('', '')
+        return_type, body = match.groups()
+        if ':' not in body:
+            return MethodSignature(return_type, body)
+        arguments = cls.ARGUMENT_PATTERN.findall(body)
+        return MethodSignature(
+            return_type,
+            ''.join(label + ':' for label, _ in arguments),
+            tuple(type for _, type in arguments)
+        )
+
+
+@dataclass
+class AncestorMethod:
+    """
+    A method with the effective implementation for its selector in a class hierarchy.
+
+    Attributes:
+        method (Method): The method.
+        class_name (str): The name of the class supplying the implementation.
+        image (str): The path of the image defining the class.
+        overridden (Optional[str]): The nearest superclass also implementing the selector, if any.
+    """
+
+    method: Method
+    class_name: str
+    image: str
+    overridden: Optional[str] = None
+
+    @staticmethod
+    def effective_methods(classes: list['ClassMetadata'], is_class_method: bool) -> list['AncestorMethod']:
+        """
+        De-duplicates the methods of a class hierarchy by selector.
+
+        Args:
+            classes (list[ClassMetadata]): The classes from the subclass to the root class.
+            is_class_method (bool): Whether to list class methods instead of instance methods.
+
+        Returns:
+            list[AncestorMethod]:
+                The method supplying the implementation of each selector, grouped by class from the subclass.
+        """
+        # selector -> the nearest class implementing it, from the root class down
+        implementors: dict[str, str] = {}
+        overridden: list[dict[str, Optional[str]]] = []
+        for metadata in reversed(classes):
+            info = metadata.class_info
+            selectors: dict[str, Optional[str]] = {}
+            for m in (info.class_methods if is_class_method else info.instance_methods):
+                selectors[m.selector] = implementors.get(m.selector)
+            for selector in selectors:
+                implementors[selector] = metadata.name
+            overridden.insert(0, selectors)
+
+        methods = []
+        seen: set[str] = set()
+        for metadata, selectors in zip(classes, overridden):
+            info = metadata.class_info
+            for m in (info.class_methods if is_class_method else info.instance_methods):
+                if m.selector in seen:
+                    continue
+                seen.add(m.selector)
+                methods.append(AncestorMethod(m, metadata.name, metadata.image, selectors[m.selector]))
+        return methods
+
+    def notes(self, image: Optional[str], symbol: Optional[objc_symbols.ResolvedSymbol]) -> list[str]:
+        """
+        Returns the annotations of the method.
+
+        Args:
+            image (Optional[str]): The path of the image containing the implementation, if known.
+            symbol (Optional[objc_symbols.ResolvedSymbol]): The symbol of the implementation, if resolved.
+
+        Returns:
+            list[str]:
+                `overrides CLASS` for overrides, and `category NAME (IMAGE)` for implementations in a category
+                (named after the symbol) or in another image than the class.
+        """
+        notes = []
+        if self.overridden is not None:
+            notes.append(f"overrides {self.overridden}")
+
+        category_match = re.match(r'[-+]\[[^\s(]+\(([^)]*)\) ', symbol.symbol) if symbol is not None and symbol.symbol else None
+        other_image = image is not None and self.image != '' and image != self.image
+        if category_match is not None or other_image:
+            note = "category"
+            if category_match is not None:
+                note += f" {category_match.group(1)}"
+            if other_image and image is not None:
+                note += f" ({os.path.basename(image)})"
+            notes.append(note)
+        return notes
+
+
 @dataclass
 class Property:
     name: str
     dynamic: Optional[str]
+    attributes: str = ''
 
     def __str__(self) -> str:
         if self.dynamic:
@@ -391,6 +1155,9 @@ class ClassInfoParser:
     """
     This class is responsible for parsing a string representation of class information and converting it into a `ClassInfo` object.
 
+    Lines are read once and classified by their prefix. The return type, selector and argument types
+    of a method are decoded from its declaration when `Method.signature` is first accessed.
+
     Example Usage:
     ```python
     string = "		+ (void)classMethod1;\n		- (void)instanceMethod1;\n		@property (nonatomic, strong) NSString *property1;\n"
@@ -410,13 +1177,16 @@ class ClassInfoParser:
     Methods:
     - parse(string: str) -> ClassInfo:
         Parses the given string representation of class information and returns a `ClassInfo` object.
-    - parse_methods(lines: List[str], is_static: bool = False) -> List[Method]:
-        Parses the given list of lines and extracts the class methods or instance methods based on the value of the `is_static` parameter.
-    - parse_properties(lines: List[str]) -> List[Property]:
-        Parses the given list of lines and extracts the properties.
+    - parse_lines(lines: Iterable[str]) -> Iterator[Union[Method, Property]]:
+        Parses lines one by one and yields the methods and properties they declare.
+    - parse_method(line: str) -> Method:
+        Parses a method line.
+    - parse_property(line: str) -> Property:
+        Parses a property line.
     """
 
     @classmethod
+    @profiler.timed('decode')
     def parse(cls, string: str) -> ClassInfo:
         """
         Parses the given string representation of class information and returns a `ClassInfo` object.
@@ -427,10 +1197,15 @@ class ClassInfoParser:
         Returns:
             ClassInfo: The parsed `ClassInfo` object.
         """
-        lines = string.splitlines()
-        class_methods = cls.parse_methods(lines, is_static=True)
-        instance_methods = cls.parse_methods(lines, is_static=False)
-        properties = cls.parse_properties(lines)
+        class_methods = list[Method]()
+        instance_methods = list[Method]()
+        properties = list[Property]()
+
+        for item in cls.parse_lines(string.splitlines()):
+            if isinstance(item, Method):
+                (class_methods if item.name[0] == '+' else instance_methods).append(item)
+            else:
+                properties.append(item)
 
         return ClassInfo(
             class_methods=class_methods,
@@ -439,64 +1214,64 @@ class ClassInfoParser:
         )
 
     @classmethod
-    def parse_methods(
-        cls,
-        lines: list[str],
-        is_static: bool = False
-    ) -> list[Method]:
+    def parse_lines(cls, lines: Iterable[str]) -> Iterator[Union[Method, 'Property']]:
         """
-        Parses the given list of lines and extracts the class methods or instance methods based on the value of the `is_static` parameter.
+        Parses lines of a class description one by one.
 
         Args:
-            lines (list[str]): The list of lines to parse.
-            is_static (bool, optional): Indicates whether to parse class methods (True) or instance methods (False). Defaults to False.
+            lines (Iterable[str]): The lines. They may be produced lazily.
 
         Returns:
-            list[Method]: The list of parsed methods.
+            Iterator[Union[Method, Property]]: The methods and properties, in the order of the lines.
         """
-        operator = '+' if is_static else '-'
-        lines = list(filter(lambda l: l[0:5] == f'		{operator} (', lines))
-        lines = list(map(lambda l: l[2:], lines))
-        methods = list[Method]()
-
+        parse_method = cls.parse_method
+        parse_property = cls.parse_property
         for line in lines:
-            line = line.replace('	', '')
-            components = line.split('; ')
-            name = components[0] + ';'
-            ptr = components[1].replace('(', '').replace(')', '')
-
-            methods.append(Method(name, ptr))
-
-        return methods
+            if line.startswith(('\t\t+ (', '\t\t- (')):
+                yield parse_method(line)
+            elif '@property' in line:
+                yield parse_property(line)
 
     @classmethod
-    def parse_properties(cls, lines: list[str]) -> list[Property]:
+    def parse_method(cls, line: str) -> Method:
         """
-        Parses the given list of lines and extracts the properties.
+        Parses a method line (e.g. `\t\t- (void) setFrame:(struct CGRect)arg1; (0x1800a1b2c)`).
 
         Args:
-            lines (list[str]): The list of lines to parse.
+            line (str): The line.
 
         Returns:
-            list[Property]: The list of parsed properties.
+            Method: The method.
         """
-        lines = list(filter(lambda l: '@property' in l, lines))
-        lines = list(map(lambda l: l[2:], lines))
-        properties = list[Property]()
+        text = line[2:]
+        if '\t' in text:
+            text = text.replace('\t', '')
+        declaration, _, address = text.partition('; ')
+        return Method(declaration + ';', address.strip('()'))
 
-        for line in lines:
-            line = line.replace('	', '')
-            components = line.split('; ')
-            name = components[0] + ';'
-            name = name.replace(';;', ';')
+    @classmethod
+    def parse_property(cls, line: str) -> 'Property':
+        """
+        Parses a property line (e.g. `\t\t@property (nonatomic, copy) NSString* name;`).
+
+        Args:
+            line (str): The line.
 
-            dynamic: Optional[str] = None
-            if len(components) > 1:
-                dynamic = components[1].replace('( ', '').replace(' )', '')
+        Returns:
+            Property: The property.
+        """
+        text = line[2:]
+        if '\t' in text:
+            text = text.replace('\t', '')
+        components = text.split('; ')
+        name = components[0] + ';'
+        name = name.replace(';;', ';')
 
-            properties.append(Property(name, dynamic))
+        dynamic: Optional[str] = None
+        if len(components) > 1:
+            dynamic = components[1].replace('( ', '').replace(' )', '')
 
-        return properties
+        return Property(name, dynamic)
 
 
 @dataclass
@@ -508,11 +1283,15 @@ class IVar:
         name (str): The name of the instance variable.
         type (str): The type of the instance variable.
         value (str): The value of the instance variable.
+        encoding (str): The type encoding of the instance variable, if known.
+        offset (Optional[int]): The offset of the instance variable in the object, if known.
     """
 
     name: str
     type: str
     value: str
+    encoding: str = ''
+    offset: Optional[int] = None
 
     def __str__(self) -> str:
         """
@@ -530,6 +1309,7 @@ class IVarParser:
     """
 
     @classmethod
+    @profiler.timed('decode')
     def parse(cls, string: str) -> list:
         """
         Parses a string representation of Objective-C instance variables and returns a list of IVar objects.
@@ -553,15 +1333,17 @@ class IVarParser:
             NSString *
             @"UIWindow-0x10950ea70-0""
         """
-        lines = string.splitlines()
-
         ivars = list[IVar]()
+        # lines of the value of each ivar, joined once at the end
+        values = list[list[str]]()
 
-        for i, line in enumerate(lines):
+        for line in string.splitlines():
             if line.startswith('		'):
-                ivars[-1].value += f"\n{line}"
+                if values:
+                    values[-1].append(line)
             elif line.startswith('	}'):
-                ivars[-1].value += "\n	}"
+                if values:
+                    values[-1].append('	}')
             elif line.startswith('	'):
                 components = line.split(' ')
                 name = components[0].replace('	', '')
@@ -569,7 +1351,163 @@ class IVarParser:
                 type_match = re.search(r'\((.*?)\)', line)
                 if type_match is not None:
                     type = type_match.group(1)
-                    value = line[type_match.end() + 2:]
-                    ivars.append(IVar(name, type, value))
+                    ivars.append(IVar(name, type, ''))
+                    values.append([line[type_match.end() + 2:]])
+
+        for ivar, value in zip(ivars, values):
+            ivar.value = '\n'.join(value)
+
+        return ivars
+
+
+@dataclass
+class ClassMetadata:
+    """
+    Metadata of a class read from the Objective-C runtime by `objc/class_info.m`.
+    Methods, properties and the ivar layout are decoded from the records on first access.
+    Instances are shared through `objc_cache.class_metadata_cache`, so they must not be modified.
+
+    Attributes:
+        name (str): The name of the class (Swift classes are demangled to `Module.Name`).
+        image (str): The path of the image defining the class.
+        records (dict): The records of methods, properties and ivars returned by the routine.
+    """
+
+    name: str
+    image: str
+    records: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_records(cls, records: dict) -> 'ClassMetadata':
+        """
+        Creates metadata from the records returned by `objc/class_info.m`.
+
+        Args:
+            records (dict): The decoded result of the routine, including the metadata.
+
+        Returns:
+            ClassMetadata: The metadata.
+        """
+        return ClassMetadata(
+            objc_memory.demangle_class_name(records.get('name', '')),
+            records.get('image', ''),
+            {key: records[key] for key in ('classMethods', 'instanceMethods', 'properties', 'ivars') if key in records}
+        )
+
+    @cached_property
+    @profiler.timed('decode')
+    def class_info(self) -> ClassInfo:
+        """The methods and properties of the class."""
+        records = self.records
+        return ClassInfo(
+            class_methods=[
+                Method(objc_runtime.method_declaration(selector, types, True), f"0x{imp}", selector, types, int(imp, 16))
+                for selector, types, imp in self.split(records.get('classMethods', ''), 3)
+            ],
+            instance_methods=[
+                Method(objc_runtime.method_declaration(selector, types, False), f"0x{imp}", selector, types, int(imp, 16))
+                for selector, types, imp in self.split(records.get('instanceMethods', ''), 3)
+            ],
+            properties=[
+                Property(*objc_runtime.property_declaration(property_name, attributes), attributes)
+                for property_name, attributes in self.split(records.get('properties', ''), 2)
+            ]
+        )
+
+    @cached_property
+    @profiler.timed('decode')
+    def ivar_layout(self) -> list[tuple[str, str, objc_runtime.ObjcType, int]]:
+        """The name, type encoding, decoded type and offset of each instance variable declared by the class."""
+        return [
+            (ivar_name, encoding, objc_runtime.TypeEncodingParser.parse(encoding), int(offset))
+            for ivar_name, encoding, offset in self.split(self.records.get('ivars', ''), 3)
+        ]
+
+    @cached_property
+    def body_size(self) -> int:
+        """The number of bytes of an object up to the end of the last ivar declared by the class."""
+        return max(
+            (offset + objc_runtime.size_and_alignment(type)[0] for _, _, type, offset in self.ivar_layout),
+            default=0
+        )
+
+    @profiler.timed('decode')
+    def ivars(self, body: bytes, summaries: dict[str, str]) -> list[IVar]:
+        """
+        Returns the instance variables declared by the class with their values in an object.
 
+        Args:
+            body (bytes): The memory of the object. Empty if it could not be read.
+            summaries (dict[str, str]): Summaries of the object values by ivar name.
+
+        Returns:
+            list[IVar]: The instance variables.
+        """
+        ivars = []
+        for ivar_name, encoding, type, offset in self.ivar_layout:
+            if ivar_name in summaries:
+                value = summaries[ivar_name]
+            elif body:
+                value = objc_runtime.format_value(type, body, offset)
+            else:
+                value = '?'
+            ivars.append(IVar(ivar_name, str(type), value, encoding, offset))
         return ivars
+
+    @staticmethod
+    def script(file_name: str) -> str:
+        """
+        Returns a script reading class metadata, with the blocks of `objc/class_records.m` it uses prepended.
+
+        Args:
+            file_name (str): The script file relative to the `src` directory.
+
+        Returns:
+            str: The script.
+        """
+        return util.read_script_file('objc/class_records.m') + '\n' + util.read_script_file(file_name)
+
+    @staticmethod
+    def split(text: str, field_count: int) -> list[list[str]]:
+        """
+        Splits records transferred as lines of tab separated fields.
+
+        Args:
+            text (str): The records.
+            field_count (int): The number of fields of a record. Malformed records are skipped.
+
+        Returns:
+            list[list[str]]: The fields of each record.
+        """
+        return [
+            fields for fields in (line.split('\t') for line in text.split('\n'))
+            if len(fields) == field_count
+        ]
+
+
+@dataclass
+class ObjectMetadata:
+    """
+    The class metadata and the ivar values of an object.
+
+    Attributes:
+        inherits (list[str]): The class hierarchy of the object from the root class.
+        metadata (Optional[ClassMetadata]): The metadata of the class, or None if the class was not found.
+        body (bytes): The memory of the object, if read.
+        summaries (dict[str, str]): Summaries of the object values of ivars by name, if read.
+    """
+
+    inherits: list[str]
+    metadata: Optional[ClassMetadata]
+    body: bytes = b''
+    summaries: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def class_info(self) -> Optional[ClassInfo]:
+        return self.metadata.class_info if self.metadata is not None else None
+
+    @property
+    def ivars(self) -> list[IVar]:
+        if self.metadata is None:
+            return []
+        return self.metadata.ivars(self.body, self.summaries)
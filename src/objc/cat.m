@@ -4,18 +4,19 @@
 // #import <CoreFoundation/CoreFoundation.h>
 // #import <Foundation/Foundation.h>
 
-NSString *path = @"<FILE_PATH>";
-NSString *mode = @"<MODE>";
+NSString *path = __illdb_arg_string(0);
+NSString *mode = __illdb_arg_string(1);
 
 NSFileManager *fileManager = [NSFileManager defaultManager];
+NSMutableDictionary *__illdb_result = [NSMutableDictionary dictionary];
 
 BOOL isDirectory = NO;
 BOOL exists = [fileManager fileExistsAtPath:path isDirectory:&isDirectory];
 
 if (!exists) {
-  printf("`%s` is not existed", (char *)[path UTF8String]);
+  __illdb_result[@"error"] = [NSString stringWithFormat:@"`%@` is not existed", path];
 } else if (isDirectory) {
-  printf("`%s` is a directory", (char *)[path UTF8String]);
+  __illdb_result[@"error"] = [NSString stringWithFormat:@"`%@` is a directory", path];
 } else {
   if ([mode isEqualToString:@"plist"]) {
     CFURLRef fileURL = CFURLCreateWithFileSystemPath(
@@ -27,27 +28,28 @@ if (!exists) {
     CFPropertyListRef plist = CFPropertyListCreateWithStream(
         kCFAllocatorDefault, stream, 0, kCFPropertyListImmutable, NULL, NULL);
 
-    if (CFGetTypeID(plist) == CFDictionaryGetTypeID()) {
+    if (plist != NULL && CFGetTypeID(plist) == CFDictionaryGetTypeID()) {
       NSDictionary *plistDictionary = (__bridge NSDictionary *)plist;
-      printf("%s\n", (char *)[[plistDictionary description] UTF8String]);
+      __illdb_result[@"text"] = [plistDictionary description];
     } else {
-      printf("cannot loaded");
+      __illdb_result[@"error"] = @"cannot loaded";
+    }
+    if (plist != NULL) {
+      CFRelease(plist);
     }
-    CFRelease(plist);
     CFReadStreamClose(stream);
     CFRelease(stream);
     CFRelease(fileURL);
 
   } else {
     NSError *error = nil;
-    NSString *fileContents =
-        [NSString stringWithContentsOfFile:path
-                                  encoding:NSUTF8StringEncoding
-                                     error:&error];
+    NSData *fileContents = [NSData dataWithContentsOfFile:path
+                                                  options:0
+                                                    error:&error];
     if (fileContents) {
-      printf("%s\n", (char *)[fileContents UTF8String]);
+      __illdb_result[@"data"] = fileContents;
     } else {
-      printf("%s\n", (char *)[[error localizedDescription] UTF8String]);
+      __illdb_result[@"error"] = [error localizedDescription] ?: @"cannot loaded";
     }
   }
 }
@@ -0,0 +1,37 @@
+// objc/class_records.m is prepended (copyMethods, copyProperties, copyIvars).
+
+id object = (id)__illdb_arg_int(0);
+NSString *className = __illdb_arg_string(1);
+// Lines of "class\timage" the caller already has metadata for
+NSSet *knownClasses = [NSSet setWithArray:[__illdb_arg_string(2) componentsSeparatedByString:@"\n"]];
+
+NSMutableDictionary *__illdb_result = [NSMutableDictionary dictionary];
+
+NSMutableArray *inherits = [NSMutableArray array];
+for (Class current = (Class)object_getClass(object); current != nil;
+     current = (Class)class_getSuperclass(current)) {
+  [inherits insertObject:@(class_getName(current)) atIndex:0];
+}
+__illdb_result[@"inherits"] = inherits;
+
+// From the target class to the root class
+NSMutableArray *classes = [NSMutableArray array];
+Class targetClass = (className != nil) ? NSClassFromString(className)
+                                       : (Class)object_getClass(object);
+for (Class current = targetClass; current != nil; current = (Class)class_getSuperclass(current)) {
+  NSMutableDictionary *records = [NSMutableDictionary dictionary];
+  const char *imageName = class_getImageName(current);
+  records[@"name"] = @(class_getName(current));
+  records[@"image"] = (imageName != NULL) ? @(imageName) : @"";
+  [classes addObject:records];
+
+  if ([knownClasses containsObject:[NSString stringWithFormat:@"%@\t%@", records[@"name"], records[@"image"]]]) {
+    continue;
+  }
+
+  records[@"classMethods"] = copyMethods((Class)object_getClass((id)current));
+  records[@"instanceMethods"] = copyMethods(current);
+  records[@"properties"] = copyProperties(current);
+  records[@"ivars"] = copyIvars(current);
+}
+__illdb_result[@"classes"] = classes;
@@ -0,0 +1,82 @@
+@import Foundation;
+@import ObjectiveC;
+@import Darwin;
+
+// #import <Foundation/Foundation.h>
+// #import <objc/runtime.h>
+// #import <mach-o/dyld.h>
+// #import <mach-o/getsect.h>
+
+// Paths of the images to index, separated by newlines
+NSSet *wantedImages = [NSSet setWithArray:[__illdb_arg_string(0) componentsSeparatedByString:@"\n"]];
+
+NSMutableDictionary *__illdb_result = [NSMutableDictionary dictionary];
+
+// __TEXT ranges of the wanted images, to attribute methods (including category methods) by their IMP
+unsigned int wantedCount = 0;
+uintptr_t *textStarts = (uintptr_t *)calloc(_dyld_image_count() + 1, sizeof(uintptr_t));
+uintptr_t *textEnds = (uintptr_t *)calloc(_dyld_image_count() + 1, sizeof(uintptr_t));
+NSMutableArray *wantedRecords = [NSMutableArray array];
+for (uint32_t i = 0; i < _dyld_image_count(); i++) {
+  NSString *path = @(_dyld_get_image_name(i));
+  if (![wantedImages containsObject:path]) {
+    continue;
+  }
+  unsigned long size = 0;
+  uint8_t *text = getsegmentdata((const struct mach_header_64 *)_dyld_get_image_header(i), "__TEXT", &size);
+  NSMutableString *records = [NSMutableString string];
+  __illdb_result[path] = records;
+  textStarts[wantedCount] = (uintptr_t)text;
+  textEnds[wantedCount] = (uintptr_t)text + size;
+  [wantedRecords addObject:records];
+  wantedCount++;
+}
+
+// Lines of "C\tclass", "+\tclass\tselector", "-\tclass\tselector" and "p\tclass\tproperty"
+void (^appendMethods)(Class, const char *, const char *) = ^(Class cls, const char *className, const char *sign) {
+  unsigned int count = 0;
+  Method *methods = class_copyMethodList(cls, &count);
+  for (unsigned int i = 0; i < count; i++) {
+    uintptr_t imp = (uintptr_t)method_getImplementation(methods[i]);
+    for (unsigned int j = 0; j < wantedCount; j++) {
+      if (textStarts[j] <= imp && imp < textEnds[j]) {
+        [(NSMutableString *)wantedRecords[j] appendFormat:@"%s\t%s\t%s\n", sign, className, sel_getName(method_getName(methods[i]))];
+        break;
+      }
+    }
+  }
+  free(methods);
+};
+
+if (wantedCount > 0) {
+  unsigned int classCount = 0;
+  Class *classes = objc_copyClassList(&classCount);
+  for (unsigned int i = 0; i < classCount; i++) {
+    Class cls = classes[i];
+    const char *className = class_getName(cls);
+    const char *imageName = class_getImageName(cls);
+    // Classes created at runtime (NSKVONotifying_*, dynamic subclasses) belong to no image.
+    // Their methods would be attributed to the images of their IMPs, and saved indexes are shared across processes.
+    if (imageName == NULL) {
+      continue;
+    }
+    NSMutableString *records = __illdb_result[@(imageName)];
+
+    if (records != nil) {
+      [records appendFormat:@"C\t%s\n", className];
+      unsigned int propertyCount = 0;
+      objc_property_t *properties = class_copyPropertyList(cls, &propertyCount);
+      for (unsigned int j = 0; j < propertyCount; j++) {
+        [records appendFormat:@"p\t%s\t%s\n", className, property_getName(properties[j])];
+      }
+      free(properties);
+    }
+
+    appendMethods((Class)object_getClass((id)cls), className, "+");
+    appendMethods(cls, className, "-");
+  }
+  free(classes);
+}
+
+free(textStarts);
+free(textEnds);
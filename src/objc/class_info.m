@@ -0,0 +1,68 @@
+// objc/class_records.m is prepended (copyMethods, copyProperties, copyIvars).
+
+id object = (id)__illdb_arg_int(0);
+NSString *className = __illdb_arg_string(1);
+// Whether to describe the values of object ivars
+BOOL describesObjects = __illdb_arg_int(2) != 0;
+// The class the caller already has metadata for
+NSString *knownClassName = __illdb_arg_string(3);
+NSString *knownImageName = __illdb_arg_string(4);
+
+NSMutableDictionary *__illdb_result = [NSMutableDictionary dictionary];
+
+NSMutableArray *inherits = [NSMutableArray array];
+for (Class current = (Class)object_getClass(object); current != nil;
+     current = (Class)class_getSuperclass(current)) {
+  [inherits insertObject:@(class_getName(current)) atIndex:0];
+}
+__illdb_result[@"inherits"] = inherits;
+
+Class targetClass = (className != nil) ? NSClassFromString(className)
+                                       : (Class)object_getClass(object);
+
+if (targetClass != nil) {
+  const char *imageName = class_getImageName(targetClass);
+  __illdb_result[@"name"] = @(class_getName(targetClass));
+  __illdb_result[@"image"] = (imageName != NULL) ? @(imageName) : @"";
+
+  BOOL readsMetadata = !([knownClassName isEqualToString:__illdb_result[@"name"]] &&
+                         [knownImageName isEqualToString:__illdb_result[@"image"]]);
+
+  if (readsMetadata) {
+    __illdb_result[@"classMethods"] = copyMethods((Class)object_getClass((id)targetClass));
+    __illdb_result[@"instanceMethods"] = copyMethods(targetClass);
+    __illdb_result[@"properties"] = copyProperties(targetClass);
+    __illdb_result[@"ivars"] = copyIvars(targetClass);
+  }
+
+  if (describesObjects) {
+    unsigned int ivarCount = 0;
+    Ivar *ivars = class_copyIvarList(targetClass, &ivarCount);
+
+    // name, summary of the object value (tabs and newlines escaped)
+    NSMutableString *summaries = [NSMutableString string];
+    for (unsigned int i = 0; i < ivarCount; i++) {
+      const char *name = ivar_getName(ivars[i]);
+      const char *type = ivar_getTypeEncoding(ivars[i]);
+      if (name == NULL || type == NULL || type[0] != '@' || type[1] == '?') {
+        continue;
+      }
+      NSString *summary;
+      id value = object_getIvar(object, ivars[i]);
+      if (value == nil) {
+        summary = @"nil";
+      } else if ([value isKindOfClass:[NSString class]]) {
+        NSString *string = (NSString *)value;
+        summary = [NSString stringWithFormat:@"@\"%@\"",
+                   [string length] > 256 ? [[string substringToIndex:256] stringByAppendingString:@"..."] : string];
+      } else {
+        summary = [NSString stringWithFormat:@"<%s: %p>", object_getClassName(value), value];
+      }
+      summary = [[summary stringByReplacingOccurrencesOfString:@"\t" withString:@"\\t"]
+          stringByReplacingOccurrencesOfString:@"\n" withString:@"\\n"];
+      [summaries appendFormat:@"%s\t%@\n", name, summary];
+    }
+    free(ivars);
+    __illdb_result[@"summaries"] = summaries;
+  }
+}
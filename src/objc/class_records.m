@@ -0,0 +1,57 @@
+@import Foundation;
+@import ObjectiveC;
+
+// #import <Foundation/Foundation.h>
+// #import <objc/runtime.h>
+
+// Prepended to objc/class_info.m and objc/class_ancestors.m.
+// Records are lines of tab separated fields.
+// Selectors, type encodings and attributes never contain tabs or newlines.
+
+// selector, type encoding, IMP (hex)
+NSString *(^copyMethods)(Class) = ^NSString *(Class cls) {
+  unsigned int count = 0;
+  Method *methods = class_copyMethodList(cls, &count);
+  NSMutableString *records = [NSMutableString stringWithCapacity:count * 64];
+  for (unsigned int i = 0; i < count; i++) {
+    const char *types = method_getTypeEncoding(methods[i]);
+    [records appendFormat:@"%s\t%s\t%llx\n",
+                          sel_getName(method_getName(methods[i])),
+                          (types != NULL) ? types : "",
+                          (unsigned long long)method_getImplementation(methods[i])];
+  }
+  free(methods);
+  return records;
+};
+
+// name, attributes
+NSString *(^copyProperties)(Class) = ^NSString *(Class cls) {
+  unsigned int count = 0;
+  objc_property_t *properties = class_copyPropertyList(cls, &count);
+  NSMutableString *records = [NSMutableString stringWithCapacity:count * 64];
+  for (unsigned int i = 0; i < count; i++) {
+    const char *attributes = property_getAttributes(properties[i]);
+    [records appendFormat:@"%s\t%s\n",
+                          property_getName(properties[i]),
+                          (attributes != NULL) ? attributes : ""];
+  }
+  free(properties);
+  return records;
+};
+
+// name, type encoding, offset
+NSString *(^copyIvars)(Class) = ^NSString *(Class cls) {
+  unsigned int count = 0;
+  Ivar *ivars = class_copyIvarList(cls, &count);
+  NSMutableString *records = [NSMutableString stringWithCapacity:count * 64];
+  for (unsigned int i = 0; i < count; i++) {
+    const char *name = ivar_getName(ivars[i]);
+    const char *type = ivar_getTypeEncoding(ivars[i]);
+    [records appendFormat:@"%s\t%s\t%lld\n",
+                          (name != NULL) ? name : "",
+                          (type != NULL) ? type : "",
+                          (long long)ivar_getOffset(ivars[i])];
+  }
+  free(ivars);
+  return records;
+};
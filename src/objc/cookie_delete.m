@@ -1,11 +1,17 @@
 @import Foundation;
 
 // #import <Foundation/Foundation.h>
-// NSHTTPCookieStorage *storage = [NSHTTPCookieStorage sharedHTTPCookieStorage];
 
-NSString *domain = @"<DOMAIN>";
-NSString *name = @"<NAME>";
-NSString *path = @"<PATH>";
+NSString *groupIdentifier = __illdb_arg_string(0);
+NSString *domain = __illdb_arg_string(1);
+NSString *name = __illdb_arg_string(2);
+NSString *path = __illdb_arg_string(3);
+
+NSHTTPCookieStorage *storage =
+    (groupIdentifier != nil)
+        ? [NSHTTPCookieStorage
+              sharedCookieStorageForGroupContainerIdentifier:groupIdentifier]
+        : [NSHTTPCookieStorage sharedHTTPCookieStorage];
 
 NSArray *allCookies = [storage cookies];
 int matchedCount = 0;
@@ -22,6 +28,4 @@ for (NSHTTPCookie *cookie in allCookies) {
   }
 }
 
-if (matchedCount == 0) {
-  printf("%d Cookies was deleted\n", matchedCount);
-}
+NSNumber *__illdb_result = @(matchedCount);
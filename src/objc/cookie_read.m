@@ -1,16 +1,23 @@
 @import Foundation;
 
 // #import <Foundation/Foundation.h>
-// NSHTTPCookieStorage *storage = [NSHTTPCookieStorage sharedHTTPCookieStorage];
 
-NSString *domain = @"<DOMAIN>";
-NSString *name = @"<NAME>";
-NSString *path = @"<PATH>";
+NSString *groupIdentifier = __illdb_arg_string(0);
+NSString *domain = __illdb_arg_string(1);
+NSString *name = __illdb_arg_string(2);
+NSString *path = __illdb_arg_string(3);
+
+NSHTTPCookieStorage *storage =
+    (groupIdentifier != nil)
+        ? [NSHTTPCookieStorage
+              sharedCookieStorageForGroupContainerIdentifier:groupIdentifier]
+        : [NSHTTPCookieStorage sharedHTTPCookieStorage];
 
 NSArray *allCookies = [storage cookies];
-int matchedCount = 0;
+NSMutableArray *__illdb_result = [NSMutableArray array];
 
-printf("Cookie Information:\n");
+NSDateFormatter *dateFormatter = [[NSDateFormatter alloc] init];
+[dateFormatter setDateFormat:@"yyyy-MM-dd HH:mm:ss"];
 
 for (NSHTTPCookie *cookie in allCookies) {
   BOOL domainMatched =
@@ -19,24 +26,15 @@ for (NSHTTPCookie *cookie in allCookies) {
   BOOL pathMatched = (path == nil) || [cookie.path isEqualToString:path];
 
   if (domainMatched && nameMatched && pathMatched) {
-    printf("-------------------\n");
-
-    printf("  Name:    %s\n", (char *)[cookie.name UTF8String]);
-    printf("  Value:   %s\n", (char *)[cookie.value UTF8String]);
-    printf("  Domain:  %s\n", (char *)[cookie.domain UTF8String]);
-    printf("  Path:    %s\n", (char *)[cookie.path UTF8String]);
-    printf("  Secure:  %s\n", cookie.secure ? "True" : "False");
-
-    NSDateFormatter *dateFormatter = [[NSDateFormatter alloc] init];
-    [dateFormatter setDateFormat:@"yyyy-MM-dd HH:mm:ss"];
     NSString *formattedDate = [dateFormatter stringFromDate:cookie.expiresDate];
-    printf("  Expires: %s\n", (char *)[formattedDate UTF8String]);
 
-    printf("-------------------\n");
-    matchedCount++;
+    [__illdb_result addObject:@{
+      @"name" : cookie.name ?: @"",
+      @"value" : cookie.value ?: @"",
+      @"domain" : cookie.domain ?: @"",
+      @"path" : cookie.path ?: @"",
+      @"secure" : @(cookie.secure),
+      @"expires" : formattedDate ?: @"(null)"
+    }];
   }
 }
-
-if (matchedCount == 0) {
-  printf("  None\n");
-}
@@ -0,0 +1,187 @@
+import lldb
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+import util
+import objc_memory
+
+# (process key, class name, image path)
+ClassKey = tuple[tuple[int, int], str, str]
+
+
+class ClassMetadataCache:
+    """
+    Metadata of Objective-C classes, kept across stops of a process.
+
+    Classes do not change while the process is stopped and resumed, but loading an image
+    can add classes and categories, so all entries of a process are dropped when the target
+    broadcasts that modules were loaded. They are also dropped when modules were unloaded,
+    since an unloaded image may have added categories to classes of other images.
+
+    Attributes:
+        capacity (int): The maximum number of classes.
+        hits (int): The number of lookups that found an entry.
+        misses (int): The number of lookups that did not.
+        invalidations (int): The number of module load/unload events that dropped entries.
+    """
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[ClassKey, Any] = OrderedDict()
+        # (process key, object address) -> (class name, image path) seen last time
+        self._object_classes: dict[tuple[tuple[int, int], int], tuple[str, str]] = {}
+        self._listeners: dict[tuple[int, int], lldb.SBListener] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> list[ClassKey]:
+        return list(self._entries.keys())
+
+    def lookup(
+        self,
+        debugger: lldb.SBDebugger,
+        address: int,
+        class_name: Optional[str]
+    ) -> Optional[tuple[ClassKey, Any]]:
+        """
+        Finds the entry of the class that is expected for an object, without evaluating any expression.
+        The caller must confirm that the class and image still match (see `hit`/`miss`).
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            address (int): The address of the object.
+            class_name (Optional[str]): The name of the class, or None for the class of the object.
+
+        Returns:
+            Optional[tuple[ClassKey, Any]]: The key and the metadata, or None if no entry is expected to match.
+        """
+        process = self.sync(debugger)
+        if process is None:
+            return None
+
+        candidates: list[ClassKey]
+        if class_name is None:
+            known = self._object_classes.get((process, address))
+            candidates = [(process, *known)] if known is not None else []
+        else:
+            # Keys hold runtime names, while callers may give Swift classes as `Module.Name`
+            demangled = objc_memory.demangle_class_name(class_name)
+            candidates = [
+                key for key in reversed(self._entries) if key[0] == process and objc_memory.demangle_class_name(key[1]) == demangled
+            ]
+
+        for key in candidates:
+            if key in self._entries:
+                return (key, self._entries[key])
+        return None
+
+    def hit(self, key: ClassKey, address: Optional[int] = None) -> None:
+        """Records that the entry of `key` matched the class of the object at `address` (if given)."""
+        self.hits += 1
+        self._entries.move_to_end(key)
+        if address is not None:
+            self._object_classes[(key[0], address)] = (key[1], key[2])
+
+    def get(self, key: ClassKey) -> Optional[Any]:
+        """Returns the metadata stored under `key` without counting a lookup."""
+        return self._entries.get(key)
+
+    def classes(self, process: tuple[int, int]) -> list[ClassKey]:
+        """Returns the keys of the classes of a process."""
+        return [key for key in self._entries if key[0] == process]
+
+    def miss(self) -> None:
+        """Records that no entry matched."""
+        self.misses += 1
+
+    def store(self, debugger: lldb.SBDebugger, address: Optional[int], class_name: str, image: str, metadata: Any) -> None:
+        """
+        Stores the metadata of a class.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            address (Optional[int]): The address of the object the metadata was read from, or None for a superclass.
+            class_name (str): The name of the class.
+            image (str): The path of the image defining the class.
+            metadata (Any): The metadata.
+        """
+        process = self.sync(debugger)
+        if process is None:
+            return
+
+        self._listen(debugger, process)
+
+        key = (process, class_name, image)
+        self._entries[key] = metadata
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        if address is None:
+            return
+        if len(self._object_classes) > self.capacity * 16:
+            self._object_classes.clear()
+        self._object_classes[(process, address)] = (class_name, image)
+
+    def clear(self) -> None:
+        """Drops all entries. The counters are kept."""
+        self._entries.clear()
+        self._object_classes.clear()
+
+    def _listen(self, debugger: lldb.SBDebugger, process: tuple[int, int]) -> None:
+        if process in self._listeners:
+            return
+
+        listener = lldb.SBListener('iLLDB.objc.class-metadata')
+        target: lldb.SBTarget = debugger.GetSelectedTarget()
+        target.GetBroadcaster().AddListener(
+            listener,
+            lldb.SBTarget.eBroadcastBitModulesLoaded | lldb.SBTarget.eBroadcastBitModulesUnloaded
+        )
+        self._listeners[process] = listener
+
+    def sync(self, debugger: lldb.SBDebugger) -> Optional[tuple[int, int]]:
+        """
+        Drops entries invalidated by module events received since the last call.
+
+        Returns:
+            Optional[tuple[int, int]]: The key of the current process, or None if there is no live process.
+        """
+        process = util.process_key(debugger)
+
+        # Entries of processes that are gone are never looked up again
+        for gone in [key for key in self._listeners if key != process]:
+            del self._listeners[gone]
+            self._drop(lambda entry: entry[0] == gone)
+
+        listener = self._listeners.get(process) if process is not None else None
+        if listener is None:
+            return process
+
+        event = lldb.SBEvent()
+        while listener.GetNextEvent(event):
+            dropped = 0
+            if event.GetType() & (lldb.SBTarget.eBroadcastBitModulesLoaded | lldb.SBTarget.eBroadcastBitModulesUnloaded):
+                # Categories of a loaded image may extend any class, and those of an unloaded image may have
+                dropped = self._drop(lambda entry: entry[0] == process)
+            if dropped > 0:
+                self.invalidations += 1
+
+        return process
+
+    def _drop(self, predicate: Callable[[ClassKey], bool]) -> int:
+        keys = [key for key in self._entries if predicate(key)]
+        if not keys:
+            return 0
+        for key in keys:
+            del self._entries[key]
+        self._object_classes = {
+            object: known for object, known in self._object_classes.items()
+            if (object[0], *known) in self._entries
+        }
+        return len(keys)
+
+
+class_metadata_cache = ClassMetadataCache()
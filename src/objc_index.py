@@ -0,0 +1,363 @@
+import os
+import re
+import sys
+import gzip
+import json
+import lldb
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+import util
+import objc_memory
+from lldbhelper import profiler
+
+# Saved indexes of another version are built again (2: classes created at runtime are not indexed)
+INDEX_VERSION = 2
+
+# Kinds of records
+KIND_CLASS = 'C'
+KIND_CLASS_METHOD = '+'
+KIND_INSTANCE_METHOD = '-'
+KIND_PROPERTY = 'p'
+
+# searchable groups of kinds, each with its own symbol table
+KIND_GROUPS = {
+    'class': (KIND_CLASS,),
+    'method': (KIND_CLASS_METHOD, KIND_INSTANCE_METHOD),
+    'property': (KIND_PROPERTY,),
+}
+
+
+def cache_directory() -> str:
+    """
+    Returns the directory where image indexes are stored.
+    `ILLDB_CACHE_DIR` overrides the default (`~/Library/Caches/iLLDB` on macOS, `~/.cache/iLLDB` elsewhere).
+    """
+    if 'ILLDB_CACHE_DIR' in os.environ:
+        base = os.environ['ILLDB_CACHE_DIR']
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches/iLLDB')
+    else:
+        base = os.path.expanduser('~/.cache/iLLDB')
+    return os.path.join(base, 'objc-index')
+
+
+@dataclass
+class ImageIndex:
+    """
+    Classes, selectors and properties of an image.
+
+    Attributes:
+        path (str): The path of the image.
+        uuid (Optional[str]): The UUID of the image, or None if unknown.
+        records (str):
+            Lines of `C<TAB>class`, `+<TAB>class<TAB>selector`, `-<TAB>class<TAB>selector` and `p<TAB>class<TAB>property`,
+            as returned by `objc/class_index.m`. Methods are attributed to the image of their implementation,
+            so category methods belong to the image defining the category.
+    """
+
+    path: str
+    uuid: Optional[str]
+    records: str
+
+    @classmethod
+    def load(cls, path: str, uuid: str) -> Optional['ImageIndex']:
+        """
+        Loads the index of an image saved by `save`.
+
+        Args:
+            path (str): The path of the image in the current process.
+            uuid (str): The UUID of the image.
+
+        Returns:
+            Optional[ImageIndex]: The index, or None if it has not been saved or cannot be read.
+        """
+        file_path = os.path.join(cache_directory(), f"{uuid}.json.gz")
+        try:
+            with gzip.open(file_path, 'rt', encoding='utf-8') as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(content, dict) or content.get('version') != INDEX_VERSION:
+            return None
+        return ImageIndex(path, uuid, content.get('records', ''))
+
+    def save(self) -> None:
+        """Saves the index under its UUID. Errors are ignored since the index can be rebuilt."""
+        if self.uuid is None:
+            return
+        directory = cache_directory()
+        file_path = os.path.join(directory, f"{self.uuid}.json.gz")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with gzip.open(file_path + '.tmp', 'wt', encoding='utf-8') as file:
+                json.dump({'version': INDEX_VERSION, 'image': self.path, 'records': self.records}, file)
+            os.replace(file_path + '.tmp', file_path)
+        except OSError as e:
+            print(f"[iLLDB] failed to save the class index of {self.path}: {e}")
+
+
+@dataclass
+class SearchResult:
+    """
+    A class, method or property matching a query.
+
+    Attributes:
+        kind (str): One of `C` (class), `+` (class method), `-` (instance method) and `p` (property).
+        class_name (str): The name of the class.
+        name (str): The name of the class, selector or property.
+        image (str): The path of the image.
+    """
+
+    kind: str
+    class_name: str
+    name: str
+    image: str
+
+    def __str__(self) -> str:
+        image_name = os.path.basename(self.image)
+        if self.kind == KIND_CLASS:
+            return f"{self.class_name} ({image_name})"
+        elif self.kind == KIND_PROPERTY:
+            return f"@property {self.class_name}.{self.name} ({image_name})"
+        return f"{self.kind}[{self.class_name} {self.name}] ({image_name})"
+
+
+@dataclass
+class SymbolTable:
+    """
+    The searchable names of a group of kinds in all indexed images.
+    Names are joined into one text so that a query is a single regular expression scan.
+
+    Attributes:
+        kinds (list[str]): The kind of each entry.
+        class_names (list[str]): The class of each entry.
+        names (list[str]): The searched name of each entry.
+        images (list[int]): The index in `image_paths` of each entry.
+        image_paths (list[str]): The paths of the images.
+        text (str): The names joined with newlines.
+        starts (list[int]): The offset of each name in `text`.
+    """
+
+    kinds: list[str] = field(default_factory=list)
+    class_names: list[str] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    images: list[int] = field(default_factory=list)
+    image_paths: list[str] = field(default_factory=list)
+    text: str = ''
+    starts: list[int] = field(default_factory=list)
+
+    @classmethod
+    @profiler.timed('decode')
+    def build(cls, indexes: list[ImageIndex]) -> dict[str, 'SymbolTable']:
+        """
+        Builds a table for each group of `KIND_GROUPS`.
+
+        Args:
+            indexes (list[ImageIndex]): The indexes of the images.
+
+        Returns:
+            dict[str, SymbolTable]: The tables by group name.
+        """
+        tables = {group: SymbolTable() for group in KIND_GROUPS}
+        by_kind = {kind: tables[group] for group, kinds in KIND_GROUPS.items() for kind in kinds}
+        image_paths = [index.path for index in indexes]
+        for image_index, index in enumerate(indexes):
+            for line in index.records.split('\n'):
+                fields = line.split('\t')
+                if len(fields) == 2 and fields[0] == KIND_CLASS:
+                    fields.append(fields[1])
+                elif len(fields) != 3 or fields[0] not in by_kind:
+                    continue
+                # Swift classes are named `Module.Name` as in the other commands, not by their runtime name
+                class_name = objc_memory.demangle_class_name(fields[1])
+                table = by_kind[fields[0]]
+                table.kinds.append(fields[0])
+                table.class_names.append(class_name)
+                table.names.append(class_name if fields[0] == KIND_CLASS else fields[2])
+                table.images.append(image_index)
+
+        for table in tables.values():
+            table.finish(image_paths)
+        return tables
+
+    def finish(self, image_paths: list[str]) -> None:
+        self.image_paths = image_paths
+
+        self.text = '\n'.join(self.names)
+        offset = 0
+        for name in self.names:
+            self.starts.append(offset)
+            offset += len(name) + 1
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, pattern: re.Pattern) -> Iterator[int]:
+        """
+        Finds the entries whose name matches a pattern (`re.search` semantics, `^` and `$` anchor to the name).
+
+        Args:
+            pattern (re.Pattern): The pattern.
+
+        Returns:
+            Iterator[int]: The indexes of the matching entries, in index order.
+        """
+        text_pattern: Optional[re.Pattern] = None
+        if '\\A' not in pattern.pattern and '\\Z' not in pattern.pattern:
+            try:
+                # `^` and `$` match at the boundaries of each name in the joined text
+                text_pattern = re.compile(pattern.pattern, pattern.flags | re.MULTILINE)
+            except re.error:
+                pass
+
+        if text_pattern is not None:
+            found = []
+            position = 0
+            crossed = False
+            while position <= len(self.text):
+                match = text_pattern.search(self.text, position)
+                if match is None:
+                    break
+                if '\n' in match.group():
+                    # The pattern can match across names
+                    crossed = True
+                    break
+                index = bisect_right(self.starts, match.start()) - 1
+                if pattern.search(self.names[index]):
+                    found.append(index)
+                position = self.starts[index + 1] if index + 1 < len(self.starts) else len(self.text) + 1
+            if not crossed:
+                yield from found
+                return
+
+        for index, name in enumerate(self.names):
+            if pattern.search(name):
+                yield index
+
+    def result(self, index: int) -> SearchResult:
+        return SearchResult(
+            self.kinds[index],
+            self.class_names[index],
+            self.names[index],
+            self.image_paths[self.images[index]]
+        )
+
+
+class ClassIndex:
+    """
+    An index of the classes, selectors and properties of every image of a process.
+
+    Images are scanned by `objc/class_index.m` only once: their indexes are kept in memory
+    and saved to disk under the image UUID, so an unchanged framework is never scanned again,
+    even in another debug session.
+    """
+
+    def __init__(self) -> None:
+        # image UUID -> index
+        self._by_uuid: dict[str, ImageIndex] = {}
+        # process key -> image path -> index
+        self._by_process: dict[tuple[int, int], dict[str, ImageIndex]] = {}
+        self._tables: Optional[dict[str, SymbolTable]] = None
+        self._table_key: Optional[tuple[tuple[int, int], frozenset[str]]] = None
+
+    def tables(self, debugger: lldb.SBDebugger, policy: util.ExpressionPolicy) -> Optional[dict[str, SymbolTable]]:
+        """
+        Returns the symbol tables of the current process, scanning the images that are not indexed yet.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            policy (util.ExpressionPolicy): The policy of the scanning expression.
+
+        Returns:
+            Optional[dict[str, SymbolTable]]:
+                The table of each group of `KIND_GROUPS`, or None if there is no live process or scanning failed.
+        """
+        process = util.process_key(debugger)
+        if process is None:
+            return None
+
+        modules = self.modules(debugger)
+        key = (process, frozenset(modules))
+        if self._tables is not None and self._table_key == key:
+            return self._tables
+
+        indexes = self._by_process.setdefault(process, {})
+        for gone in [p for p in self._by_process if p != process]:
+            del self._by_process[gone]
+
+        for path, uuid in modules.items():
+            if path in indexes or uuid is None:
+                continue
+            index = self._by_uuid.get(uuid) or ImageIndex.load(path, uuid)
+            if index is not None:
+                indexes[path] = ImageIndex(path, uuid, index.records)
+                self._by_uuid[uuid] = indexes[path]
+
+        missing = [path for path in modules if path not in indexes]
+        if missing:
+            records = util.exp_object(
+                debugger,
+                util.read_script_file('objc/class_index.m'),
+                lang=lldb.eLanguageTypeObjC,
+                policy=policy,
+                arguments=['\n'.join(missing)]
+            )
+            if not isinstance(records, dict):
+                return None
+            if not any(path in records for path in missing):
+                # Paths of the modules that do not match dyld's would all be indexed as empty
+                print(f"[iLLDB] dyld has none of the {len(missing)} images to index (e.g. {missing[0]})")
+                return None
+            for path in missing:
+                uuid = modules[path]
+                # Images unknown to dyld (e.g. not loaded yet) are indexed as empty until the module list changes
+                index = ImageIndex(path, uuid, records.get(path, ''))
+                indexes[path] = index
+                if path in records and uuid is not None:
+                    self._by_uuid[uuid] = index
+                    index.save()
+
+        self._tables = SymbolTable.build([indexes[path] for path in modules])
+        self._table_key = key
+        return self._tables
+
+    def modules(self, debugger: lldb.SBDebugger) -> dict[str, Optional[str]]:
+        """
+        Returns the UUIDs of the modules of the selected target by their path in the process
+        (see `util.image_path`), which is how dyld and `class_getImageName` name images.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+
+        Returns:
+            dict[str, Optional[str]]: The UUID of each module, or None if it has none.
+        """
+        return util.module_uuids(debugger)
+
+    def clear(self) -> None:
+        """Drops the indexes in memory. Saved indexes are kept."""
+        self._by_uuid.clear()
+        self._by_process.clear()
+        self._tables = None
+        self._table_key = None
+
+    def remove_saved(self, debugger: lldb.SBDebugger) -> None:
+        """
+        Drops the indexes in memory and removes the saved indexes of the modules of the selected target,
+        so that they are scanned again.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+        """
+        for uuid in self.modules(debugger).values():
+            if uuid is None:
+                continue
+            try:
+                os.remove(os.path.join(cache_directory(), f"{uuid}.json.gz"))
+            except OSError:
+                pass
+        self.clear()
+
+
+class_index = ClassIndex()
@@ -0,0 +1,256 @@
+import re
+import lldb
+from dataclasses import dataclass
+from typing import Optional
+import util
+import objc_runtime
+from lldbhelper import profiler
+
+# Layout of the Objective-C runtime (objc4) on 64-bit targets
+CLASS_SUPERCLASS_OFFSET = 8
+CLASS_BITS_OFFSET = 32
+FAST_DATA_MASK = 0x00007ffffffffff8
+RW_REALIZED = 1 << 31
+RW_RO_OR_RW_EXT_OFFSET = 8
+RO_NAME_OFFSET = 24
+
+# Strip pointer authentication codes and tag bits from pointers stored in class structures
+POINTER_MASK = 0x00007ffffffffff8
+# for pointers that are not 8-byte aligned, such as class names
+ADDRESS_MASK = 0x00007fffffffffff
+
+# ISA masks used when `objc_debug_isa_class_mask` cannot be read
+ISA_MASKS = {
+    'x86_64': 0x00007ffffffffff8,
+    'arm64': 0x0000000ffffffff8,
+    'arm64e': 0x007ffffffffffff8,
+    # arm64 simulators and macOS use the arm64e layout
+    'arm64-simulator': 0x007ffffffffffff8,
+    'arm64-macos': 0x007ffffffffffff8,
+}
+
+MAX_CLASS_NAME_LENGTH = 1024
+MAX_HIERARCHY_DEPTH = 64
+
+
+@dataclass(frozen=True)
+class ClassRecord:
+    """
+    A class read from memory.
+
+    Attributes:
+        name (str): The class name (Swift classes are demangled to `Module.Name`).
+        superclass (int): The address of the superclass, or 0 for root classes.
+    """
+
+    name: str
+    superclass: int
+
+
+def demangle_class_name(name: str) -> str:
+    """
+    Demangles the Objective-C name of a Swift class (e.g. `_TtC5MyApp14ViewController` -> `MyApp.ViewController`).
+    Names in other forms are returned as they are.
+
+    Args:
+        name (str): The name returned by the runtime.
+
+    Returns:
+        str: The demangled name.
+    """
+    match = re.fullmatch(r'_TtC(C*)(.*)', name)
+    if match is None:
+        return name
+    rest = match.group(2)
+    components = []
+    count = len(match.group(1)) + 1
+    if rest.startswith('s'):
+        # The standard library is abbreviated
+        components.append('Swift')
+        rest = rest[1:]
+    else:
+        count += 1
+    # module name (unless abbreviated), then one name per nested class
+    for _ in range(count):
+        length_match = re.match(r'(\d+)', rest)
+        if length_match is None:
+            return name
+        length = int(length_match.group(1))
+        start = length_match.end()
+        components.append(rest[start:start + length])
+        rest = rest[start + length:]
+    if rest != '' or any(c == '' for c in components):
+        return name
+    return '.'.join(components)
+
+
+class ClassResolver:
+    """
+    Resolves the class hierarchy of objects by reading the runtime structures with `SBProcess.ReadMemory`.
+
+    No expression is evaluated, so the process never resumes and crash dumps (core files) work too.
+    Classes defined in images are cached by address for the lifetime of the process;
+    classes allocated at runtime (KVO, generic Swift classes, ...) can be disposed and are always read again.
+
+    Attributes:
+        memory_reads (int): The number of memory reads performed.
+    """
+
+    def __init__(self) -> None:
+        self.memory_reads = 0
+        self._process: Optional[tuple[int, int]] = None
+        self._isa_mask: Optional[int] = None
+        self._classes: dict[int, ClassRecord] = {}
+
+    def class_hierarchy(self, debugger: lldb.SBDebugger, address: int) -> Optional[list[str]]:
+        """
+        Returns the class hierarchy of an object.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            address (int): The address of the object.
+
+        Returns:
+            Optional[list[str]]:
+                The class names from the root class, or None if the object is a tagged pointer
+                or its memory cannot be read.
+        """
+        with profiler.phase('memory_read'):
+            return self._class_hierarchy(debugger, address)
+
+    def _class_hierarchy(self, debugger: lldb.SBDebugger, address: int) -> Optional[list[str]]:
+        process_key = util.process_key(debugger)
+        if process_key is None or address == 0:
+            return None
+        if process_key != self._process:
+            self._process = process_key
+            self._isa_mask = None
+            self._classes.clear()
+
+        target: lldb.SBTarget = debugger.GetSelectedTarget()
+        process: lldb.SBProcess = target.GetProcess()
+
+        info = util.platform_info(debugger)
+        if objc_runtime.is_tagged_pointer(address, info.arch if info is not None else ''):
+            return None
+
+        isa = self.read_pointer(process, address)
+        if isa is None:
+            return None
+        current = isa & self.isa_mask(debugger)
+
+        names: list[str] = []
+        while current != 0:
+            if len(names) >= MAX_HIERARCHY_DEPTH:
+                return None
+            record = self.class_record(target, process, current)
+            if record is None:
+                return None
+            names.insert(0, record.name)
+            current = record.superclass
+        return names
+
+    def class_record(self, target: lldb.SBTarget, process: lldb.SBProcess, address: int) -> Optional[ClassRecord]:
+        """
+        Reads the name and superclass of a class.
+
+        Args:
+            target (lldb.SBTarget): The target.
+            process (lldb.SBProcess): The process.
+            address (int): The address of the class.
+
+        Returns:
+            Optional[ClassRecord]: The class, or None if its memory cannot be read.
+        """
+        if address in self._classes:
+            return self._classes[address]
+
+        superclass = self.read_pointer(process, address + CLASS_SUPERCLASS_OFFSET)
+        bits = self.read_pointer(process, address + CLASS_BITS_OFFSET)
+        if superclass is None or bits is None:
+            return None
+
+        data = bits & FAST_DATA_MASK
+        flags = self.read_uint32(process, data)
+        if flags is None:
+            return None
+        ro = data
+        if flags & RW_REALIZED:
+            ro_or_rw_ext = self.read_pointer(process, data + RW_RO_OR_RW_EXT_OFFSET)
+            if ro_or_rw_ext is None:
+                return None
+            if ro_or_rw_ext & 1:
+                # class_rw_ext_t, whose first member is the class_ro_t
+                ro_or_rw_ext = self.read_pointer(process, ro_or_rw_ext & ~1)
+                if ro_or_rw_ext is None:
+                    return None
+            ro = ro_or_rw_ext & POINTER_MASK
+
+        name_address = self.read_pointer(process, ro + RO_NAME_OFFSET)
+        if name_address is None:
+            return None
+        name = self.read_string(process, name_address & ADDRESS_MASK)
+        if name is None:
+            return None
+
+        record = ClassRecord(demangle_class_name(name), superclass & POINTER_MASK)
+        # Classes allocated at runtime may be disposed and their memory reused
+        if target.ResolveLoadAddress(address).GetModule().IsValid():
+            self._classes[address] = record
+        return record
+
+    def isa_mask(self, debugger: lldb.SBDebugger) -> int:
+        """
+        Returns the mask extracting the class pointer from an isa.
+        It is read from `objc_debug_isa_class_mask` in libobjc, or chosen by architecture if the symbol is unavailable.
+        """
+        if self._isa_mask is not None:
+            return self._isa_mask
+
+        target: lldb.SBTarget = debugger.GetSelectedTarget()
+        process: lldb.SBProcess = target.GetProcess()
+        symbols: lldb.SBSymbolContextList = target.FindSymbols('objc_debug_isa_class_mask', lldb.eSymbolTypeData)
+        for i in range(symbols.GetSize()):
+            symbol: lldb.SBSymbol = symbols.GetContextAtIndex(i).GetSymbol()
+            mask = self.read_pointer(process, symbol.GetStartAddress().GetLoadAddress(target))
+            if mask:
+                self._isa_mask = mask
+                return mask
+
+        info = util.platform_info(debugger)
+        arch = info.arch if info is not None else ''
+        if arch == 'arm64' and info is not None and info.is_simulator:
+            arch = 'arm64-simulator'
+        elif arch == 'arm64' and info is not None and info.is_macos:
+            arch = 'arm64-macos'
+        self._isa_mask = ISA_MASKS.get(arch, ISA_MASKS['arm64e'])
+        return self._isa_mask
+
+    def read_pointer(self, process: lldb.SBProcess, address: int) -> Optional[int]:
+        error = lldb.SBError()
+        value: int = process.ReadPointerFromMemory(address, error)
+        self.memory_reads += 1
+        profiler.count('memory_reads')
+        return value if error.Success() else None
+
+    def read_uint32(self, process: lldb.SBProcess, address: int) -> Optional[int]:
+        error = lldb.SBError()
+        value: int = process.ReadUnsignedFromMemory(address, 4, error)
+        self.memory_reads += 1
+        profiler.count('memory_reads')
+        return value if error.Success() else None
+
+    def read_string(self, process: lldb.SBProcess, address: int) -> Optional[str]:
+        error = lldb.SBError()
+        value: Optional[str] = process.ReadCStringFromMemory(address, MAX_CLASS_NAME_LENGTH, error)
+        self.memory_reads += 1
+        profiler.count('memory_reads')
+        return value if error.Success() and value else None
+
+    def clear(self) -> None:
+        """Drops the cached classes."""
+        self._classes.clear()
+        self._isa_mask = None
+
+
+class_resolver = ClassResolver()
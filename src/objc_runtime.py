@@ -0,0 +1,482 @@
+import re
+import struct
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Optional
+
+# code -> (C type name, size, struct format)
+SCALAR_TYPES = {
+    'c': ('char', 1, 'b'),
+    'i': ('int', 4, 'i'),
+    's': ('short', 2, 'h'),
+    'l': ('long', 4, 'i'),
+    'q': ('long long', 8, 'q'),
+    'C': ('unsigned char', 1, 'B'),
+    'I': ('unsigned int', 4, 'I'),
+    'S': ('unsigned short', 2, 'H'),
+    'L': ('unsigned long', 4, 'I'),
+    'Q': ('unsigned long long', 8, 'Q'),
+    'f': ('float', 4, 'f'),
+    'd': ('double', 8, 'd'),
+    'D': ('long double', 16, ''),
+    'B': ('BOOL', 1, '?'),
+    'v': ('void', 0, ''),
+}
+
+# const, in, inout, out, bycopy, byref, oneway, atomic, complex
+TYPE_QUALIFIERS = 'rnNoORVAj'
+
+POINTER_SIZE = 8
+
+
+@dataclass
+class ObjcType:
+    """
+    A type decoded from an Objective-C type encoding.
+
+    Attributes:
+        kind (str):
+            One of `scalar`, `object`, `block`, `class`, `selector`, `cstring`, `pointer`,
+            `struct`, `union`, `array`, `bitfield` and `unknown`.
+        code (str): The encoding character of scalars.
+        name (str): The class name of objects (or `<Protocol>`), or the tag of structs and unions.
+        fields (list[ObjcType]): The fields of structs and unions.
+        field_names (list[str]): The names of the fields, if encoded.
+        element (Optional[ObjcType]): The pointee of pointers or the element of arrays.
+        count (int): The length of arrays or the width of bitfields.
+        layout (Optional[tuple[int, int]]): The computed size and alignment of structs and unions.
+        offsets (Optional[list[int]]): The computed field offsets of structs.
+    """
+
+    kind: str
+    code: str = ''
+    name: str = ''
+    fields: list['ObjcType'] = field(default_factory=list)
+    field_names: list[str] = field(default_factory=list)
+    element: Optional['ObjcType'] = None
+    count: int = 0
+    layout: Optional[tuple[int, int]] = field(default=None, repr=False, compare=False)
+    offsets: Optional[list[int]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def is_pointer(self) -> bool:
+        return self.kind in ('object', 'block', 'class', 'selector', 'cstring', 'pointer')
+
+    def __str__(self) -> str:
+        if self.kind == 'scalar':
+            return SCALAR_TYPES[self.code][0]
+        elif self.kind == 'object':
+            if self.name.startswith('<'):
+                return f"id{self.name}"
+            return f"{self.name}*" if self.name else 'id'
+        elif self.kind == 'block':
+            return 'id /* block */'
+        elif self.kind == 'class':
+            return 'Class'
+        elif self.kind == 'selector':
+            return 'SEL'
+        elif self.kind == 'cstring':
+            return 'char*'
+        elif self.kind == 'pointer':
+            if self.element is None or self.element.kind == 'unknown':
+                return 'void*'
+            return f"{self.element}*"
+        elif self.kind in ('struct', 'union'):
+            return f"{self.kind} {self.name or '?'}"
+        elif self.kind == 'array':
+            return f"{self.element}[{self.count}]"
+        elif self.kind == 'bitfield':
+            return f"unsigned int:{self.count}"
+        return '?'
+
+
+class TypeEncodingParser:
+    """
+    Parses Objective-C type encodings such as `v24@0:8{CGRect={CGPoint=dd}{CGSize=dd}}16`.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        self.index = 0
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def parse(cls, encoding: str) -> ObjcType:
+        """
+        Parses the encoding of a single type (e.g. an ivar or property type).
+        Results are memoized and shared, so they must not be modified (except their computed layout).
+
+        Args:
+            encoding (str): The type encoding.
+
+        Returns:
+            ObjcType: The type. `unknown` if the encoding is empty or malformed.
+        """
+        try:
+            return cls(encoding).parse_type()
+        except (IndexError, ValueError):
+            return ObjcType('unknown')
+
+    @classmethod
+    def parse_method(cls, encoding: str) -> list[ObjcType]:
+        """
+        Parses the encoding of a method.
+
+        Args:
+            encoding (str): The method type encoding.
+
+        Returns:
+            list[ObjcType]: The return type followed by the argument types, including `self` and `_cmd`.
+        """
+        parser = cls(encoding)
+        types = []
+        try:
+            while parser.index < len(encoding):
+                types.append(parser.parse_type())
+                parser.skip_offset()
+        except (IndexError, ValueError):
+            pass
+        return types
+
+    def peek(self) -> str:
+        return self.encoding[self.index] if self.index < len(self.encoding) else ''
+
+    def skip_offset(self) -> None:
+        while self.peek() == '-' or self.peek().isdigit():
+            self.index += 1
+
+    def read_number(self) -> int:
+        start = self.index
+        while self.peek().isdigit():
+            self.index += 1
+        return int(self.encoding[start:self.index])
+
+    def read_quoted(self) -> str:
+        end = self.encoding.index('"', self.index + 1)
+        text = self.encoding[self.index + 1:end]
+        self.index = end + 1
+        return text
+
+    def parse_type(self, in_named_aggregate: bool = False) -> ObjcType:
+        while self.peek() in TYPE_QUALIFIERS and self.peek() != '':
+            self.index += 1
+
+        code = self.encoding[self.index]
+        self.index += 1
+
+        if code in SCALAR_TYPES:
+            return ObjcType('scalar', code=code)
+        elif code == '@':
+            if self.peek() == '?':
+                self.index += 1
+                if self.peek() == '<':
+                    # block signature
+                    self.index = self.encoding.index('>', self.index) + 1
+                return ObjcType('block')
+            if self.peek() == '"':
+                # Inside structs with named fields, the quoted text may be the name of the next field instead
+                end = self.encoding.index('"', self.index + 1)
+                following = self.encoding[end + 1:end + 2]
+                if not in_named_aggregate or following in ('"', '}', ')', ''):
+                    return ObjcType('object', name=self.read_quoted())
+            return ObjcType('object')
+        elif code == '#':
+            return ObjcType('class')
+        elif code == ':':
+            return ObjcType('selector')
+        elif code == '*':
+            return ObjcType('cstring')
+        elif code == '^':
+            return ObjcType('pointer', element=self.parse_type())
+        elif code == '?':
+            return ObjcType('unknown')
+        elif code == 'b':
+            return ObjcType('bitfield', count=self.read_number())
+        elif code == '[':
+            count = self.read_number()
+            element = self.parse_type()
+            if self.peek() != ']':
+                raise ValueError(self.encoding)
+            self.index += 1
+            return ObjcType('array', element=element, count=count)
+        elif code in '{(':
+            return self.parse_aggregate('struct' if code == '{' else 'union', '}' if code == '{' else ')')
+
+        raise ValueError(self.encoding)
+
+    def parse_aggregate(self, kind: str, close: str) -> ObjcType:
+        start = self.index
+        while self.peek() not in ('=', close):
+            if self.peek() in '{(':
+                # nested tag such as `{?={...}}` never appears in tag names
+                raise ValueError(self.encoding)
+            self.index += 1
+        aggregate = ObjcType(kind, name=self.encoding[start:self.index])
+
+        if self.peek() == '=':
+            self.index += 1
+            named = self.peek() == '"'
+            while self.peek() != close:
+                if self.peek() == '"':
+                    aggregate.field_names.append(self.read_quoted())
+                aggregate.fields.append(self.parse_type(in_named_aggregate=named))
+
+        self.index += 1
+        return aggregate
+
+
+def size_and_alignment(type: ObjcType) -> tuple[int, int]:
+    """
+    Returns the size and alignment of a type on LP64 targets.
+
+    Args:
+        type (ObjcType): The type.
+
+    Returns:
+        tuple[int, int]: (size, alignment) in bytes.
+    """
+    if type.kind == 'scalar':
+        size = SCALAR_TYPES[type.code][1]
+        return (size, max(size, 1))
+    elif type.is_pointer:
+        return (POINTER_SIZE, POINTER_SIZE)
+    elif type.kind == 'array' and type.element is not None:
+        size, alignment = size_and_alignment(type.element)
+        return (size * type.count, alignment)
+    elif type.kind == 'bitfield':
+        return ((type.count + 7) // 8, 1)
+    elif type.layout is not None:
+        return type.layout
+    elif type.kind == 'union':
+        sizes = [size_and_alignment(f) for f in type.fields] or [(0, 1)]
+        alignment = max(a for _, a in sizes)
+        size = max(s for s, _ in sizes)
+        type.layout = (_align(size, alignment), alignment)
+        return type.layout
+    elif type.kind == 'struct':
+        offsets = field_offsets(type)
+        alignment = max([size_and_alignment(f)[1] for f in type.fields] or [1])
+        end = offsets[-1] + size_and_alignment(type.fields[-1])[0] if offsets else 0
+        type.layout = (_align(end, alignment), alignment)
+        return type.layout
+    return (0, 1)
+
+
+def field_offsets(type: ObjcType) -> list[int]:
+    """
+    Returns the offsets of the fields of a struct.
+    Consecutive bitfields share 4-byte storage units.
+
+    Args:
+        type (ObjcType): The struct type.
+
+    Returns:
+        list[int]: The offset of each field in bytes.
+    """
+    if type.offsets is not None:
+        return type.offsets
+
+    offsets = []
+    offset = 0
+    bits = 0
+    for f in type.fields:
+        if f.kind == 'bitfield':
+            if bits == 0:
+                offset = _align(offset, 4)
+            offsets.append(offset + bits // 8)
+            bits += f.count
+            continue
+        if bits > 0:
+            offset += (bits + 31) // 32 * 4
+            bits = 0
+        size, alignment = size_and_alignment(f)
+        offset = _align(offset, alignment)
+        offsets.append(offset)
+        offset += size
+    type.offsets = offsets
+    return offsets
+
+
+def _align(offset: int, alignment: int) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def format_value(type: ObjcType, data: bytes, offset: int) -> str:
+    """
+    Formats a value stored in `data` at `offset`, as read from the debuggee's memory.
+
+    Args:
+        type (ObjcType): The type of the value.
+        data (bytes): Memory containing the value (little endian).
+        offset (int): The offset of the value in `data`.
+
+    Returns:
+        str: The formatted value, or `?` if it cannot be decoded.
+    """
+    size, _ = size_and_alignment(type)
+    if size == 0 or offset < 0 or offset + size > len(data):
+        return '?'
+
+    if type.kind == 'scalar':
+        format = SCALAR_TYPES[type.code][2]
+        if format == '':
+            return '0x' + data[offset:offset + size][::-1].hex()
+        value = struct.unpack_from('<' + format, data, offset)[0]
+        if isinstance(value, bool):
+            return 'YES' if value else 'NO'
+        if isinstance(value, float):
+            return f"{value:g}"
+        return str(value)
+    elif type.is_pointer:
+        pointer: int = struct.unpack_from('<Q', data, offset)[0]
+        if pointer == 0:
+            return 'nil' if type.kind in ('object', 'block', 'class') else 'NULL'
+        return f"0x{pointer:x}"
+    elif type.kind == 'struct':
+        values = [format_value(f, data, offset + o) for f, o in zip(type.fields, field_offsets(type))]
+        return '{' + ', '.join(values) + '}'
+    elif type.kind == 'array' and type.element is not None:
+        element_size, _ = size_and_alignment(type.element)
+        values = [format_value(type.element, data, offset + i * element_size) for i in range(min(type.count, 16))]
+        if type.count > 16:
+            values.append('...')
+        return '[' + ', '.join(values) + ']'
+
+    return '0x' + data[offset:offset + size][::-1].hex()
+
+
+@lru_cache(maxsize=4096)
+def method_type_names(types: str) -> tuple[str, ...]:
+    """
+    Returns the names of the return type and argument types of a method encoding.
+    Memoized because many methods share the same encoding.
+
+    Args:
+        types (str): The method type encoding.
+
+    Returns:
+        tuple[str, ...]: The type names, including `self` and `_cmd`.
+    """
+    return tuple(str(t) for t in TypeEncodingParser.parse_method(types))
+
+
+def method_declaration(selector: str, types: str, is_class_method: bool) -> str:
+    """
+    Returns a declaration of a method in the style of `__methodDescriptionForClass:`.
+
+    Args:
+        selector (str): The selector name.
+        types (str): The method type encoding.
+        is_class_method (bool): Whether the method is a class method.
+
+    Returns:
+        str: The declaration (e.g. `- (void) setFrame:(struct CGRect)arg1;`).
+    """
+    sign = '+' if is_class_method else '-'
+    type_names = method_type_names(types)
+    return_type = type_names[0] if type_names else 'id'
+
+    if ':' not in selector:
+        return f"{sign} ({return_type}) {selector};"
+
+    arguments = type_names[3:]
+    parts = []
+    for i, label in enumerate(selector.split(':')[:-1]):
+        argument_type = arguments[i] if i < len(arguments) else 'id'
+        parts.append(f"{label}:({argument_type})arg{i + 1}")
+
+    return f"{sign} ({return_type}) {' '.join(parts)};"
+
+
+def split_property_attributes(attributes: str) -> list[str]:
+    """
+    Splits property attributes (e.g. `T@"NSString",C,N,V_name`) at commas outside of the type.
+
+    Args:
+        attributes (str): The attributes string returned by `property_getAttributes`.
+
+    Returns:
+        list[str]: The attributes.
+    """
+    if not attributes.startswith('T'):
+        return [c for c in attributes.split(',') if c]
+
+    # Only the type (always first) may contain commas, inside quotes or brackets.
+    depth = 0
+    quoted = False
+    end = len(attributes)
+    for i, character in enumerate(attributes):
+        if character == '"':
+            quoted = not quoted
+        elif not quoted and character in '{([':
+            depth += 1
+        elif not quoted and character in '})]':
+            depth -= 1
+        elif not quoted and depth == 0 and character == ',':
+            end = i
+            break
+    components = [attributes[:end]] + attributes[end + 1:].split(',')
+    return [c for c in components if c]
+
+
+def property_declaration(name: str, attributes: str) -> tuple[str, Optional[str]]:
+    """
+    Returns a declaration of a property in the style of `__methodDescriptionForClass:`.
+
+    Args:
+        name (str): The property name.
+        attributes (str): The attributes string returned by `property_getAttributes`.
+
+    Returns:
+        tuple[str, Optional[str]]:
+            The declaration (e.g. `@property (nonatomic, copy) NSString* name;`)
+            and `@dynamic name;` if the property is dynamic.
+    """
+    type = ObjcType('unknown')
+    modifiers = []
+    dynamic: Optional[str] = None
+
+    components = split_property_attributes(attributes)
+    flags = {c[0]: c[1:] for c in components}
+
+    if 'T' in flags:
+        type = TypeEncodingParser.parse(flags['T'])
+    if 'N' in flags:
+        modifiers.append('nonatomic')
+    if 'C' in flags:
+        modifiers.append('copy')
+    elif '&' in flags:
+        modifiers.append('retain')
+    elif 'W' in flags:
+        modifiers.append('weak')
+    if 'R' in flags:
+        modifiers.append('readonly')
+    if 'G' in flags:
+        modifiers.append(f"getter={flags['G']}")
+    if 'S' in flags:
+        modifiers.append(f"setter={flags['S']}")
+    if 'D' in flags:
+        dynamic = f"@dynamic {name};"
+
+    declaration = "@property "
+    if modifiers:
+        declaration += f"({', '.join(modifiers)}) "
+    declaration += f"{type} {name};"
+
+    return (declaration, dynamic)
+
+
+def is_tagged_pointer(address: int, arch: str) -> bool:
+    """
+    Returns whether an object pointer is a tagged pointer, which has no object body in memory.
+
+    Args:
+        address (int): The object pointer.
+        arch (str): The architecture of the target triple (e.g. `arm64`, `x86_64`).
+
+    Returns:
+        bool: True if the pointer is tagged.
+    """
+    if re.match(r'(arm64|aarch64)', arch):
+        return (address >> 63) & 1 == 1
+    return address & 1 == 1
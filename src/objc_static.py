@@ -0,0 +1,332 @@
+import os
+import gzip
+import json
+import struct
+import lldb
+from dataclasses import dataclass, field
+from typing import Optional
+import objc_index
+import objc_memory
+import util
+from lldbhelper import profiler
+from macho import MachOFile
+
+STATIC_VERSION = 1
+
+# Kinds of Swift context descriptors (ContextDescriptorKind)
+SWIFT_KIND_MODULE = 0
+SWIFT_KIND_EXTENSION = 1
+SWIFT_KIND_ANONYMOUS = 2
+SWIFT_KIND_PROTOCOL = 3
+SWIFT_KINDS = {
+    SWIFT_KIND_PROTOCOL: 'protocol',
+    16: 'class',
+    17: 'struct',
+    18: 'enum',
+}
+
+OBJC_CLASS_SYMBOL_PREFIX = '_OBJC_CLASS_$_'
+
+
+@dataclass
+class StaticImage:
+    """
+    Classes, categories, protocols and Swift types declared in the Mach-O file of an image.
+
+    Attributes:
+        path (str): The path of the image.
+        uuid (Optional[str]): The UUID of the image, or None if unknown.
+        classes (list[str]): The Objective-C classes of `__objc_classlist` (Swift classes are demangled).
+        categories (list[str]): The categories of `__objc_catlist`, as `Class (Category)`.
+        protocols (list[str]): The Objective-C protocols of `__objc_protolist`.
+        swift_types (list[tuple[str, str]]):
+            The kind (`class`, `struct`, `enum` or `protocol`) and qualified name of the types
+            of `__swift5_types` and `__swift5_protos`.
+    """
+
+    path: str
+    uuid: Optional[str]
+    classes: list[str] = field(default_factory=list)
+    categories: list[str] = field(default_factory=list)
+    protocols: list[str] = field(default_factory=list)
+    swift_types: list[tuple[str, str]] = field(default_factory=list)
+
+    @classmethod
+    @profiler.timed('decode')
+    def parse(cls, path: str, uuid: Optional[str]) -> Optional['StaticImage']:
+        """
+        Reads the metadata sections of an image file.
+
+        Args:
+            path (str): The path of the file on the host.
+            uuid (Optional[str]): The UUID of the image, used to pick the slice of a fat file.
+
+        Returns:
+            Optional[StaticImage]: The declarations, or None if the file cannot be read or is not a 64-bit Mach-O image.
+        """
+        macho = MachOFile.open(path, uuid)
+        if macho is None:
+            return None
+        try:
+            parser = MetadataParser(macho)
+            return StaticImage(
+                path,
+                uuid or macho.uuid,
+                parser.classes(),
+                parser.categories(),
+                parser.protocols(),
+                parser.swift_types()
+            )
+        except (struct.error, IndexError, ValueError):
+            return None
+        finally:
+            macho.close()
+
+    @classmethod
+    def load(cls, path: str, uuid: str) -> Optional['StaticImage']:
+        """
+        Loads the declarations of an image saved by `save`.
+
+        Args:
+            path (str): The path of the image.
+            uuid (str): The UUID of the image.
+
+        Returns:
+            Optional[StaticImage]: The declarations, or None if they have not been saved or cannot be read.
+        """
+        file_path = os.path.join(objc_index.cache_directory(), f"{uuid}.static.json.gz")
+        try:
+            with gzip.open(file_path, 'rt', encoding='utf-8') as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(content, dict) or content.get('version') != STATIC_VERSION:
+            return None
+        return StaticImage(
+            path,
+            uuid,
+            content.get('classes', []),
+            content.get('categories', []),
+            content.get('protocols', []),
+            [(kind, name) for kind, name in content.get('swift_types', [])]
+        )
+
+    def save(self) -> None:
+        """Saves the declarations under the image UUID. Errors are ignored since the file can be read again."""
+        if self.uuid is None:
+            return
+        directory = objc_index.cache_directory()
+        file_path = os.path.join(directory, f"{self.uuid}.static.json.gz")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with gzip.open(file_path + '.tmp', 'wt', encoding='utf-8') as file:
+                json.dump({
+                    'version': STATIC_VERSION,
+                    'image': self.path,
+                    'classes': self.classes,
+                    'categories': self.categories,
+                    'protocols': self.protocols,
+                    'swift_types': self.swift_types,
+                }, file)
+            os.replace(file_path + '.tmp', file_path)
+        except OSError as e:
+            print(f"[iLLDB] failed to save the static class list of {self.path}: {e}")
+
+
+class MetadataParser:
+    """
+    Reads Objective-C and Swift metadata from the sections of a Mach-O image.
+
+    Layouts follow objc4 (`class_t`, `class_ro_t`, `category_t`, `protocol_t`)
+    and the Swift ABI (context descriptors referenced by relative pointers).
+    """
+
+    def __init__(self, macho: MachOFile) -> None:
+        self.macho = macho
+        self._class_names: dict[int, Optional[str]] = {}
+        self._context_names: dict[int, Optional[str]] = {}
+
+    def _pointers(self, section_name: str) -> list[tuple[int, Optional[str]]]:
+        section = self.macho.section(section_name)
+        if section is None:
+            return []
+        return self.macho.read_pointers(section)
+
+    def class_name(self, address: int) -> Optional[str]:
+        """Returns the name of the class at an address, from its `class_ro_t`."""
+        if address in self._class_names:
+            return self._class_names[address]
+        # class_t: isa, superclass, cache, vtable, data (with Swift flags in the low bits)
+        data, _ = self.macho.read_pointer_at(address + 32)
+        name: Optional[str] = None
+        if data != 0:
+            # class_ro_t: flags, instanceStart, instanceSize, reserved, ivarLayout, name
+            name_address, _ = self.macho.read_pointer_at((data & ~7) + 24)
+            if name_address != 0:
+                name = self.macho.read_cstring(name_address)
+        if name is not None and name.startswith('_Tt'):
+            name = objc_memory.demangle_class_name(name)
+        self._class_names[address] = name
+        return name
+
+    def classes(self) -> list[str]:
+        names = []
+        for address, _ in self._pointers('__objc_classlist'):
+            name = self.class_name(address)
+            if name is not None:
+                names.append(name)
+        return names
+
+    def categories(self) -> list[str]:
+        names = []
+        for address, _ in self._pointers('__objc_catlist'):
+            # category_t: name, cls, ...
+            name_address, _ = self.macho.read_pointer_at(address)
+            name = self.macho.read_cstring(name_address) if name_address != 0 else None
+            class_address, symbol = self.macho.read_pointer_at(address + 8)
+            if symbol is not None:
+                # A class of another image
+                class_name: Optional[str] = symbol.removeprefix(OBJC_CLASS_SYMBOL_PREFIX)
+            elif class_address != 0:
+                class_name = self.class_name(class_address)
+            else:
+                # Bound with dyld opcodes, which are not read
+                class_name = None
+            names.append(f"{class_name or '?'} ({name or '?'})")
+        return names
+
+    def protocols(self) -> list[str]:
+        names = []
+        for address, _ in self._pointers('__objc_protolist'):
+            # protocol_t: isa, mangledName, ...
+            name_address, _ = self.macho.read_pointer_at(address + 8)
+            name = self.macho.read_cstring(name_address) if name_address != 0 else None
+            if name is not None:
+                names.append(objc_memory.demangle_class_name(name) if name.startswith('_Tt') else name)
+        return names
+
+    def swift_types(self) -> list[tuple[str, str]]:
+        types = []
+        for section_name in ('__swift5_types', '__swift5_protos'):
+            section = self.macho.section(section_name)
+            if section is None:
+                continue
+            for i in range(section.size // 4):
+                entry = section.address + i * 4
+                value = self.macho.read_int32(section.offset + i * 4)
+                # Relative pointers to descriptors, indirect if the low bits are 1
+                descriptor = entry + (value & ~3)
+                if value & 3 == 1:
+                    descriptor, symbol = self.macho.read_pointer_at(descriptor)
+                    if symbol is not None or descriptor == 0:
+                        continue
+                offset = self.macho.file_offset(descriptor)
+                if offset is None:
+                    continue
+                kind = SWIFT_KINDS.get(self.macho.read_uint32(offset) & 0x1f)
+                name = self.context_name(descriptor)
+                if kind is not None and name is not None:
+                    types.append((kind, name))
+        return types
+
+    def context_name(self, address: int) -> Optional[str]:
+        """Returns the qualified name of a Swift context descriptor (e.g. `MyApp.Outer.Inner`)."""
+        if address in self._context_names:
+            return self._context_names[address]
+        # Guards cycles in malformed files
+        self._context_names[address] = None
+
+        name: Optional[str] = None
+        offset = self.macho.file_offset(address)
+        if offset is not None:
+            # flags, parent, name (relative pointers)
+            kind = self.macho.read_uint32(offset) & 0x1f
+            parent_value = self.macho.read_int32(offset + 4)
+            parent_name: Optional[str] = None
+            if parent_value != 0:
+                parent = address + 4 + (parent_value & ~1)
+                symbol: Optional[str] = None
+                if parent_value & 1:
+                    parent, symbol = self.macho.read_pointer_at(parent)
+                if symbol is None and parent != 0:
+                    parent_name = self.context_name(parent)
+
+            if kind in (SWIFT_KIND_EXTENSION, SWIFT_KIND_ANONYMOUS):
+                # Unnamed contexts; members of extensions are shown in the extending module
+                name = parent_name
+            else:
+                own_name = self.macho.read_cstring(address + 8 + self.macho.read_int32(offset + 8))
+                if own_name is not None:
+                    name = f"{parent_name}.{own_name}" if parent_name else own_name
+
+        self._context_names[address] = name
+        return name
+
+
+class StaticClassList:
+    """
+    The declarations read from the image files of the selected target, without touching the process.
+
+    Each file is parsed once: results are kept in memory and saved to disk under the image UUID.
+    """
+
+    def __init__(self) -> None:
+        # image UUID (or path without UUID) -> declarations
+        self._images: dict[str, StaticImage] = {}
+
+    def images(self, debugger: lldb.SBDebugger, image: Optional[str] = None) -> tuple[list[StaticImage], list[str]]:
+        """
+        Returns the declarations of the modules of the selected target.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            image (Optional[str]): Only modules whose path contains the text.
+
+        Returns:
+            tuple[list[StaticImage], list[str]]:
+                The declarations of each module, and the paths of the modules whose file cannot be read on the host
+                (e.g. images in the dyld shared cache).
+        """
+        images: list[StaticImage] = []
+        unreadable: list[str] = []
+        # Files are read on the host, so modules are keyed by the path of their file there
+        for path, uuid in util.module_uuids(debugger, host_files=True).items():
+            if image is not None and image not in path:
+                continue
+            key = uuid or path
+            declarations = self._images.get(key)
+            if declarations is None and uuid is not None:
+                declarations = StaticImage.load(path, uuid)
+            if declarations is None:
+                declarations = StaticImage.parse(path, uuid)
+                if declarations is None:
+                    unreadable.append(path)
+                    continue
+                profiler.count('images_parsed')
+                declarations.save()
+            self._images[key] = declarations
+            images.append(declarations)
+        return (images, unreadable)
+
+    def clear(self) -> None:
+        """Drops the declarations in memory. Saved declarations are kept."""
+        self._images.clear()
+
+    def remove_saved(self, debugger: lldb.SBDebugger) -> None:
+        """
+        Drops the declarations in memory and removes the saved declarations of the modules of the selected target.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+        """
+        for uuid in util.module_uuids(debugger, host_files=True).values():
+            if uuid is None:
+                continue
+            try:
+                os.remove(os.path.join(objc_index.cache_directory(), f"{uuid}.static.json.gz"))
+            except OSError:
+                pass
+        self.clear()
+
+
+static_class_list = StaticClassList()
@@ -0,0 +1,197 @@
+import os
+import lldb
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+import util
+from lldbhelper import profiler
+
+
+@dataclass(frozen=True)
+class ResolvedSymbol:
+    """
+    The image, symbol and source location of a code address.
+
+    Attributes:
+        address (int): The load address.
+        image (Optional[str]): The path of the image containing the address, or None if it is in no image (e.g. JIT code).
+        symbol (Optional[str]): The name of the symbol containing the address, if any.
+        offset (int): The offset of the address from the start of the symbol.
+        file (Optional[str]): The source file, if debug information is available.
+        line (int): The source line, or 0 if unknown.
+    """
+
+    address: int
+    image: Optional[str] = None
+    symbol: Optional[str] = None
+    offset: int = 0
+    file: Optional[str] = None
+    line: int = 0
+
+    def __str__(self) -> str:
+        if self.image is None:
+            return f"0x{self.address:x}"
+        text = os.path.basename(self.image)
+        if self.symbol is not None:
+            text += f"`{self.symbol}"
+            if self.offset != 0:
+                text += f" + {self.offset}"
+        else:
+            text += f" + 0x{self.address:x}"
+        if self.file is not None:
+            text += f" at {os.path.basename(self.file)}"
+            if self.line > 0:
+                text += f":{self.line}"
+        return text
+
+
+class SymbolResolver:
+    """
+    Resolves code addresses (e.g. method IMPs) to images, symbols and source lines.
+
+    The loaded sections of all modules are kept in a sorted address-range index, so each address
+    is attributed to its section by a binary search and resolved with a single symbol context lookup
+    instead of searching all modules. Results are kept in an LRU cache until the module list changes.
+
+    Attributes:
+        capacity (int): The maximum number of cached addresses.
+        hits (int): The number of addresses found in the cache.
+        misses (int): The number of addresses resolved.
+    """
+
+    def __init__(self, capacity: int = 16384) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._key: Optional[tuple[tuple[int, int], int, frozenset[str]]] = None
+        # section start addresses, and (end, section, module, module path) of each start
+        self._starts: list[int] = []
+        self._ranges: list[tuple[int, lldb.SBSection, lldb.SBModule, str]] = []
+        self._symbols: OrderedDict[int, ResolvedSymbol] = OrderedDict()
+
+    def resolve(self, debugger: lldb.SBDebugger, addresses: Iterable[int]) -> dict[int, ResolvedSymbol]:
+        """
+        Resolves addresses in one pass.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            addresses (Iterable[int]): The load addresses.
+
+        Returns:
+            dict[int, ResolvedSymbol]: The resolved symbol of each address.
+        """
+        with profiler.phase('symbolicate'):
+            target: lldb.SBTarget = debugger.GetSelectedTarget()
+            self._sync(debugger, target)
+
+            resolved: dict[int, ResolvedSymbol] = {}
+            for address in addresses:
+                if address in resolved:
+                    continue
+                symbol = self._symbols.get(address)
+                if symbol is not None:
+                    self.hits += 1
+                    self._symbols.move_to_end(address)
+                else:
+                    self.misses += 1
+                    symbol = self._resolve(target, address)
+                    self._symbols[address] = symbol
+                    if len(self._symbols) > self.capacity:
+                        self._symbols.popitem(last=False)
+                resolved[address] = symbol
+            profiler.count('symbols_resolved', len(resolved))
+            return resolved
+
+    def images(self, debugger: lldb.SBDebugger, addresses: Iterable[int]) -> dict[int, Optional[str]]:
+        """
+        Finds the images containing addresses with the range index only, without resolving symbols.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            addresses (Iterable[int]): The load addresses.
+
+        Returns:
+            dict[int, Optional[str]]: The path in the process of the image containing each address, or None if it is in no image.
+        """
+        target: lldb.SBTarget = debugger.GetSelectedTarget()
+        self._sync(debugger, target)
+
+        paths: dict[int, Optional[str]] = {}
+        for address in addresses:
+            if address in paths:
+                continue
+            index = self._range_index(address)
+            paths[address] = self._ranges[index][3] if index is not None else None
+        return paths
+
+    def _range_index(self, address: int) -> Optional[int]:
+        index = bisect_right(self._starts, address) - 1
+        if index < 0 or address >= self._ranges[index][0]:
+            return None
+        return index
+
+    def _resolve(self, target: lldb.SBTarget, address: int) -> ResolvedSymbol:
+        index = self._range_index(address)
+        if index is None:
+            return ResolvedSymbol(address)
+
+        _, section, module, image = self._ranges[index]
+        sb_address = lldb.SBAddress(section, address - self._starts[index])
+        context: lldb.SBSymbolContext = module.ResolveSymbolContextForAddress(
+            sb_address,
+            lldb.eSymbolContextSymbol | lldb.eSymbolContextLineEntry
+        )
+
+        name: Optional[str] = None
+        offset = 0
+        symbol: lldb.SBSymbol = context.GetSymbol()
+        if symbol.IsValid():
+            name = symbol.GetName()
+            offset = address - symbol.GetStartAddress().GetLoadAddress(target)
+
+        file: Optional[str] = None
+        line = 0
+        line_entry: lldb.SBLineEntry = context.GetLineEntry()
+        if line_entry.IsValid():
+            file = line_entry.GetFileSpec().fullpath
+            line = line_entry.GetLine()
+
+        return ResolvedSymbol(address, image, name, offset, file, line)
+
+    def _sync(self, debugger: lldb.SBDebugger, target: lldb.SBTarget) -> None:
+        process = util.process_key(debugger) or (0, 0)
+        modules = [target.GetModuleAtIndex(i) for i in range(target.GetNumModules())]
+        key = (process, id(target), frozenset(util.image_path(module) for module in modules))
+        if key == self._key:
+            return
+
+        # Addresses may belong to other images once modules are loaded or unloaded
+        self._key = key
+        self._symbols.clear()
+
+        ranges: list[tuple[int, int, lldb.SBSection, lldb.SBModule, str]] = []
+        for module in modules:
+            # Named like class_getImageName, not after the copy of the file on the host
+            path = util.image_path(module)
+            for i in range(module.GetNumSections()):
+                section: lldb.SBSection = module.GetSectionAtIndex(i)
+                start = section.GetLoadAddress(target)
+                size = section.GetByteSize()
+                if start == lldb.LLDB_INVALID_ADDRESS or size == 0:
+                    continue
+                ranges.append((start, start + size, section, module, path))
+        ranges.sort(key=lambda r: r[0])
+
+        self._starts = [r[0] for r in ranges]
+        self._ranges = [(r[1], r[2], r[3], r[4]) for r in ranges]
+
+    def clear(self) -> None:
+        """Drops the cached symbols and the range index."""
+        self._key = None
+        self._starts = []
+        self._ranges = []
+        self._symbols.clear()
+
+
+symbol_resolver = SymbolResolver()
@@ -0,0 +1,169 @@
+import time
+import lldb
+from dataclasses import dataclass, field
+from typing import Optional
+import util
+from lldbhelper import profiler
+
+BREAKPOINT_NAME = 'iLLDB.objc.trace'
+
+
+@dataclass
+class TracedMethod:
+    """
+    A method implementation traced with an address breakpoint.
+
+    Attributes:
+        names (list[str]): The methods sharing the implementation (e.g. `-[UIView layoutSubviews]`).
+        address (int): The address of the implementation.
+        breakpoint_id (int): The ID of the breakpoint.
+        sample (int): Only 1 in `sample` hits runs the callback; the others are skipped by LLDB's ignore count.
+        hits (int): The number of hits counted by the callback.
+    """
+
+    names: list[str]
+    address: int
+    breakpoint_id: int
+    sample: int = 1
+    hits: int = 0
+
+    @property
+    def estimated_hits(self) -> int:
+        """The number of hits, extrapolated from the sampled hits."""
+        return self.hits * self.sample
+
+
+@dataclass
+class TraceSession:
+    """
+    The methods traced in a process.
+
+    Attributes:
+        process (tuple[int, int]): The key of the process (see `util.process_key`).
+        started (float): When tracing started (`time.monotonic`).
+        methods (dict[int, TracedMethod]): The traced methods by breakpoint ID.
+    """
+
+    process: tuple[int, int]
+    started: float = field(default_factory=time.monotonic)
+    methods: dict[int, TracedMethod] = field(default_factory=dict)
+
+    def elapsed(self) -> float:
+        """The seconds since tracing started."""
+        return time.monotonic() - self.started
+
+
+class MethodTracer:
+    """
+    Counts calls of Objective-C methods with auto-continuing address breakpoints on their implementations.
+
+    The breakpoint callback only increments a counter, so no frame is formatted and no expression is evaluated.
+    With sampling, the callback sets the ignore count of the breakpoint so that LLDB skips the next hits
+    without calling back into Python.
+    """
+
+    def __init__(self) -> None:
+        self.session: Optional[TraceSession] = None
+        self._imported = False
+
+    def start(
+        self,
+        debugger: lldb.SBDebugger,
+        methods: list[tuple[str, int]],
+        sample: int = 1
+    ) -> int:
+        """
+        Sets breakpoints on method implementations. Methods already traced are skipped.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            methods (list[tuple[str, int]]): The name and implementation address of each method.
+            sample (int): Count only 1 in `sample` hits.
+
+        Returns:
+            int: The number of breakpoints created.
+        """
+        process = util.process_key(debugger)
+        if process is None:
+            return 0
+        if self.session is None or self.session.process != process:
+            # Breakpoints left by a previous process point at unrelated code under the new ASLR slide
+            self.delete_breakpoints(debugger)
+            self.session = TraceSession(process)
+
+        if not self._imported:
+            # LLDB resolves callback names in its script session
+            debugger.HandleCommand(f"script import {__name__}")
+            self._imported = True
+
+        traced = {method.address: method for method in self.session.methods.values()}
+        by_address: dict[int, list[str]] = {}
+        for name, address in methods:
+            if address == 0:
+                continue
+            if address in traced:
+                if name not in traced[address].names:
+                    traced[address].names.append(name)
+                continue
+            by_address.setdefault(address, []).append(name)
+
+        target: lldb.SBTarget = debugger.GetSelectedTarget()
+        with profiler.phase('breakpoints'):
+            for address, names in by_address.items():
+                breakpoint: lldb.SBBreakpoint = target.BreakpointCreateByAddress(address)
+                if not breakpoint.IsValid():
+                    continue
+                breakpoint.AddName(BREAKPOINT_NAME)
+                breakpoint.SetAutoContinue(True)
+                breakpoint.SetScriptCallbackFunction(f"{__name__}.breakpoint_hit")
+                method = TracedMethod(names, address, breakpoint.GetID(), max(sample, 1))
+                self.session.methods[method.breakpoint_id] = method
+        profiler.count('breakpoints', len(by_address))
+        return len(by_address)
+
+    def hit(self, breakpoint: lldb.SBBreakpoint) -> None:
+        """Counts a hit of a trace breakpoint."""
+        if self.session is None:
+            return
+        method = self.session.methods.get(breakpoint.GetID())
+        if method is None:
+            return
+        method.hits += 1
+        if method.sample > 1:
+            breakpoint.SetIgnoreCount(method.sample - 1)
+
+    def stop(self, debugger: lldb.SBDebugger) -> Optional[TraceSession]:
+        """
+        Deletes the trace breakpoints, including those left by previous processes.
+
+        Returns:
+            Optional[TraceSession]: The finished session, or None if nothing was traced.
+        """
+        session = self.session
+        self.session = None
+        self.delete_breakpoints(debugger)
+        return session
+
+    def delete_breakpoints(self, debugger: lldb.SBDebugger) -> int:
+        """
+        Deletes all breakpoints named `BREAKPOINT_NAME` in the selected target.
+
+        Returns:
+            int: The number of deleted breakpoints.
+        """
+        target: lldb.SBTarget = debugger.GetSelectedTarget()
+        breakpoints = lldb.SBBreakpointList(target)
+        target.FindBreakpointsByName(BREAKPOINT_NAME, breakpoints)
+        breakpoint_ids = [breakpoints.GetBreakpointAtIndex(i).GetID() for i in range(breakpoints.GetSize())]
+        for breakpoint_id in breakpoint_ids:
+            target.BreakpointDelete(breakpoint_id)
+        return len(breakpoint_ids)
+
+
+def breakpoint_hit(frame: lldb.SBFrame, bp_loc: lldb.SBBreakpointLocation, internal_dict: dict) -> bool:
+    """The callback of trace breakpoints. Returns False so that the process continues."""
+    method_tracer.hit(bp_loc.GetBreakpoint())
+    return False
+
+
+method_tracer = MethodTracer()
@@ -1,32 +1,33 @@
 import Foundation
 
-func printAppInfo() {
+func appInfo() -> String {
     guard let appInfo = Bundle.main.infoDictionary else {
-        return
+        return ""
     }
-    print("[App Info]")
+    var lines = ["[App Info]"]
     if let appName = appInfo["CFBundleName"] as? String {
-        print("App Name:          \(appName)")
+        lines.append("App Name:          \(appName)")
     }
     if let appVersion = appInfo["CFBundleShortVersionString"] as? String {
-        print("App Version:       \(appVersion)")
+        lines.append("App Version:       \(appVersion)")
     }
     if let appBuild = appInfo["CFBundleVersion"] as? String {
-        print("App Build Number:  \(appBuild)")
+        lines.append("App Build Number:  \(appBuild)")
     }
     if let bundleIdentifier = appInfo["CFBundleIdentifier"] as? String {
-        print("Bundle Identifier: \(bundleIdentifier)")
+        lines.append("Bundle Identifier: \(bundleIdentifier)")
     }
     if let executableName = appInfo["CFBundleExecutable"] as? String {
-        print("Executable Name:   \(executableName)")
+        lines.append("Executable Name:   \(executableName)")
     }
     if let bundleDisplayName = appInfo["CFBundleDisplayName"] as? String {
-        print("Display Name:      \(bundleDisplayName)")
+        lines.append("Display Name:      \(bundleDisplayName)")
     }
     if let bundleIconFile = appInfo["CFBundleIconFile"] as? String {
-        print("Icon File:         \(bundleIconFile)")
+        lines.append("Icon File:         \(bundleIconFile)")
     }
     if let bundleIconFiles = appInfo["CFBundleIconFiles"] as? [String] {
-        print("Icon Files:        \(bundleIconFiles)")
+        lines.append("Icon Files:        \(bundleIconFiles)")
     }
+    return lines.joined(separator: "\n")
 }
@@ -1,6 +1,6 @@
 import UIKit
 
-var screenSize: CGSize {
+func screenSize() -> CGSize {
     guard let window = UIApplication.shared.connectedScenes.first as? UIWindowScene else {
         return .zero
     }
@@ -9,6 +9,7 @@ var screenSize: CGSize {
 
 func printDeviceInfo() {
     let currentDevice = UIDevice.current
+    let screen = screenSize()
 
     print("[Device Info]")
     print("Name:              \(currentDevice.name)")
@@ -16,7 +17,7 @@ func printDeviceInfo() {
     print("IsSimulator:       \(TARGET_OS_SIMULATOR != 0)")
     print("System Name:       \(currentDevice.systemName)")
     print("System Version:    \(currentDevice.systemVersion)")
-    print("Screen:            \(screenSize.width) x \(screenSize.height)")
+    print("Screen:            \(screen.width) x \(screen.height)")
     print("Locale:            \(Locale.current)")
     if let identifierForVendor = currentDevice.identifierForVendor {
         print("Id For Vendor:     \(identifierForVendor.uuidString)")
@@ -4,233 +4,355 @@
 // typealias NSUIWindow = UIWindow
 // typealias NSUIApplication = UIApplication
 
-func windowHierarchy(
-    _ window: NSUIWindow?,
-    indentation: String = "",
-    isLast: Bool = true,
-    mode: String = "normal",
+// Returns the hierarchy under `root` (a window, view controller, view or layer) as a node table
+// in a malloc'd buffer (see `hierarchyBuffer`).
+//
+// Nodes are listed in depth-first order, one line per node with tab separated fields:
+// parent index (-1 for the root), kind (w: window, c: view controller, v: view, l: layer),
+// class name, x, y, width, height, address (hex), flags (1: hidden), number of children,
+// and the description of the object if `detail` is true.
+// Children of nodes deeper than `depth` are not listed, but they are counted.
+// With `layers`, the sublayers of views that are not layers of subviews are listed as children of the views.
+func hierarchyTable(
+    _ root: AnyObject?,
     depth: Int? = nil,
-    address: Bool = false
-) {
-    guard let window = window else { return }
-
-    let currentDepth = indentation.replacingOccurrences(of: "│", with: " ").count / 3
-    if let depth, currentDepth > depth {
-        return
+    detail: Bool = false,
+    layers: Bool = false
+) -> NSRange {
+    var table = hierarchyBuffer()
+    var count = 0
+    if let root {
+        hierarchyRows(root, table: &table, count: &count, depth: depth, detail: detail, layers: layers)
     }
+    return NSRange(location: Int(bitPattern: table.bytes), length: table.count)
+}
 
-    var result = ""
-    if isLast {
-        result += "\(indentation)└─"
-    } else {
-        result += "\(indentation)├─"
-    }
-
-    var windowDescription: String
-    switch mode {
-    case "simple": windowDescription = "\(String(describing: type(of: window)))"
-    case "detail": windowDescription = "\(window)"
-    default:
-        let frameDescription = frameDescription(window.frame)
-        windowDescription = "\(String(describing: type(of: window))) \(frameDescription)"
-    }
-    if address && mode != "detail" { windowDescription += ": \(addressDescription(of: window))" }
-
-    result += windowDescription
-    print(result)
-
-    var rootViewController: NSUIViewController?
-    if window.responds(to: Selector(("rootViewController"))) { // for iOS
-        rootViewController = window.perform(Selector(("rootViewController"))).takeUnretainedValue() as? NSUIViewController
-    } else if window.responds(to: Selector(("contentViewController"))) { // for macOS
-        rootViewController = window.perform(Selector(("contentViewController"))).takeUnretainedValue() as? NSUIViewController
+// Returns the hierarchies under objects given by address as one node table (see `hierarchyTable`).
+// `roots` is a list of "address:depth" separated by spaces, with hex addresses.
+// The depth may be empty to list all descendants.
+func hierarchySubtrees(
+    _ roots: String,
+    detail: Bool = false
+) -> NSRange {
+    var table = hierarchyBuffer()
+    var count = 0
+    for root in roots.split(separator: " ") {
+        let fields = root.split(separator: ":", omittingEmptySubsequences: false)
+        guard fields.count == 2,
+              let address = UInt(fields[0], radix: 16),
+              let pointer = UnsafeRawPointer(bitPattern: address) else {
+            continue
+        }
+        let object = Unmanaged<AnyObject>.fromOpaque(pointer).takeUnretainedValue()
+        hierarchyRows(object, table: &table, count: &count, depth: Int(fields[1]), detail: detail)
     }
+    return NSRange(location: Int(bitPattern: table.bytes), length: table.count)
+}
 
-    viewControllerHierarchy(
-        rootViewController,
-        indentation: indentation + (isLast ? "   " : "│  "),
-        isLast: true,
-        mode: mode,
-        depth: depth,
-        address: address
-    )
+// Returns an empty malloc'd buffer for a node table: its bytes, the number of bytes written and its size.
+// Rows are written straight into it, and iLLDB reads and frees it, so the table is never copied in the process.
+func hierarchyBuffer() -> (bytes: UnsafeMutableRawPointer, count: Int, capacity: Int) {
+    let capacity = 1 << 16
+    return (malloc(capacity)!, 0, capacity)
 }
 
-func viewControllerHierarchy(
-    _ viewController: NSUIViewController?,
-    indentation: String = "",
-    isLast: Bool = true,
-    mode: String = "normal",
-    depth: Int? = nil,
-    address: Bool = false
-) {
-    guard let viewController = viewController else { return }
-
-    let currentDepth = indentation.replacingOccurrences(of: "│", with: " ").count / 3
-    if let depth, currentDepth > depth {
-        return
-    }
-
-    var result = ""
-    if isLast {
-        result += "\(indentation)└─"
-    } else {
-        result += "\(indentation)├─"
-    }
-
-    var viewControllerDescription: String
-    switch mode {
-    case "simple": viewControllerDescription = "\(String(describing: type(of: viewController)))"
-    case "detail": viewControllerDescription = "\(viewController)"
-    default:
-        let frameDescription = frameDescription(viewController.view.frame)
-        viewControllerDescription = "\(String(describing: type(of: viewController))) \(frameDescription))"
-    }
-    if address && mode != "detail" { viewControllerDescription += ": \(addressDescription(of: viewController))" }
-
-    result += viewControllerDescription
-
-    print(result)
-
-    let children = viewController.children
-    for (index, childViewController) in children.enumerated() {
-        let isLastChild = index == children.count - 1 && viewController.view.subviews.isEmpty
-        viewControllerHierarchy(
-            childViewController,
-            indentation: indentation + (isLast ? "   " : "│  "),
-            isLast: isLastChild,
-            mode: mode,
-            depth: depth,
-            address: address
-        )
-    }
-
-    for (index, subview) in viewController.view.subviews.enumerated() {
-        let isLastSubview = index == viewController.view.subviews.count - 1
-        viewHierarchy(
-            subview,
-            indentation: indentation + (isLast ? "   " : "│  "),
-            isLast: isLastSubview,
-            mode: mode,
-            depth: depth,
-            address: address
-        )
+// Appends the UTF-8 bytes of `text` to a buffer from `hierarchyBuffer`, growing it as needed.
+func hierarchyAppend(_ text: String, to table: inout (bytes: UnsafeMutableRawPointer, count: Int, capacity: Int)) {
+    var text = text
+    text.withUTF8 { utf8 in
+        guard let source = utf8.baseAddress else { return }
+        if table.count + utf8.count > table.capacity {
+            table.capacity = max(table.capacity * 2, table.count + utf8.count)
+            table.bytes = realloc(table.bytes, table.capacity)!
+        }
+        (table.bytes + table.count).copyMemory(from: source, byteCount: utf8.count)
+        table.count += utf8.count
     }
 }
 
-func viewHierarchy(
-    _ view: NSUIView?,
-    indentation: String = "",
-    isLast: Bool = true,
-    mode: String = "normal",
-    depth: Int? = nil,
-    address: Bool = false
+// Appends the rows of the hierarchy under `root` to `table`, numbering nodes from `count`.
+func hierarchyRows(
+    _ root: AnyObject,
+    table: inout (bytes: UnsafeMutableRawPointer, count: Int, capacity: Int),
+    count: inout Int,
+    depth: Int?,
+    detail: Bool,
+    layers: Bool = false
 ) {
-    guard let view = view else { return }
+    // (object, parent index, depth), popped from the end
+    var stack: [(AnyObject, Int, Int)] = [(root, -1, 0)]
+    while let entry = stack.popLast() {
+        let (object, parent, level) = entry
+        let index = count
+        count += 1
 
-    let currentDepth = indentation.replacingOccurrences(of: "│", with: " ").count / 3
-    if let depth, currentDepth > depth {
-        return
-    }
+        let (kind, frame, isHidden) = hierarchyAttributes(of: object)
+        let children = hierarchyChildren(of: object, layers: layers)
+        let address = UInt(bitPattern: Unmanaged.passUnretained(object).toOpaque())
+
+        var row = "\(parent)\t\(kind)\t\(String(describing: type(of: object)))"
+        row += "\t\(Double(frame.minX))\t\(Double(frame.minY))\t\(Double(frame.width))\t\(Double(frame.height))"
+        row += "\t\(String(address, radix: 16))\t\(isHidden ? 1 : 0)\t\(children.count)"
+        if detail {
+            let description = String(describing: object)
+                .replacingOccurrences(of: "\t", with: " ")
+                .replacingOccurrences(of: "\n", with: " ")
+            row += "\t\(description)"
+        }
+        row += "\n"
+        hierarchyAppend(row, to: &table)
 
-    var result = ""
-    if isLast {
-        result += "\(indentation)└─"
-    } else {
-        result += "\(indentation)├─"
+        if let depth, level >= depth {
+            continue
+        }
+        for child in children.reversed() {
+            stack.append((child, index, level + 1))
+        }
     }
+}
+
+// Returns a digest of the hierarchy under `root` as "hash<TAB>number of nodes", with the hash in hex.
+//
+// The hash is FNV-1a of the fields of `hierarchyTable` without descriptions (parent index, class name, frame,
+// address, hidden flag and number of children) in the same order, so it changes whenever the table would,
+// but only a few bytes are returned.
+func hierarchyDigest(_ root: AnyObject?) -> Data {
+    guard let root = root else { return Data() }
 
-    var viewDescription: String
-    switch mode {
-    case "simple":
-        viewDescription = "\(String(describing: type(of: view)))"
-    case "detail": viewDescription = "\(view)"
-    default:
-        let frameDescription = frameDescription(view.frame)
-        viewDescription = "\(String(describing: type(of: view))) \(frameDescription)"
+    var hash: UInt64 = 0xcbf29ce484222325
+    func mix(_ value: UInt64) {
+        for shift in stride(from: 0, to: 64, by: 8) {
+            hash = (hash ^ ((value >> UInt64(shift)) & 0xff)) &* 0x100000001b3
+        }
     }
-    if address && mode != "detail" { viewDescription += ": \(addressDescription(of: view))" }
 
-    result += viewDescription
+    var count = 0
+    // (object, parent index), popped from the end
+    var stack: [(AnyObject, Int)] = [(root, -1)]
+    while let entry = stack.popLast() {
+        let (object, parent) = entry
+        let index = count
+        count += 1
 
-    print(result)
+        let (_, frame, isHidden) = hierarchyAttributes(of: object)
+        let children = hierarchyChildren(of: object)
+        mix(UInt64(bitPattern: Int64(parent)))
+        for byte in String(describing: type(of: object)).utf8 {
+            hash = (hash ^ UInt64(byte)) &* 0x100000001b3
+        }
+        for value in [frame.minX, frame.minY, frame.width, frame.height] {
+            mix(Double(value).bitPattern)
+        }
+        mix(UInt64(UInt(bitPattern: Unmanaged.passUnretained(object).toOpaque())))
+        mix(isHidden ? 1 : 0)
+        mix(UInt64(children.count))
 
-    for (index, subview) in view.subviews.enumerated() {
-        let isLastSubview = index == view.subviews.count - 1
-        viewHierarchy(
-            subview,
-            indentation: indentation + (isLast ? "   " : "│  "),
-            isLast: isLastSubview,
-            mode: mode,
-            depth: depth,
-            address: address
-        )
+        for child in children.reversed() {
+            stack.append((child, index))
+        }
     }
+    return Data("\(String(hash, radix: 16))\t\(count)\n".utf8)
 }
 
-func layerHierarchy(
-    _ layer: CALayer?,
-    indentation: String = "",
-    isLast: Bool = true,
-    mode: String = "normal",
-    depth: Int? = nil,
-    address: Bool = false
-) {
-    guard let layer = layer else { return }
-
-    let currentDepth = indentation.replacingOccurrences(of: "│", with: " ").count / 3
-    if let depth, currentDepth > depth {
-        return
+// Returns the kind (w: window, c: view controller, v: view, l: layer), frame and hidden flag of an object.
+func hierarchyAttributes(of object: AnyObject) -> (String, CGRect, Bool) {
+    if let window = object as? NSUIWindow {
+        return ("w", window.frame, (object as? NSUIView)?.isHidden ?? false)
+    } else if let viewController = object as? NSUIViewController {
+        return ("c", viewController.view.frame, viewController.view.isHidden)
+    } else if let view = object as? NSUIView {
+        return ("v", view.frame, view.isHidden)
+    } else if let layer = object as? CALayer {
+        return ("l", layer.frame, layer.isHidden)
     }
+    return ("v", .zero, false)
+}
 
-    var result = ""
-    if isLast {
-        result += "\(indentation)└─"
-    } else {
-        result += "\(indentation)├─"
+// Returns the children shown under an object: the root view controller of a window,
+// the child view controllers and the subviews of the view of a view controller,
+// the subviews of a view, and the sublayers of a layer.
+// With `layers`, the sublayers of the layer of a view that are not layers of subviews follow the subviews.
+func hierarchyChildren(of object: AnyObject, layers: Bool = false) -> [AnyObject] {
+    if let window = object as? NSUIWindow {
+        var rootViewController: NSUIViewController?
+        if window.responds(to: Selector(("rootViewController"))) { // for iOS
+            rootViewController = window.perform(Selector(("rootViewController"))).takeUnretainedValue() as? NSUIViewController
+        } else if window.responds(to: Selector(("contentViewController"))) { // for macOS
+            rootViewController = window.perform(Selector(("contentViewController"))).takeUnretainedValue() as? NSUIViewController
+        }
+        return rootViewController.map { [$0] } ?? []
+    } else if let viewController = object as? NSUIViewController {
+        return viewController.children + (layers ? hierarchyChildren(of: viewController.view, layers: true) : viewController.view.subviews)
+    } else if let view = object as? NSUIView {
+        guard layers else { return view.subviews }
+        let layer: CALayer? = view.layer
+        let sublayers = (layer?.sublayers ?? []).filter { !($0.delegate is NSUIView) }
+        return view.subviews + sublayers
+    } else if let layer = object as? CALayer {
+        return layer.sublayers ?? []
     }
+    return []
+}
 
-    var layerDescription: String
-    switch mode {
-    case "simple": layerDescription = "\(String(describing: type(of: layer)))"
-    case "detail": layerDescription = "\(layer)"
-    default:
-        let frameDescription = frameDescription(layer.frame)
-        layerDescription = "\(String(describing: type(of: layer))) \(frameDescription)"
+// Finds the objects under `root` matching all given criteria, checked while walking the hierarchy.
+//
+// `className` matches the class or a superclass, `identifier` the accessibility identifier,
+// `label` a part of the accessibility label (ignoring case), `tag` the tag of views, and `point` ("x,y")
+// a point inside the frame in window coordinates.
+// With `options` 1, hidden and transparent objects are skipped with their subtrees; with 2, offscreen ones are.
+//
+// Returns one line per match with tab separated fields: kind, class name, x, y, width, height, address (hex),
+// accessibility identifier, accessibility label and the class names from the root to the object separated by " > ",
+// then a line of "#", the number of visited nodes and 1 if the search stopped after `limit` matches.
+func hierarchyFind(
+    _ root: AnyObject?,
+    className: String? = nil,
+    identifier: String? = nil,
+    label: String? = nil,
+    tag: Int? = nil,
+    point: String? = nil,
+    options: Int = 0,
+    limit: Int = 0
+) -> Data {
+    guard let root = root else { return Data() }
+
+    var location: CGPoint?
+    if let point {
+        let values = point.split(separator: ",").compactMap { Double($0.trimmingCharacters(in: .whitespaces)) }
+        if values.count == 2 {
+            location = CGPoint(x: values[0], y: values[1])
+        }
     }
-    if address && mode != "detail" { layerDescription += ": \(addressDescription(of: layer))" }
 
-    result += layerDescription
+    var table = ""
+    var matches = 0
+    var isLimited = false
+    // class names and parent indexes of visited nodes, for the paths of matches
+    var names: [String] = []
+    var parents: [Int] = []
+    // (object, parent index), popped from the end
+    var stack: [(AnyObject, Int)] = [(root, -1)]
+    while let entry = stack.popLast() {
+        let (object, parent) = entry
+
+        if options & 1 != 0 && !hierarchyIsVisible(object) {
+            continue
+        }
+        let rect = hierarchyWindowRect(of: object)
+        if options & 2 != 0, let rect, let bounds = hierarchyWindowBounds(of: object), !rect.intersects(bounds) {
+            continue
+        }
+
+        let index = names.count
+        let name = String(describing: type(of: object))
+        names.append(name)
+        parents.append(parent)
+
+        var isMatch = true
+        if let className {
+            isMatch = false
+            var cls: AnyClass? = type(of: object)
+            while let current = cls {
+                // The unqualified name, or `Module.Name` as the objc commands report Swift classes (also for nested classes)
+                if String(describing: current) == className || NSStringFromClass(current) == className || _typeName(current) == className {
+                    isMatch = true
+                    break
+                }
+                cls = class_getSuperclass(current)
+            }
+        }
+        let objectIdentifier = hierarchyString(object, "accessibilityIdentifier")
+        let objectLabel = hierarchyString(object, "accessibilityLabel")
+        if isMatch, let identifier {
+            isMatch = objectIdentifier == identifier
+        }
+        if isMatch, let label {
+            isMatch = objectLabel?.range(of: label, options: .caseInsensitive) != nil
+        }
+        if isMatch, let tag {
+            isMatch = (object as? NSObject)?.responds(to: Selector(("tag"))) == true
+                && ((object as? NSObject)?.value(forKey: "tag") as? Int) == tag
+        }
+        if isMatch, let location {
+            isMatch = rect?.contains(location) ?? false
+        }
+
+        if isMatch {
+            if limit > 0 && matches >= limit {
+                isLimited = true
+                break
+            }
+            matches += 1
+
+            var path: [String] = []
+            var current = index
+            while current >= 0 {
+                path.append(names[current])
+                current = parents[current]
+            }
+            let frame = rect ?? .zero
+            let address = UInt(bitPattern: Unmanaged.passUnretained(object).toOpaque())
+            let kind = object is NSUIWindow ? "w" : object is NSUIViewController ? "c" : object is CALayer ? "l" : "v"
+            table += "\(kind)\t\(name)"
+            table += "\t\(Double(frame.minX))\t\(Double(frame.minY))\t\(Double(frame.width))\t\(Double(frame.height))"
+            table += "\t\(String(address, radix: 16))"
+            for text in [objectIdentifier ?? "", objectLabel ?? "", path.reversed().joined(separator: " > ")] {
+                table += "\t" + text.replacingOccurrences(of: "\t", with: " ").replacingOccurrences(of: "\n", with: " ")
+            }
+            table += "\n"
+        }
 
-    print(result)
+        for child in hierarchyChildren(of: object).reversed() {
+            stack.append((child, index))
+        }
+    }
+    table += "#\t\(names.count)\t\(isLimited ? 1 : 0)\n"
+    return Data(table.utf8)
+}
 
-    guard let sublayers = layer.sublayers else { return }
-    for (index, sublayer) in sublayers.enumerated() {
-        let isLastSublayer = index == sublayers.count - 1
-        layerHierarchy(
-            sublayer,
-            indentation: indentation + (isLast ? "   " : "│  "),
-            isLast: isLastSublayer,
-            mode: mode,
-            depth: depth,
-            address: address
-        )
+// Returns whether an object is neither hidden nor transparent.
+func hierarchyIsVisible(_ object: AnyObject) -> Bool {
+    if let layer = object as? CALayer {
+        return !layer.isHidden && layer.opacity > 0
+    }
+    #if os(macOS)
+    if let window = object as? NSUIWindow {
+        return window.isVisible && window.alphaValue > 0
     }
+    #endif
+    guard let view = (object as? NSUIViewController)?.view ?? (object as? NSUIView) else { return true }
+    #if os(macOS)
+    return !view.isHidden && view.alphaValue > 0
+    #else
+    return !view.isHidden && view.alpha > 0
+    #endif
 }
 
-func frameDescription(_ frame: CGRect) -> String {
-    String(
-        format: "(%.1f, %.1f, %.1f, %.1f)",
-        arguments: [
-            frame.minX,
-            frame.minY,
-            frame.width,
-            frame.height
-        ]
-    )
+// Returns the frame of an object in the coordinates of its window (or root layer).
+func hierarchyWindowRect(of object: AnyObject) -> CGRect? {
+    if let window = object as? NSUIWindow {
+        return CGRect(origin: .zero, size: window.frame.size)
+    }
+    if let view = (object as? NSUIViewController)?.view ?? (object as? NSUIView) {
+        return view.convert(view.bounds, to: nil)
+    }
+    if let layer = object as? CALayer {
+        return layer.convert(layer.bounds, to: nil)
+    }
+    return nil
+}
+
+// Returns the bounds of the window of an object, or nil if it is not in a window.
+func hierarchyWindowBounds(of object: AnyObject) -> CGRect? {
+    if let window = object as? NSUIWindow {
+        return CGRect(origin: .zero, size: window.frame.size)
+    }
+    guard let window = ((object as? NSUIViewController)?.view ?? (object as? NSUIView))?.window else { return nil }
+    return CGRect(origin: .zero, size: window.frame.size)
 }
 
-func addressDescription(of object: AnyObject) -> String {
-    let unmanaged = Unmanaged.passUnretained(object)
-    return unmanaged.toOpaque().debugDescription
+// Returns a string property (e.g. `accessibilityIdentifier`) of an object that has it.
+func hierarchyString(_ object: AnyObject, _ key: String) -> String? {
+    guard let object = object as? NSObject, object.responds(to: Selector(key)) else { return nil }
+    return object.value(forKey: key) as? String
 }
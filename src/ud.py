@@ -1,9 +1,10 @@
 import lldb
-import shlex
+import struct
 import argparse
-from typing import Union, cast
+from typing import Union
 from lldbhelper import LLDBCommandBase
 import util
+import command_list
 
 
 def __lldb_init_module(debugger: lldb.SBDebugger, internal_dict: dict) -> None:
@@ -18,7 +19,7 @@ class UserDefaultsCommnad(LLDBCommandBase):
 
     @classmethod
     def description(cls) -> str:
-        return 'UserDefault debugging. [iLLDB]'
+        return command_list.short_help(cls.cmdname())
 
     def create_argparser(self) -> argparse.ArgumentParser:
         description = "UserDefault debugging"
@@ -79,51 +80,86 @@ class UserDefaultsCommnad(LLDBCommandBase):
         exe_ctx: lldb.SBExecutionContext,
         result: lldb.SBCommandReturnObject
     ) -> None:
-        args: Union[list[str], argparse.Namespace] = shlex.split(command, posix=False)
-        args = self.argparser.parse_args(cast(list[str], args))
-        args = cast(argparse.Namespace, args)
+        args = self.parse_args(command)
 
         if args.subcommand is None:
             self.argparser.print_help()
             exit(0)
 
-        script = ""
-        if args.suite is not None:
-            script += """
-            @import Foundation;
-            NSUserDefaults *userDefaults = [[NSUserDefaults alloc] initWithSuiteName:suiteName];
-            """
-        else:
-            script += """
-            @import Foundation;
-            NSUserDefaults *userDefaults = [NSUserDefaults standardUserDefaults];
-            """
+        script = """
+        @import Foundation;
+        NSString *suiteName = __illdb_arg_string(0);
+        NSUserDefaults *userDefaults = (suiteName != nil)
+            ? [[NSUserDefaults alloc] initWithSuiteName:suiteName]
+            : [NSUserDefaults standardUserDefaults];
+        """
+        arguments: list[util.ArgumentValue] = [
+            util.unquote(args.suite) if args.suite is not None else None,
+            util.unquote(args.key) if 'key' in args else None,
+            util.unquote(args.value) if 'value' in args else None
+        ]
 
         if args.subcommand == "read":
-            key = args.key
-            script += f"""({{
-            id val = [userDefaults stringForKey:@\"{key}\"];
-            if (val != nil) {{
-                printf("\\"%s\\"", (char*)[val UTF8String]);
-            }} else {{
-                val = [userDefaults objectForKey:@\"{key}\"];
-            }}
-            val;
-            }})
+            script += """
+            id value = [userDefaults objectForKey:__illdb_arg_string(1)];
+            NSDictionary *__illdb_result = (value != nil) ? @{@"value": value} : @{};
             """
+            values = util.exp_object(
+                debugger,
+                script,
+                lang=lldb.eLanguageTypeObjC_plus_plus,
+                policy=util.expression_policy(self.cmdname()),
+                arguments=arguments,
+                cacheable=True
+            )
+            if values is None:
+                return
+            if 'value' not in values:
+                result.AppendMessage("nil")
+            elif isinstance(values['value'], str):
+                result.AppendMessage(f'"{values["value"]}"')
+            else:
+                result.AppendMessage(util.describe_object(values['value']))
+            return
         elif args.subcommand == "write":
-            key = args.key
-            type = args.type
-            value = args.value
-            if type == "number":
-                script += f"[userDefaults setObject:@({value}) forKey:@\"{key}\"];"
+            if args.type == "number":
+                try:
+                    number = self.parse_number(util.unquote(args.value))
+                except ValueError:
+                    result.SetError(f"Invalid number: {args.value}")
+                    return
+                if isinstance(number, bool):
+                    arguments[2] = number
+                    script += "[userDefaults setObject:@((BOOL)__illdb_arg_int(2)) forKey:__illdb_arg_string(1)];"
+                elif isinstance(number, int):
+                    arguments[2] = number
+                    script += "[userDefaults setObject:@(__illdb_arg_int(2)) forKey:__illdb_arg_string(1)];"
+                else:
+                    # The bits of the double, so that the value is passed exactly
+                    arguments[2] = struct.unpack('<q', struct.pack('<d', number))[0]
+                    script += """
+                    long long bits = __illdb_arg_int(2);
+                    double number;
+                    memcpy(&number, &bits, sizeof(number));
+                    [userDefaults setObject:@(number) forKey:__illdb_arg_string(1)];
+                    """
             else:
-                script += f"[userDefaults setObject:@\"{value}\" forKey:@\"{key}\"];"
+                script += "[userDefaults setObject:__illdb_arg_string(2) forKey:__illdb_arg_string(1)];"
         elif args.subcommand == "delete":
-            key = args.key
-            script += f"[userDefaults removeObjectForKey:@\"{key}\"];"
+            script += "[userDefaults removeObjectForKey:__illdb_arg_string(1)];"
         elif args.subcommand == "read-all":
-            script += "[userDefaults dictionaryRepresentation];"
+            script += "NSDictionary *__illdb_result = [userDefaults dictionaryRepresentation];"
+            values = util.exp_object(
+                debugger,
+                script,
+                lang=lldb.eLanguageTypeObjC_plus_plus,
+                policy=util.expression_policy(self.cmdname()),
+                arguments=arguments,
+                cacheable=True
+            )
+            if values is not None:
+                result.AppendMessage(util.describe_object(values))
+            return
         elif args.subcommand == "delete-all":
             script += r"""
             NSDictionary *allUserDefaults = [userDefaults dictionaryRepresentation];
@@ -139,7 +175,32 @@ class UserDefaultsCommnad(LLDBCommandBase):
         ret = util.exp_script(
             debugger,
             script,
-            lang=lldb.eLanguageTypeObjC_plus_plus
+            lang=lldb.eLanguageTypeObjC_plus_plus,
+            policy=util.expression_policy(self.cmdname()),
+            arguments=arguments
         )
+        util.flush_expression_cache()
         if ret:
             result.AppendMessage(ret.GetObjectDescription())
+
+    def parse_number(self, value: str) -> Union[bool, int, float]:
+        """
+        Parses a number as Objective-C literals read it: `YES`/`NO` and `true`/`false`, integers with a
+        `0x`, `0o` or `0b` prefix, and floating point numbers.
+
+        Raises:
+            ValueError: If the value is not a number.
+        """
+        if value.lower() in ('yes', 'true'):
+            return True
+        elif value.lower() in ('no', 'false'):
+            return False
+        try:
+            return int(value, 0)
+        except ValueError:
+            pass
+        try:
+            # Leading zeros are not allowed with base 0
+            return int(value, 10)
+        except ValueError:
+            return float(value)
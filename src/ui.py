@@ -1,9 +1,12 @@
+import os
 import lldb
-import shlex
 import argparse
-from typing import Union, cast
+from typing import Optional
 from lldbhelper import LLDBCommandBase
 import util
+import ui_hierarchy
+import objc_memory
+import command_list
 
 
 def __lldb_init_module(debugger: lldb.SBDebugger, internal_dict: dict) -> None:
@@ -18,7 +21,7 @@ class UICommnad(LLDBCommandBase):
 
     @classmethod
     def description(cls) -> str:
-        return 'UI debugging. [iLLDB]'
+        return command_list.short_help(cls.cmdname())
 
     def create_argparser(self) -> argparse.ArgumentParser:
         parser = argparse.ArgumentParser(description="UI debugging",
@@ -37,6 +40,54 @@ class UICommnad(LLDBCommandBase):
         tree_command.add_argument("--view", type=str, help="Specify the target view (property or address)")
         tree_command.add_argument("--vc", type=str, help="Specify the target viewController (property or address)")
         tree_command.add_argument("--layer", type=str, help="Specify the target CALayer (property or address)")
+        tree_command.add_argument("--expand",
+                                  type=str,
+                                  metavar="ADDRESS",
+                                  help="Show the subtree of a node shown with --with-address, fetching only the nodes "
+                                       "not fetched yet at this stop (--depth defaults to 1)")
+        tree_command.add_argument("--export",
+                                  type=str,
+                                  metavar="PATH",
+                                  help="Write the hierarchy to a file instead, as JSON (.json) or Graphviz (.dot), "
+                                       "reading it from the process in chunks")
+        tree_command.add_argument("--layers", action="store_true", help="Include the sublayers of views (with --export)")
+
+        find_command = subparsers.add_parser("find",
+                                             help="Find windows, view controllers, views or layers matching criteria",
+                                             formatter_class=util.HelpFormatter)
+        find_command.add_argument("--class", dest='class_name', type=str, help="Class or superclass name")
+        find_command.add_argument("--id", dest='identifier', type=str, help="Accessibility identifier")
+        find_command.add_argument("--label", type=str, help="Text contained in the accessibility label (ignoring case)")
+        find_command.add_argument("--tag", type=int, help="Tag of view")
+        find_command.add_argument("--point", type=str, help="Point inside the frame in window coordinates (X,Y)")
+        find_command.add_argument("--visible", action="store_true", help="Skip hidden and transparent subtrees")
+        find_command.add_argument("--onscreen", action="store_true", help="Skip subtrees outside their window")
+        find_command.add_argument("--limit", type=int, default=100, help="Maximum number of results (0 for no limit)")
+
+        find_command.add_argument("--window", type=str, help="Specify the target window")
+        find_command.add_argument("--view", type=str, help="Specify the target view (property or address)")
+        find_command.add_argument("--vc", type=str, help="Specify the target viewController (property or address)")
+        find_command.add_argument("--layer", type=str, help="Specify the target CALayer (property or address)")
+
+        snapshot_command = subparsers.add_parser("snapshot",
+                                                 help="Save the state of the nodes of a hierarchy for `ui diff`",
+                                                 formatter_class=util.HelpFormatter)
+        snapshot_command.add_argument("name", nargs="?", type=str, help="Name of the snapshot")
+        snapshot_command.add_argument("--list", action="store_true", help="List saved snapshots")
+        snapshot_command.add_argument("--delete", action="store_true", help="Delete the snapshot")
+
+        snapshot_command.add_argument("--window", type=str, help="Specify the target window")
+        snapshot_command.add_argument("--view", type=str, help="Specify the target view (property or address)")
+        snapshot_command.add_argument("--vc", type=str, help="Specify the target viewController (property or address)")
+        snapshot_command.add_argument("--layer", type=str, help="Specify the target CALayer (property or address)")
+
+        diff_command = subparsers.add_parser("diff",
+                                             help="Show added, removed, moved and resized nodes between snapshots",
+                                             formatter_class=util.HelpFormatter)
+        diff_command.add_argument("before", type=str, help="Name of the older snapshot")
+        diff_command.add_argument("after", nargs="?", type=str,
+                                  help="Name of the newer snapshot (the current hierarchy of the same target if omitted)")
+        diff_command.add_argument("--limit", type=int, default=100, help="Maximum number of nodes shown for each change (0 for no limit)")
 
         return parser
 
@@ -47,12 +98,16 @@ class UICommnad(LLDBCommandBase):
         exe_ctx: lldb.SBExecutionContext,
         result: lldb.SBCommandReturnObject
     ) -> None:
-        args: Union[list[str], argparse.Namespace] = shlex.split(command, posix=False)
-        args = self.argparser.parse_args(cast(list[str], args))
-        args = cast(argparse.Namespace, args)
+        args = self.parse_args(command)
 
         if args.subcommand == "tree":
             self.tree(args, debugger, result)
+        elif args.subcommand == "find":
+            self.find(args, debugger, result)
+        elif args.subcommand == "snapshot":
+            self.snapshot(args, debugger, result)
+        elif args.subcommand == "diff":
+            self.diff(args, debugger, result)
         else:
             self.argparser.print_help()
 
@@ -63,62 +118,238 @@ class UICommnad(LLDBCommandBase):
         if args.simple:
             mode = 'simple'
 
-        depth = 'nil'
-        if args.depth is not None:
+        if args.expand is not None:
+            self.expand(args, mode, debugger, result)
+            return
+        if args.export is not None:
+            self.export(args, mode, debugger, result)
+            return
+
+        root, address = self.root_expression(args)
+        table = ui_hierarchy.hierarchy_reader.table(
+            debugger,
+            root,
+            address,
+            depth=args.depth,
+            detail=mode == 'detail',
+            policy=util.expression_policy(self.cmdname())
+        )
+        if table is None:
+            result.SetError("Failed to read the hierarchy")
+            return
+
+        lines = table.render(mode, args.depth, args.with_address)
+        if lines:
+            result.AppendMessage('\n'.join(lines))
+
+    def find(self, args: argparse.Namespace, debugger: lldb.SBDebugger, result: lldb.SBCommandReturnObject) -> None:
+        point: Optional[tuple[float, float]] = None
+        if args.point is not None:
             try:
-                depth = str(int(args.depth))
+                x, y = util.unquote(args.point).split(',')
+                point = (float(x), float(y))
             except ValueError:
-                pass
-
-        with_address = 'true' if args.with_address else 'false'
-
-        script = ''
-
-        if util.isUIKit(debugger):
-            script += """
-            import UIKit
-            typealias NSUIView = UIView
-            typealias NSUIViewController = UIViewController
-            typealias NSUIWindow = UIWindow
-            typealias NSUIApplication = UIApplication
-            """
-        elif util.isAppKit(debugger):
-            script += """
-            import AppKit
-            typealias NSUIView = NSView
-            typealias NSUIViewController = NSViewController
-            typealias NSUIWindow = NSWindow
-            typealias NSUIApplication = NSApplication
-            """
-
-        self.resolve_adress(args)
-
-        script += util.read_script_file('swift/tree.swift')
+                result.SetError(f"Invalid point: {args.point}")
+                return
+
+        query = ui_hierarchy.HierarchyQuery(
+            class_name=objc_memory.demangle_class_name(util.unquote(args.class_name)) if args.class_name is not None else None,
+            identifier=util.unquote(args.identifier) if args.identifier is not None else None,
+            label=util.unquote(args.label) if args.label is not None else None,
+            tag=args.tag,
+            point=point,
+            skip_hidden=args.visible,
+            skip_offscreen=args.onscreen,
+            limit=max(args.limit, 0)
+        )
+        root, address = self.root_expression(args)
+        found = ui_hierarchy.hierarchy_reader.find(
+            debugger,
+            root,
+            query,
+            address,
+            policy=util.expression_policy(self.cmdname())
+        )
+        if found is None:
+            result.SetError("Failed to search the hierarchy")
+            return
+
+        text = f"{len(found.matches)} matches in {found.visited} objects"
+        if found.limited:
+            text += f" (stopped at {len(found.matches)})"
+        for match in found.matches:
+            text += f"\n    {match}\n        {match.path}"
+        result.AppendMessage(text)
+
+    def snapshot(self, args: argparse.Namespace, debugger: lldb.SBDebugger, result: lldb.SBCommandReturnObject) -> None:
+        snapshots = ui_hierarchy.hierarchy_snapshots
+        if args.list:
+            saved = snapshots.all()
+            lines = [f"{len(saved)} snapshots"]
+            lines += [f"    {snapshot.name}: {len(snapshot.nodes)} nodes of {snapshot.root}" for snapshot in saved]
+            result.AppendMessage('\n'.join(lines))
+            return
+        if args.name is None:
+            result.SetError("A snapshot name is required")
+            return
+        name = util.unquote(args.name)
+        if args.delete:
+            if not snapshots.remove(name):
+                result.SetError(f"No snapshot named '{name}'")
+            return
+
+        root, address = self.root_expression(args)
+        captured = snapshots.capture(debugger, name, root, address, policy=util.expression_policy(self.cmdname()))
+        if captured is None:
+            result.SetError("Failed to read the hierarchy")
+            return
+
+        snapshot, unchanged = captured
+        snapshots.save(snapshot)
+        text = f"Saved snapshot '{name}' ({len(snapshot.nodes)} nodes"
+        if unchanged is not None and unchanged.name != name:
+            text += f", unchanged since '{unchanged.name}'"
+        result.AppendMessage(text + ")")
+
+    def diff(self, args: argparse.Namespace, debugger: lldb.SBDebugger, result: lldb.SBCommandReturnObject) -> None:
+        snapshots = ui_hierarchy.hierarchy_snapshots
+        before = snapshots.get(util.unquote(args.before))
+        if before is None:
+            result.SetError(f"No snapshot named '{args.before}'")
+            return
+
+        if args.after is not None:
+            after = snapshots.get(util.unquote(args.after))
+            if after is None:
+                result.SetError(f"No snapshot named '{args.after}'")
+                return
+        else:
+            captured = snapshots.capture(
+                debugger,
+                'current',
+                before.root,
+                before.address,
+                policy=util.expression_policy(self.cmdname())
+            )
+            if captured is None:
+                result.SetError("Failed to read the hierarchy")
+                return
+            after = captured[0]
+
+        diff = ui_hierarchy.HierarchyDiff.compare(before, after)
+        if not diff:
+            result.AppendMessage(f"No changes between '{before.name}' and '{after.name}'")
+            return
+
+        lines = [f"'{before.name}' ({len(before.nodes)} nodes) -> '{after.name}' ({len(after.nodes)} nodes): {diff.summary()}"]
+        lines += diff.render(before, after, max(args.limit, 0))
+        result.AppendMessage('\n'.join(lines))
+
+    def root_expression(self, args: argparse.Namespace) -> tuple[str, Optional[int]]:
+        """
+        Returns the Swift expression of the target object of a subcommand (the key window by default).
+
+        Args:
+            args (argparse.Namespace): The parsed arguments with the `window`, `view`, `vc` and `layer` options.
+
+        Returns:
+            tuple[str, Optional[int]]: The expression, and the address it reads from the 3rd argument, if any.
+        """
+        address = self.resolve_adress(args)
         if args.window is not None:
-            script += f"\n windowHierarchy({args.window}, mode: \"{mode}\", depth: {depth}, address: {with_address})"
+            return (args.window, address)
         elif args.view is not None:
-            script += f"\n viewHierarchy({args.view}, mode: \"{mode}\", depth: {depth}, address: {with_address})"
+            return (args.view, address)
         elif args.vc is not None:
-            script += f"\n viewControllerHierarchy({args.vc}, mode: \"{mode}\", depth: {depth}, address: {with_address})"
+            return (args.vc, address)
         elif args.layer is not None:
-            script += f"\n layerHierarchy({args.layer}, mode: \"{mode}\", depth: {depth}, address: {with_address})"
-        else:
-            script += f"\n windowHierarchy(NSUIApplication.shared.keyWindow, mode: \"{mode}\", depth: {depth}, address: {with_address})"
+            return (args.layer, address)
+        return ("NSUIApplication.shared.keyWindow", address)
+
+    def expand(
+        self,
+        args: argparse.Namespace,
+        mode: str,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        try:
+            address = int(args.expand, 16)
+        except ValueError:
+            result.SetError(f"Invalid address: {args.expand}")
+            return
 
-        _ = util.exp_script(
+        depth = args.depth if args.depth is not None else 1
+        table = ui_hierarchy.hierarchy_reader.expand(
             debugger,
-            script
+            address,
+            depth,
+            detail=mode == 'detail',
+            policy=util.expression_policy(self.cmdname())
         )
+        if table is None:
+            result.SetError(f"Failed to read the hierarchy of {args.expand}")
+            return
+
+        result.AppendMessage('\n'.join(table.render(mode, depth, args.with_address)))
+
+    def export(
+        self,
+        args: argparse.Namespace,
+        mode: str,
+        debugger: lldb.SBDebugger,
+        result: lldb.SBCommandReturnObject
+    ) -> None:
+        path = os.path.expanduser(util.unquote(args.export))
+        if os.path.splitext(path)[1].lower() not in ui_hierarchy.EXPORT_WRITERS:
+            result.SetError(f"Unsupported format: {args.export} (use .json or .dot)")
+            return
+
+        root, address = self.root_expression(args)
+        count = ui_hierarchy.hierarchy_reader.export(
+            debugger,
+            root,
+            path,
+            address,
+            depth=args.depth,
+            detail=mode == 'detail',
+            layers=args.layers,
+            policy=util.expression_policy(self.cmdname())
+        )
+        if count is None:
+            result.SetError(f"Failed to export the hierarchy to {path}")
+            return
+
+        result.AppendMessage(f"Exported {count} nodes to {path}")
+
+    def resolve_adress(self, args: argparse.Namespace) -> Optional[int]:
+        """
+        Replaces a target given as an address with an expression reading the address from the argument block.
+
+        Args:
+            args (argparse.Namespace): The parsed arguments. The target option is rewritten in place.
 
-    def resolve_adress(self, args: argparse.Namespace) -> None:
+        Returns:
+            Optional[int]: The address to be passed as the 3rd argument, or None if the target is not an address.
+        """
+        bit_pattern = ".init(bitPattern: __illdb_argInt(2)!)!"
         try:
             if args.window is not None and int(args.window, 16):
-                args.window = f"Unmanaged<NSUIWindow>.fromOpaque(.init(bitPattern: {args.window})!).takeUnretainedValue()"
+                address = int(args.window, 16)
+                args.window = f"Unmanaged<NSUIWindow>.fromOpaque({bit_pattern}).takeUnretainedValue()"
+                return address
             elif args.view is not None and int(args.view, 16):
-                args.view = f"Unmanaged<NSUIView>.fromOpaque(.init(bitPattern: {args.view})!).takeUnretainedValue()"
+                address = int(args.view, 16)
+                args.view = f"Unmanaged<NSUIView>.fromOpaque({bit_pattern}).takeUnretainedValue()"
+                return address
             elif args.vc is not None and int(args.vc, 16):
-                args.vc = f"Unmanaged<NSUIViewController>.fromOpaque(.init(bitPattern: {args.vc})!).takeUnretainedValue()"
+                address = int(args.vc, 16)
+                args.vc = f"Unmanaged<NSUIViewController>.fromOpaque({bit_pattern}).takeUnretainedValue()"
+                return address
             elif args.layer is not None and int(args.layer, 16):
-                args.layer = f"Unmanaged<CALayer>.fromOpaque(.init(bitPattern: {args.layer})!).takeUnretainedValue()"
+                address = int(args.layer, 16)
+                args.layer = f"Unmanaged<CALayer>.fromOpaque({bit_pattern}).takeUnretainedValue()"
+                return address
         except ValueError:
             pass
+        return None
@@ -0,0 +1,1097 @@
+import os
+import json
+import codecs
+import lldb
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from typing import Iterator, Optional, TextIO
+import util
+from lldbhelper import profiler
+
+HIERARCHY_SYMBOLS = (
+    'hierarchyTable',
+    'hierarchySubtrees',
+    'hierarchyBuffer',
+    'hierarchyAppend',
+    'hierarchyRows',
+    'hierarchyDigest',
+    'hierarchyAttributes',
+    'hierarchyChildren',
+    'hierarchyFind',
+    'hierarchyIsVisible',
+    'hierarchyWindowRect',
+    'hierarchyWindowBounds',
+    'hierarchyString',
+)
+
+# Kinds of nodes
+KIND_WINDOW = 'w'
+KIND_VIEW_CONTROLLER = 'c'
+KIND_VIEW = 'v'
+KIND_LAYER = 'l'
+
+FLAG_HIDDEN = 1
+
+KIND_NAMES = {
+    KIND_WINDOW: 'window',
+    KIND_VIEW_CONTROLLER: 'viewController',
+    KIND_VIEW: 'view',
+    KIND_LAYER: 'layer',
+}
+
+# Options of `hierarchyFind`
+FIND_SKIP_HIDDEN = 1
+FIND_SKIP_OFFSCREEN = 2
+
+# Bytes read from the process at a time by `HierarchyReader.export`
+EXPORT_CHUNK_SIZE = 1 << 20
+
+
+@dataclass
+class HierarchyNode:
+    """
+    A window, view controller, view or layer of a hierarchy.
+
+    Attributes:
+        parent (int): The index of the parent node, or -1 for the root.
+        kind (str): One of `w` (window), `c` (view controller), `v` (view) and `l` (layer).
+        class_name (str): The class name.
+        frame (tuple[float, float, float, float]): x, y, width and height.
+        address (int): The address of the object.
+        flags (int): `FLAG_HIDDEN` if the object is hidden.
+        child_count (int): The number of children of the object, including those not in the table.
+        description (Optional[str]): The description of the object, if fetched in detail.
+        children (list[int]): The indexes of the children in the table.
+    """
+
+    parent: int
+    kind: str
+    class_name: str
+    frame: tuple[float, float, float, float]
+    address: int
+    flags: int
+    child_count: int
+    description: Optional[str] = None
+    children: list[int] = field(default_factory=list)
+
+    @classmethod
+    def parse(cls, line: str) -> Optional['HierarchyNode']:
+        """Parses a line of a node table (see `hierarchyTable` in `swift/tree.swift`), or returns None if it is malformed."""
+        fields = line.split('\t', 10)
+        if len(fields) < 10:
+            return None
+        try:
+            return HierarchyNode(
+                int(fields[0]),
+                fields[1],
+                fields[2],
+                (float(fields[3]), float(fields[4]), float(fields[5]), float(fields[6])),
+                int(fields[7], 16),
+                int(fields[8]),
+                int(fields[9]),
+                fields[10] if len(fields) > 10 else None
+            )
+        except ValueError:
+            return None
+
+    @property
+    def is_hidden(self) -> bool:
+        return bool(self.flags & FLAG_HIDDEN)
+
+    def frame_description(self) -> str:
+        return "({:.1f}, {:.1f}, {:.1f}, {:.1f})".format(*self.frame)
+
+    def describe(self, mode: str = 'normal', with_address: bool = False) -> str:
+        """
+        Returns the text of the node in a tree.
+
+        Args:
+            mode (str): `simple` (class), `normal` (class and frame) or `detail` (description of the object).
+            with_address (bool): Append the address, except in detail mode.
+
+        Returns:
+            str: The text.
+        """
+        if mode == 'simple':
+            text = self.class_name
+        elif mode == 'detail':
+            text = self.description if self.description is not None else self.class_name
+        else:
+            text = f"{self.class_name} {self.frame_description()}"
+        if with_address and mode != 'detail':
+            text += f": 0x{self.address:016x}"
+        return text
+
+
+@dataclass
+class HierarchyTable:
+    """
+    A hierarchy as returned by `swift/tree.swift`.
+
+    Attributes:
+        nodes (list[HierarchyNode]): The nodes in depth-first order. The root is the first node.
+        depth (Optional[int]): The depth down to which nodes were fetched, or None if all were.
+        detail (bool): Whether descriptions were fetched.
+    """
+
+    nodes: list[HierarchyNode] = field(default_factory=list)
+    depth: Optional[int] = None
+    detail: bool = False
+
+    @classmethod
+    @profiler.timed('decode')
+    def parse(cls, data: bytes, depth: Optional[int] = None, detail: bool = False) -> 'HierarchyTable':
+        """
+        Parses a node table.
+
+        Args:
+            data (bytes): Lines of tab separated fields (see `hierarchyTable` in `swift/tree.swift`).
+            depth (Optional[int]): The depth the table was fetched with.
+            detail (bool): Whether the table has descriptions.
+
+        Returns:
+            HierarchyTable: The table. Malformed lines are skipped.
+        """
+        nodes: list[HierarchyNode] = []
+        for line in data.decode('utf-8', 'replace').split('\n'):
+            node = HierarchyNode.parse(line)
+            if node is None:
+                continue
+            if 0 <= node.parent < len(nodes):
+                nodes[node.parent].children.append(len(nodes))
+            nodes.append(node)
+        return HierarchyTable(nodes, depth, detail)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def covers(self, depth: Optional[int], detail: bool) -> bool:
+        """Returns whether the table has all nodes and fields needed to show a tree down to a depth."""
+        if detail and not self.detail:
+            return False
+        if self.depth is None:
+            return True
+        return depth is not None and depth <= self.depth
+
+    def walk(self, root: int = 0, depth: Optional[int] = None) -> Iterator[tuple[int, int, str, bool]]:
+        """
+        Iterates the nodes under a node in depth-first order.
+
+        Args:
+            root (int): The index of the first node.
+            depth (Optional[int]): The maximum depth below `root`, or None for all.
+
+        Returns:
+            Iterator[tuple[int, int, str, bool]]:
+                The index, depth, indentation of the children and whether it is the last child of each node.
+        """
+        if root >= len(self.nodes):
+            return
+        # (index, depth, indentation, is last), popped from the end
+        stack = [(root, 0, '', True)]
+        while stack:
+            index, level, indentation, is_last = stack.pop()
+            yield (index, level, indentation, is_last)
+            if depth is not None and level >= depth:
+                continue
+            children = self.nodes[index].children
+            child_indentation = indentation + ('   ' if is_last else '│  ')
+            last = len(children) - 1
+            for i in range(last, -1, -1):
+                stack.append((children[i], level + 1, child_indentation, i == last))
+
+    @profiler.timed('render')
+    def render(
+        self,
+        mode: str = 'normal',
+        depth: Optional[int] = None,
+        with_address: bool = False,
+        root: int = 0
+    ) -> list[str]:
+        """
+        Renders the tree under a node.
+        Nodes whose children are not shown (not fetched, or below `depth`) are marked with the number of children.
+
+        Args:
+            mode (str): `simple`, `normal` or `detail` (see `HierarchyNode.describe`).
+            depth (Optional[int]): The maximum depth below `root`, or None for all.
+            with_address (bool): Append addresses.
+            root (int): The index of the first node.
+
+        Returns:
+            list[str]: The lines of the tree.
+        """
+        lines = []
+        for index, level, indentation, is_last in self.walk(root, depth):
+            node = self.nodes[index]
+            branch = '└─' if is_last else '├─'
+            line = f"{indentation}{branch}{node.describe(mode, with_address)}"
+            if node.child_count > 0 and (not node.children or (depth is not None and level >= depth)):
+                line += f" [+{node.child_count}]"
+            lines.append(line)
+        return lines
+
+
+@dataclass
+class HierarchyQuery:
+    """
+    Criteria of objects searched in a hierarchy. Objects must match all given criteria.
+
+    Attributes:
+        class_name (Optional[str]): The class or a superclass.
+        identifier (Optional[str]): The accessibility identifier.
+        label (Optional[str]): A part of the accessibility label, ignoring case.
+        tag (Optional[int]): The tag of a view.
+        point (Optional[tuple[float, float]]): A point inside the frame, in window coordinates.
+        skip_hidden (bool): Skip hidden and transparent objects and their subtrees.
+        skip_offscreen (bool): Skip objects outside their window and their subtrees.
+        limit (int): The maximum number of matches, or 0 for no limit.
+    """
+
+    class_name: Optional[str] = None
+    identifier: Optional[str] = None
+    label: Optional[str] = None
+    tag: Optional[int] = None
+    point: Optional[tuple[float, float]] = None
+    skip_hidden: bool = False
+    skip_offscreen: bool = False
+    limit: int = 0
+
+    @property
+    def options(self) -> int:
+        return (FIND_SKIP_HIDDEN if self.skip_hidden else 0) | (FIND_SKIP_OFFSCREEN if self.skip_offscreen else 0)
+
+
+@dataclass
+class HierarchyMatch:
+    """
+    An object found in a hierarchy.
+
+    Attributes:
+        kind (str): One of `w` (window), `c` (view controller), `v` (view) and `l` (layer).
+        class_name (str): The class name.
+        frame (tuple[float, float, float, float]): x, y, width and height in window coordinates.
+        address (int): The address of the object.
+        identifier (str): The accessibility identifier, or empty.
+        label (str): The accessibility label, or empty.
+        path (str): The class names from the root to the object, separated by ` > `.
+    """
+
+    kind: str
+    class_name: str
+    frame: tuple[float, float, float, float]
+    address: int
+    identifier: str
+    label: str
+    path: str
+
+    def __str__(self) -> str:
+        text = "{} ({:.1f}, {:.1f}, {:.1f}, {:.1f})".format(self.class_name, *self.frame)
+        text += f": 0x{self.address:016x}"
+        if self.identifier:
+            text += f" id={self.identifier!r}"
+        if self.label:
+            text += f" label={self.label!r}"
+        return text
+
+
+@dataclass
+class FindResult:
+    """
+    The objects found in a hierarchy.
+
+    Attributes:
+        matches (list[HierarchyMatch]): The matching objects in depth-first order.
+        visited (int): The number of objects visited (skipped subtrees are not).
+        limited (bool): Whether the search stopped at the limit of matches.
+    """
+
+    matches: list[HierarchyMatch] = field(default_factory=list)
+    visited: int = 0
+    limited: bool = False
+
+    @classmethod
+    @profiler.timed('decode')
+    def parse(cls, data: bytes) -> 'FindResult':
+        """Parses the result of `hierarchyFind` in `swift/tree.swift`. Malformed lines are skipped."""
+        result = FindResult()
+        for line in data.decode('utf-8', 'replace').split('\n'):
+            fields = line.split('\t')
+            try:
+                if len(fields) == 3 and fields[0] == '#':
+                    result.visited = int(fields[1])
+                    result.limited = fields[2] == '1'
+                elif len(fields) == 10:
+                    result.matches.append(HierarchyMatch(
+                        fields[0],
+                        fields[1],
+                        (float(fields[2]), float(fields[3]), float(fields[4]), float(fields[5])),
+                        int(fields[6], 16),
+                        fields[7],
+                        fields[8],
+                        fields[9]
+                    ))
+            except ValueError:
+                continue
+        return result
+
+
+@dataclass(frozen=True)
+class NodeFingerprint:
+    """
+    The state of a node kept in a snapshot.
+
+    Attributes:
+        address (int): The address of the object.
+        parent (int): The address of the parent object, or 0 for the root.
+        class_name (str): The class name.
+        frame (tuple[float, float, float, float]): x, y, width and height.
+        hidden (bool): Whether the object is hidden.
+        child_count (int): The number of children.
+    """
+
+    address: int
+    parent: int
+    class_name: str
+    frame: tuple[float, float, float, float]
+    hidden: bool
+    child_count: int
+
+    def __str__(self) -> str:
+        return "{} ({:.1f}, {:.1f}, {:.1f}, {:.1f}): 0x{:016x}".format(self.class_name, *self.frame, self.address)
+
+
+@dataclass
+class HierarchySnapshot:
+    """
+    The fingerprints of the nodes of a hierarchy at a stop.
+
+    Attributes:
+        name (str): The name of the snapshot.
+        root (str): The Swift expression of the root object.
+        address (Optional[int]): The address of the root object, if `root` reads it.
+        digest (Optional[str]): The digest computed in the process (see `hierarchyDigest` in `swift/tree.swift`).
+        nodes (dict[int, NodeFingerprint]): The fingerprints by address, in depth-first order.
+    """
+
+    name: str
+    root: str
+    address: Optional[int]
+    digest: Optional[str]
+    nodes: dict[int, NodeFingerprint] = field(default_factory=dict)
+
+    @classmethod
+    def from_table(
+        cls,
+        name: str,
+        root: str,
+        address: Optional[int],
+        digest: Optional[str],
+        table: HierarchyTable
+    ) -> 'HierarchySnapshot':
+        """Returns a snapshot of the nodes of a table fetched with all depths."""
+        nodes: dict[int, NodeFingerprint] = {}
+        for node in table.nodes:
+            nodes[node.address] = NodeFingerprint(
+                node.address,
+                table.nodes[node.parent].address if node.parent >= 0 else 0,
+                node.class_name,
+                node.frame,
+                node.is_hidden,
+                node.child_count
+            )
+        return HierarchySnapshot(name, root, address, digest, nodes)
+
+    def same_root(self, other: 'HierarchySnapshot') -> bool:
+        return self.root == other.root and self.address == other.address
+
+
+@dataclass
+class HierarchyDiff:
+    """
+    The changes between two snapshots of a hierarchy.
+    Nodes are matched by address and class, so an address reused by an object of another class is removed and added.
+
+    Attributes:
+        added (list[tuple[NodeFingerprint, int]]):
+            The roots of added subtrees, with the number of added descendants. Descendants are not listed.
+        removed (list[tuple[NodeFingerprint, int]]): The roots of removed subtrees, with the number of removed descendants.
+        moved (list[tuple[NodeFingerprint, NodeFingerprint]]): The nodes whose parent or origin changed, before and after.
+        resized (list[tuple[NodeFingerprint, NodeFingerprint]]): The nodes whose size changed, before and after.
+        toggled (list[tuple[NodeFingerprint, NodeFingerprint]]): The nodes that were hidden or shown, before and after.
+    """
+
+    added: list[tuple[NodeFingerprint, int]] = field(default_factory=list)
+    removed: list[tuple[NodeFingerprint, int]] = field(default_factory=list)
+    moved: list[tuple[NodeFingerprint, NodeFingerprint]] = field(default_factory=list)
+    resized: list[tuple[NodeFingerprint, NodeFingerprint]] = field(default_factory=list)
+    toggled: list[tuple[NodeFingerprint, NodeFingerprint]] = field(default_factory=list)
+
+    @classmethod
+    @profiler.timed('diff')
+    def compare(cls, before: HierarchySnapshot, after: HierarchySnapshot) -> 'HierarchyDiff':
+        """
+        Compares two snapshots in time linear in the number of nodes.
+
+        Args:
+            before (HierarchySnapshot): The older snapshot.
+            after (HierarchySnapshot): The newer snapshot.
+
+        Returns:
+            HierarchyDiff: The changes.
+        """
+        diff = HierarchyDiff()
+        if before.digest is not None and before.digest == after.digest:
+            return diff
+
+        diff.removed = cls._subtrees(before.nodes, after.nodes)
+        diff.added = cls._subtrees(after.nodes, before.nodes)
+        for address, node in after.nodes.items():
+            old = before.nodes.get(address)
+            if old is None or old.class_name != node.class_name:
+                continue
+            if old.parent != node.parent or old.frame[:2] != node.frame[:2]:
+                diff.moved.append((old, node))
+            if old.frame[2:] != node.frame[2:]:
+                diff.resized.append((old, node))
+            if old.hidden != node.hidden:
+                diff.toggled.append((old, node))
+        return diff
+
+    @staticmethod
+    def _subtrees(nodes: dict[int, NodeFingerprint], others: dict[int, NodeFingerprint]) -> list[tuple[NodeFingerprint, int]]:
+        # Nodes are in depth-first order, so parents are seen before their children
+        roots: list[tuple[NodeFingerprint, int]] = []
+        # address of a node that is not in `others` -> index of the root of its subtree in `roots`
+        subtree: dict[int, int] = {}
+        for address, node in nodes.items():
+            other = others.get(address)
+            if other is not None and other.class_name == node.class_name:
+                continue
+            index = subtree.get(node.parent)
+            if index is None:
+                index = len(roots)
+                roots.append((node, 0))
+            else:
+                root, count = roots[index]
+                roots[index] = (root, count + 1)
+            subtree[address] = index
+        return roots
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.moved or self.resized or self.toggled)
+
+    def summary(self) -> str:
+        return (f"{len(self.added)} added, {len(self.removed)} removed, {len(self.moved)} moved, "
+                f"{len(self.resized)} resized, {len(self.toggled)} hidden or shown")
+
+    def render(self, before: HierarchySnapshot, after: HierarchySnapshot, limit: int = 0) -> list[str]:
+        """
+        Renders the changes, grouped by kind.
+
+        Args:
+            before (HierarchySnapshot): The older snapshot, for the parents of removed nodes.
+            after (HierarchySnapshot): The newer snapshot, for the parents of added nodes.
+            limit (int): The maximum number of lines of each kind, or 0 for no limit.
+
+        Returns:
+            list[str]: The lines.
+        """
+        def parent(snapshot: HierarchySnapshot, node: NodeFingerprint) -> str:
+            parent_node = snapshot.nodes.get(node.parent)
+            if parent_node is None:
+                return 'root' if node.parent == 0 else f"0x{node.parent:016x}"
+            return f"{parent_node.class_name}: 0x{parent_node.address:016x}"
+
+        def subtree(snapshot: HierarchySnapshot, node: NodeFingerprint, count: int) -> str:
+            text = f"{node} in {parent(snapshot, node)}"
+            if count > 0:
+                text += f" (+{count} descendants)"
+            return text
+
+        def moved(old: NodeFingerprint, new: NodeFingerprint) -> str:
+            changes = []
+            if old.parent != new.parent:
+                changes.append(f"from {parent(before, old)} to {parent(after, new)}")
+            if old.frame[:2] != new.frame[:2]:
+                changes.append("({:.1f}, {:.1f}) -> ({:.1f}, {:.1f})".format(*old.frame[:2], *new.frame[:2]))
+            return f"{new.class_name}: 0x{new.address:016x} " + ', '.join(changes)
+
+        sections = [
+            ('Added', [subtree(after, node, count) for node, count in self.added]),
+            ('Removed', [subtree(before, node, count) for node, count in self.removed]),
+            ('Moved', [moved(old, new) for old, new in self.moved]),
+            ('Resized', ["{}: 0x{:016x} {:.1f}x{:.1f} -> {:.1f}x{:.1f}".format(new.class_name, new.address, *old.frame[2:], *new.frame[2:])
+                         for old, new in self.resized]),
+            ('Hidden or shown', [f"{new}: {'hidden' if new.hidden else 'shown'}" for _, new in self.toggled]),
+        ]
+        lines = []
+        for title, items in sections:
+            if not items:
+                continue
+            lines.append(f"{title}:")
+            shown = items if limit <= 0 else items[:limit]
+            lines += [f"    {item}" for item in shown]
+            if len(shown) < len(items):
+                lines.append(f"    ... and {len(items) - len(shown)} more")
+        return lines
+
+
+class HierarchyWriter(ABC):
+    """
+    Writes the nodes of a node table to a file as they are read, in depth-first order.
+    Only the nodes whose children are being written are kept.
+    """
+
+    def __init__(self, file: TextIO) -> None:
+        self.file = file
+
+    def begin(self) -> None:
+        pass
+
+    @abstractmethod
+    def write(self, index: int, node: HierarchyNode) -> None:
+        """Writes a node. `index` is its index in the table, and its parent has been written."""
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+class JSONHierarchyWriter(HierarchyWriter):
+    """
+    Writes an array of root nodes. Each node is an object with `kind`, `class`, `frame` ([x, y, width, height]),
+    `address`, `hidden`, `childCount`, `description` (if fetched) and `children`.
+    """
+
+    def __init__(self, file: TextIO) -> None:
+        super().__init__(file)
+        # (index, whether a child has been written) of the nodes whose children are being written
+        self._open: list[tuple[int, bool]] = []
+        self._roots = 0
+
+    def begin(self) -> None:
+        self.file.write('[')
+
+    def write(self, index: int, node: HierarchyNode) -> None:
+        while self._open and self._open[-1][0] != node.parent:
+            self.file.write(']}')
+            self._open.pop()
+        if self._open:
+            if self._open[-1][1]:
+                self.file.write(',')
+            self._open[-1] = (node.parent, True)
+        else:
+            if self._roots > 0:
+                self.file.write(',')
+            self._roots += 1
+
+        content = {
+            'kind': KIND_NAMES.get(node.kind, node.kind),
+            'class': node.class_name,
+            'frame': node.frame,
+            'address': f"0x{node.address:016x}",
+            'hidden': node.is_hidden,
+            'childCount': node.child_count,
+        }
+        if node.description is not None:
+            content['description'] = node.description
+        # Leaves the object open for the children
+        self.file.write(json.dumps(content, ensure_ascii=False)[:-1] + ', "children": [')
+        self._open.append((index, False))
+
+    def end(self) -> None:
+        self.file.write(']}' * len(self._open))
+        self._open.clear()
+        self.file.write(']\n')
+
+
+class DotHierarchyWriter(HierarchyWriter):
+    """Writes a Graphviz graph with a box per node (dashed if hidden) and an edge from each parent."""
+
+    def begin(self) -> None:
+        self.file.write('digraph hierarchy {\n    rankdir=LR;\n    node [shape=box, fontname="Menlo"];\n')
+
+    def write(self, index: int, node: HierarchyNode) -> None:
+        label = f"{node.class_name}\n{node.frame_description()}\n0x{node.address:016x}"
+        if node.description is not None:
+            label += f"\n{node.description}"
+        style = ', style=dashed' if node.is_hidden else ''
+        self.file.write(f"    n{index} [label={json.dumps(label, ensure_ascii=False)}{style}];\n")
+        if node.parent >= 0:
+            self.file.write(f"    n{node.parent} -> n{index};\n")
+
+    def end(self) -> None:
+        self.file.write('}\n')
+
+
+# file extension -> writer
+EXPORT_WRITERS: dict[str, type[HierarchyWriter]] = {
+    '.json': JSONHierarchyWriter,
+    '.dot': DotHierarchyWriter,
+}
+
+
+def platform_prelude(debugger: lldb.SBDebugger) -> str:
+    """Returns the imports and typealiases `swift/tree.swift` needs on the platform of the process."""
+    if util.isUIKit(debugger):
+        return """
+            import UIKit
+            typealias NSUIView = UIView
+            typealias NSUIViewController = UIViewController
+            typealias NSUIWindow = UIWindow
+            typealias NSUIApplication = UIApplication
+            """
+    elif util.isAppKit(debugger):
+        return """
+            import AppKit
+            typealias NSUIView = NSView
+            typealias NSUIViewController = NSViewController
+            typealias NSUIWindow = NSWindow
+            typealias NSUIApplication = NSApplication
+            """
+    return ''
+
+
+@dataclass
+class HierarchySession:
+    """
+    The nodes fetched at a stop, by address. Addresses stay valid until the process resumes.
+
+    Attributes:
+        nodes (dict[int, HierarchyNode]): The fetched nodes by address.
+        children (dict[int, list[int]]): The addresses of the children of the nodes whose children were fetched.
+    """
+
+    nodes: dict[int, HierarchyNode] = field(default_factory=dict)
+    children: dict[int, list[int]] = field(default_factory=dict)
+
+    def add(self, table: HierarchyTable) -> None:
+        """Adds the nodes of a table, and the children of those whose children it lists."""
+        for node in table.nodes:
+            known = self.nodes.get(node.address)
+            if known is not None and node.description is None:
+                node = replace(node, description=known.description)
+            self.nodes[node.address] = node
+            if node.children or node.child_count == 0:
+                self.children[node.address] = [table.nodes[i].address for i in node.children]
+
+    def missing(self, address: int, depth: Optional[int]) -> list[tuple[int, Optional[int]]]:
+        """
+        Returns the nodes whose children must be fetched to show the tree under a node down to a depth.
+
+        Args:
+            address (int): The address of the node.
+            depth (Optional[int]): The maximum depth below the node, or None for all.
+
+        Returns:
+            list[tuple[int, Optional[int]]]: The address of each node, and the depth to fetch below it.
+        """
+        if address not in self.nodes:
+            return [(address, depth)]
+        missing: list[tuple[int, Optional[int]]] = []
+        stack = [(address, 0)]
+        while stack:
+            current, level = stack.pop()
+            if depth is not None and level >= depth:
+                continue
+            children = self.children.get(current)
+            if children is None:
+                missing.append((current, depth - level if depth is not None else None))
+                continue
+            stack += [(child, level + 1) for child in children]
+        return missing
+
+    def subtree(self, address: int, depth: Optional[int], detail: bool = False) -> HierarchyTable:
+        """Returns a table of the fetched nodes under a node, down to a depth."""
+        nodes: list[HierarchyNode] = []
+        # (address, parent index, depth), popped from the end
+        stack = [(address, -1, 0)]
+        while stack:
+            current, parent, level = stack.pop()
+            node = self.nodes.get(current)
+            if node is None:
+                continue
+            if parent >= 0:
+                nodes[parent].children.append(len(nodes))
+            nodes.append(replace(node, parent=parent, children=[]))
+            if depth is not None and level >= depth:
+                continue
+            index = len(nodes) - 1
+            stack += [(child, index, level + 1) for child in reversed(self.children.get(current, []))]
+        return HierarchyTable(nodes, depth, detail)
+
+
+class HierarchyReader:
+    """
+    Fetches hierarchies as node tables with one expression, and keeps them until the process resumes.
+
+    A table fetched for a tree is reused for any other mode, a smaller depth or with addresses,
+    so showing the same hierarchy differently does not evaluate anything.
+    All fetched nodes are also kept by address, so expanding a node only fetches the levels not fetched yet.
+    Nothing is reused if the expression policy disables caching, and `util.flush_expression_cache` drops everything.
+    Everything is also dropped when a digest shows that a hierarchy changed without the process resuming (e.g. with `expr`).
+    """
+
+    def __init__(self) -> None:
+        self._stop: Optional[tuple[tuple[int, int], int]] = None
+        # (root expression, root address) -> table
+        self._tables: dict[tuple[str, Optional[int]], HierarchyTable] = {}
+        # (root expression, root address) -> the last digest computed at this stop
+        self._digests: dict[tuple[str, Optional[int]], str] = {}
+        self.session = HierarchySession()
+
+    def _sync(self, debugger: lldb.SBDebugger, policy: Optional[util.ExpressionPolicy]) -> bool:
+        stop = util.stop_key(debugger)
+        if stop is None:
+            return False
+        if stop != self._stop or not (policy or util.expression_policy()).cache:
+            # Objects may have been deallocated or moved in the hierarchy
+            self._stop = stop
+            self._tables.clear()
+            self._digests.clear()
+            self.session = HierarchySession()
+        return True
+
+    def _script(self, debugger: lldb.SBDebugger, call: str, policy: Optional[util.ExpressionPolicy]) -> str:
+        return util.helper_script(
+            debugger,
+            util.HelperScript('swift/tree.swift', HIERARCHY_SYMBOLS, prelude=platform_prelude(debugger)),
+            f"let __illdb_result = {call}",
+            policy=policy
+        )
+
+    def table(
+        self,
+        debugger: lldb.SBDebugger,
+        root: str,
+        address: Optional[int] = None,
+        depth: Optional[int] = None,
+        detail: bool = False,
+        policy: Optional[util.ExpressionPolicy] = None
+    ) -> Optional[HierarchyTable]:
+        """
+        Returns the hierarchy under a root object.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            root (str): A Swift expression of the root object. It may read `address` with `__illdb_argInt(2)`.
+            address (Optional[int]): The address of the root object, if `root` reads it.
+            depth (Optional[int]): The depth down to which nodes are needed, or None for all.
+            detail (bool): Whether descriptions are needed.
+            policy (Optional[util.ExpressionPolicy]): The expression policy.
+
+        Returns:
+            Optional[HierarchyTable]: The table, or None if evaluation failed.
+        """
+        if not self._sync(debugger, policy):
+            return None
+
+        key = (root, address)
+        cached = self._tables.get(key)
+        if cached is not None and cached.covers(depth, detail):
+            profiler.count('hierarchy_cache_hits')
+            return cached
+
+        script = self._script(
+            debugger,
+            f"hierarchyTable({root}, depth: __illdb_argInt(0), detail: __illdb_argInt(1) == 1)",
+            policy
+        )
+        data = util.exp_data(debugger, script, policy=policy, arguments=[depth, detail, address], buffer=True)
+        if data is None:
+            return None
+
+        table = HierarchyTable.parse(data, depth, detail)
+        profiler.count('hierarchy_nodes', len(table))
+        self._tables[key] = table
+        self.session.add(table)
+        return table
+
+    def expand(
+        self,
+        debugger: lldb.SBDebugger,
+        address: int,
+        depth: Optional[int] = 1,
+        detail: bool = False,
+        policy: Optional[util.ExpressionPolicy] = None
+    ) -> Optional[HierarchyTable]:
+        """
+        Returns the hierarchy under an object, fetching only the children not fetched yet at this stop.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            address (int): The address of the object (a window, view controller, view or layer).
+            depth (Optional[int]): The depth down to which nodes are needed, or None for all.
+            detail (bool): Whether descriptions are needed. Descriptions of the whole subtree are fetched again.
+            policy (Optional[util.ExpressionPolicy]): The expression policy.
+
+        Returns:
+            Optional[HierarchyTable]: The table, or None if evaluation failed or there is no object at the address.
+        """
+        if not self._sync(debugger, policy):
+            return None
+
+        missing = [(address, depth)] if detail else self.session.missing(address, depth)
+        if missing:
+            roots = ' '.join(f"{a:x}:{d if d is not None else ''}" for a, d in missing)
+            script = self._script(debugger, "hierarchySubtrees(__illdb_argString(0)!, detail: __illdb_argInt(1) == 1)", policy)
+            data = util.exp_data(debugger, script, policy=policy, arguments=[roots, detail], buffer=True)
+            if data is None:
+                return None
+            table = HierarchyTable.parse(data)
+            profiler.count('hierarchy_nodes', len(table))
+            self.session.add(table)
+        else:
+            profiler.count('hierarchy_cache_hits')
+
+        if address not in self.session.nodes:
+            return None
+        return self.session.subtree(address, depth, detail)
+
+    def find(
+        self,
+        debugger: lldb.SBDebugger,
+        root: str,
+        query: HierarchyQuery,
+        address: Optional[int] = None,
+        policy: Optional[util.ExpressionPolicy] = None
+    ) -> Optional[FindResult]:
+        """
+        Finds objects in the hierarchy under a root object. The criteria are checked in the process,
+        so only the matching objects are transferred.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            root (str): A Swift expression of the root object. It may read `address` with `__illdb_argInt(2)`.
+            query (HierarchyQuery): The criteria.
+            address (Optional[int]): The address of the root object, if `root` reads it.
+            policy (Optional[util.ExpressionPolicy]): The expression policy.
+
+        Returns:
+            Optional[FindResult]: The matches, or None if evaluation failed.
+        """
+        point = f"{query.point[0]},{query.point[1]}" if query.point is not None else None
+        script = self._script(
+            debugger,
+            f"hierarchyFind({root}, className: __illdb_argString(3), identifier: __illdb_argString(4), "
+            "label: __illdb_argString(5), tag: __illdb_argInt(6), point: __illdb_argString(7), "
+            "options: __illdb_argInt(1)!, limit: __illdb_argInt(0)!)",
+            policy
+        )
+        data = util.exp_data(
+            debugger,
+            script,
+            policy=policy,
+            arguments=[query.limit, query.options, address, query.class_name, query.identifier, query.label, query.tag, point],
+            cacheable=True
+        )
+        if data is None:
+            return None
+        result = FindResult.parse(data)
+        profiler.count('hierarchy_nodes', result.visited)
+        return result
+
+    @profiler.timed('export')
+    def export(
+        self,
+        debugger: lldb.SBDebugger,
+        root: str,
+        path: str,
+        address: Optional[int] = None,
+        depth: Optional[int] = None,
+        detail: bool = False,
+        layers: bool = False,
+        policy: Optional[util.ExpressionPolicy] = None
+    ) -> Optional[int]:
+        """
+        Writes the hierarchy under a root object to a file, reading the node table from the process
+        in chunks of `EXPORT_CHUNK_SIZE` bytes and writing each node as soon as its line is read.
+        Exported tables are not kept.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            root (str): A Swift expression of the root object. It may read `address` with `__illdb_argInt(2)`.
+            path (str): The path of the file. The format is chosen by the extension (see `EXPORT_WRITERS`).
+            address (Optional[int]): The address of the root object, if `root` reads it.
+            depth (Optional[int]): The depth down to which nodes are exported, or None for all.
+            detail (bool): Whether descriptions are exported.
+            layers (bool): Whether the sublayers of views are exported.
+            policy (Optional[util.ExpressionPolicy]): The expression policy.
+
+        Returns:
+            Optional[int]: The number of exported nodes, or None if evaluation or writing failed.
+        """
+        writer_class = EXPORT_WRITERS.get(os.path.splitext(path)[1].lower())
+        if writer_class is None:
+            return None
+
+        script = self._script(
+            debugger,
+            f"hierarchyTable({root}, depth: __illdb_argInt(0), detail: __illdb_argInt(1) == 1, layers: __illdb_argInt(3) == 1)",
+            policy
+        )
+        chunks = util.exp_stream(
+            debugger,
+            script,
+            policy=policy,
+            arguments=[depth, detail, address, layers],
+            chunk_size=EXPORT_CHUNK_SIZE,
+            buffer=True
+        )
+        if chunks is None:
+            return None
+
+        count = 0
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        rest = ''
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as file:
+                writer = writer_class(file)
+                writer.begin()
+                for chunk in chunks:
+                    lines = (rest + decoder.decode(chunk)).split('\n')
+                    # The last line may continue in the next chunk
+                    rest = lines.pop()
+                    for line in lines:
+                        node = HierarchyNode.parse(line)
+                        if node is not None:
+                            writer.write(count, node)
+                            count += 1
+                node = HierarchyNode.parse(rest + decoder.decode(b'', final=True))
+                if node is not None:
+                    writer.write(count, node)
+                    count += 1
+                writer.end()
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"[iLLDB] failed to export the hierarchy to {path}: {e}")
+            try:
+                os.remove(path + '.tmp')
+            except OSError:
+                pass
+            return None
+
+        profiler.count('hierarchy_nodes', count)
+        return count
+
+    def digest(
+        self,
+        debugger: lldb.SBDebugger,
+        root: str,
+        address: Optional[int] = None,
+        policy: Optional[util.ExpressionPolicy] = None
+    ) -> Optional[tuple[str, int]]:
+        """
+        Returns a digest of the hierarchy under a root object, computed in the process.
+        If it differs from the last digest of the hierarchy at this stop, or none was computed since the hierarchy was read,
+        the fetched tables and nodes are dropped, so that the next `table` reads the changed hierarchy.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            root (str): A Swift expression of the root object. It may read `address` with `__illdb_argInt(2)`.
+            address (Optional[int]): The address of the root object, if `root` reads it.
+            policy (Optional[util.ExpressionPolicy]): The expression policy.
+
+        Returns:
+            Optional[tuple[str, int]]: The hash and the number of nodes, or None if evaluation failed.
+        """
+        script = self._script(debugger, f"hierarchyDigest({root})", policy)
+        # Not cached: an expression may change views without the process resuming
+        data = util.exp_data(debugger, script, policy=policy, arguments=[None, None, address])
+        if data is None:
+            return None
+        fields = data.decode('utf-8', 'replace').strip().split('\t')
+        if len(fields) != 2 or not fields[1].isdigit():
+            return None
+
+        if self._sync(debugger, policy):
+            key = (root, address)
+            if self._digests.get(key) != fields[0]:
+                # Views may have changed without the process resuming, so no fetched node can be trusted
+                self._tables.clear()
+                self._digests.clear()
+                self.session = HierarchySession()
+                self._digests[key] = fields[0]
+        return (fields[0], int(fields[1]))
+
+    def clear(self) -> None:
+        """Drops the fetched tables and nodes."""
+        self._stop = None
+        self._tables.clear()
+        self._digests.clear()
+        self.session = HierarchySession()
+
+
+hierarchy_reader = HierarchyReader()
+util.register_cache_clearer(hierarchy_reader.clear)
+
+
+class HierarchySnapshots:
+    """
+    Named snapshots of hierarchies, kept on the host across stops.
+
+    Each snapshot has a digest computed in the process, so a snapshot of an unchanged hierarchy
+    reuses the nodes of an earlier one, and comparing a snapshot with an unchanged hierarchy does not read it.
+    """
+
+    def __init__(self) -> None:
+        self._snapshots: dict[str, HierarchySnapshot] = {}
+
+    def get(self, name: str) -> Optional[HierarchySnapshot]:
+        return self._snapshots.get(name)
+
+    def all(self) -> list[HierarchySnapshot]:
+        return list(self._snapshots.values())
+
+    def remove(self, name: str) -> bool:
+        return self._snapshots.pop(name, None) is not None
+
+    def capture(
+        self,
+        debugger: lldb.SBDebugger,
+        name: str,
+        root: str,
+        address: Optional[int] = None,
+        policy: Optional[util.ExpressionPolicy] = None
+    ) -> Optional[tuple[HierarchySnapshot, Optional[HierarchySnapshot]]]:
+        """
+        Takes a snapshot of the hierarchy under a root object, without saving it.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            name (str): The name of the snapshot.
+            root (str): A Swift expression of the root object. It may read `address` with `__illdb_argInt(2)`.
+            address (Optional[int]): The address of the root object, if `root` reads it.
+            policy (Optional[util.ExpressionPolicy]): The expression policy.
+
+        Returns:
+            Optional[tuple[HierarchySnapshot, Optional[HierarchySnapshot]]]:
+                The snapshot and the saved snapshot of the same hierarchy whose nodes it reuses, if any,
+                or None if evaluation failed.
+        """
+        digest = hierarchy_reader.digest(debugger, root, address, policy)
+        if digest is None:
+            return None
+        snapshot = HierarchySnapshot(name, root, address, digest[0])
+        for saved in reversed(self._snapshots.values()):
+            if saved.digest == snapshot.digest and saved.same_root(snapshot):
+                profiler.count('hierarchy_cache_hits')
+                snapshot.nodes = saved.nodes
+                return (snapshot, saved)
+
+        table = hierarchy_reader.table(debugger, root, address, policy=policy)
+        if table is None:
+            return None
+        return (HierarchySnapshot.from_table(name, root, address, digest[0], table), None)
+
+    def save(self, snapshot: HierarchySnapshot) -> None:
+        """Saves a snapshot, replacing a snapshot of the same name."""
+        self._snapshots.pop(snapshot.name, None)
+        self._snapshots[snapshot.name] = snapshot
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+
+
+hierarchy_snapshots = HierarchySnapshots()
@@ -1,14 +1,300 @@
 import os
+import re
+import json
+import hashlib
 import lldb
 import argparse
-from typing import Optional
+import struct
+import plistlib
+from collections import OrderedDict
+from datetime import datetime
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Callable, Iterator, Optional, Sequence, Union
 from lldbhelper import SBValue  # noqa: F401
+from lldbhelper.profiler import profiler
+
+
+@dataclass(frozen=True)
+class ExpressionPolicy:
+    """
+    How expressions injected by iLLDB are run in the debuggee.
+
+    Attributes:
+        timeout (int):
+            Total timeout in microseconds. 0 means no timeout, the default, since building the class index
+            or reading a large hierarchy can take long.
+        one_thread_timeout (int):
+            Time in microseconds to run only the selected thread before resuming all threads.
+            Used only when `try_all_threads` is True.
+        try_all_threads (bool): Whether to resume all threads if the expression does not finish on the selected thread.
+        stop_others (bool): Whether to keep the other threads stopped while running on the selected thread.
+        cache (bool): Whether results of read-only commands are reused until the process resumes.
+    """
+
+    timeout: int = 0
+    one_thread_timeout: int = 500_000
+    try_all_threads: bool = True
+    stop_others: bool = True
+    cache: bool = True
+
+    def apply(self, options: lldb.SBExpressionOptions) -> None:
+        """
+        Sets the policy to the expression options.
+
+        Args:
+            options (lldb.SBExpressionOptions): The options to be configured.
+        """
+        options.SetTimeoutInMicroSeconds(self.timeout)
+        options.SetTryAllThreads(self.try_all_threads)
+        if self.try_all_threads:
+            one_thread_timeout = self.one_thread_timeout
+            if self.timeout > 0:
+                one_thread_timeout = min(one_thread_timeout, self.timeout)
+            options.SetOneThreadTimeoutInMicroSeconds(one_thread_timeout)
+        options.SetStopOthers(self.stop_others)
+
+
+_default_policy = ExpressionPolicy()
+# command name -> fields overridden for the command
+_command_policy_overrides: dict[str, dict[str, Any]] = {}
+
+
+def expression_policy(command: Optional[str] = None) -> ExpressionPolicy:
+    """
+    Returns the expression policy for a command.
+
+    Args:
+        command (Optional[str]): The command name. If None, the global policy is returned.
+
+    Returns:
+        ExpressionPolicy: The global policy with the overrides of the command applied.
+    """
+    if command is None or command not in _command_policy_overrides:
+        return _default_policy
+    return replace(_default_policy, **_command_policy_overrides[command])
+
+
+def set_expression_policy(name: str, value: Union[int, bool], command: Optional[str] = None) -> None:
+    """
+    Changes a field of the global policy, or overrides it for a command.
+
+    Args:
+        name (str): The field name of `ExpressionPolicy`.
+        value (Union[int, bool]): The new value.
+        command (Optional[str]): The command name. If None, the global policy is changed.
+
+    Raises:
+        ValueError: If `name` is not a field of `ExpressionPolicy`.
+    """
+    global _default_policy
+
+    if name not in {f.name for f in fields(ExpressionPolicy)}:
+        raise ValueError(f"Unknown setting: {name}")
+
+    if command is None:
+        _default_policy = replace(_default_policy, **{name: value})  # type: ignore[arg-type]
+    else:
+        _command_policy_overrides.setdefault(command, {})[name] = value
+
+
+def reset_expression_policy(command: Optional[str] = None) -> None:
+    """
+    Resets the global policy and all overrides, or only the overrides for a command.
+
+    Args:
+        command (Optional[str]): The command name. If None, everything is reset.
+    """
+    global _default_policy
+
+    if command is None:
+        _default_policy = ExpressionPolicy()
+        _command_policy_overrides.clear()
+    else:
+        _command_policy_overrides.pop(command, None)
+
+
+class ExpressionCache:
+    """
+    Results of expressions evaluated while the process stays at the same stop.
+
+    Entries are dropped as soon as a lookup happens at another stop (or in another process),
+    and the least recently used entry is evicted when the cache is full.
+
+    Attributes:
+        capacity (int): The maximum number of entries.
+        hits (int): The number of lookups that found an entry.
+        misses (int): The number of lookups that did not.
+    """
+
+    def __init__(self, capacity: int = 128) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._stop: Optional[tuple[tuple[int, int], int]] = None
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, stop: tuple[tuple[int, int], int], digest: str) -> tuple[bool, Any]:
+        """
+        Looks up a result.
+
+        Args:
+            stop (tuple[tuple[int, int], int]): The process key and stop ID (see `stop_key`).
+            digest (str): The digest of the expression (see `expression_digest`).
+
+        Returns:
+            tuple[bool, Any]: Whether the result was found, and the result.
+        """
+        self._sync(stop)
+        if digest not in self._entries:
+            self.misses += 1
+            return (False, None)
+        self.hits += 1
+        self._entries.move_to_end(digest)
+        return (True, self._entries[digest])
+
+    def store(self, stop: tuple[tuple[int, int], int], digest: str, value: Any) -> None:
+        """
+        Stores a result.
+
+        Args:
+            stop (tuple[tuple[int, int], int]): The process key and stop ID (see `stop_key`).
+            digest (str): The digest of the expression (see `expression_digest`).
+            value (Any): The result.
+        """
+        self._sync(stop)
+        self._entries[digest] = value
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drops all entries. The counters are kept."""
+        self._entries.clear()
+
+    def _sync(self, stop: tuple[tuple[int, int], int]) -> None:
+        if stop != self._stop:
+            self._entries.clear()
+            self._stop = stop
+
+
+expression_cache = ExpressionCache()
+
+
+# Functions dropping results of expressions that modules keep outside `expression_cache`
+_cache_clearers: list[Callable[[], None]] = []
+
+
+def register_cache_clearer(clear: Callable[[], None]) -> None:
+    """
+    Registers a function dropping results of expressions that a module keeps itself,
+    so that `flush_expression_cache` drops them too.
+
+    Args:
+        clear (Callable[[], None]): The function.
+    """
+    _cache_clearers.append(clear)
+
+
+def flush_expression_cache() -> None:
+    """
+    Drops all cached expression results.
+    Commands modifying the state of the debuggee call this after running.
+    """
+    expression_cache.clear()
+    for clear in _cache_clearers:
+        clear()
+
+
+def stop_key(debugger: lldb.SBDebugger) -> Optional[tuple[tuple[int, int], int]]:
+    """
+    Returns a key identifying the current stop of the process.
+    The stop ID does not change while iLLDB evaluates expressions, but does whenever the process resumes.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+
+    Returns:
+        Optional[tuple[tuple[int, int], int]]: (process key, stop ID), or None if there is no live process.
+    """
+    key = process_key(debugger)
+    if key is None:
+        return None
+    process: lldb.SBProcess = debugger.GetSelectedTarget().GetProcess()
+    return (key, process.GetStopID())
+
+
+def expression_digest(
+        kind: str,
+        script: str,
+        lang: int,
+        arguments: Optional[Sequence['ArgumentValue']]) -> str:
+    """
+    Returns a digest identifying an expression and its arguments.
+
+    Args:
+        kind (str): How the result is returned (e.g. `value`, `data`).
+        script (str): The script.
+        lang (int): The language of the script.
+        arguments (Optional[Sequence[ArgumentValue]]): The arguments.
+
+    Returns:
+        str: The digest.
+    """
+    digest = hashlib.sha1(f"{kind}:{lang}:".encode())
+    digest.update(script.encode())
+    if arguments is not None:
+        digest.update(b'\0')
+        digest.update(pack_arguments(arguments, 0))
+    return digest.hexdigest()
+
+
+def _cached(
+        debugger: lldb.SBDebugger,
+        kind: str,
+        script: str,
+        lang: int,
+        policy: Optional[ExpressionPolicy],
+        arguments: Optional[Sequence['ArgumentValue']],
+        evaluate: Callable[[], Any]) -> Any:
+    if not (policy or _default_policy).cache:
+        return evaluate()
+
+    stop = stop_key(debugger)
+    if stop is None:
+        return evaluate()
+
+    digest = expression_digest(kind, script, lang, arguments)
+    found, value = expression_cache.lookup(stop, digest)
+    profiler.count('cache_hits' if found else 'cache_misses')
+    if found:
+        return value
+
+    value = evaluate()
+    if value is not None:
+        expression_cache.store(stop, digest, value)
+    return value
 
 
 def exp_script(
         debugger: lldb.SBDebugger,
         script: str,
-        lang: int = lldb.eLanguageTypeSwift) -> Optional[lldb.SBValue]:
+        lang: int = lldb.eLanguageTypeSwift,
+        policy: Optional[ExpressionPolicy] = None,
+        arguments: Optional[Sequence['ArgumentValue']] = None,
+        cacheable: bool = False) -> Optional[lldb.SBValue]:
+
+    if cacheable:
+        return _cached(debugger, 'value', script, lang, policy, arguments,
+                       lambda: exp_script(debugger, script, lang=lang, policy=policy, arguments=arguments))
+
+    if arguments is not None:
+        prelude = argument_prelude(debugger, arguments, lang)
+        if prelude is None:
+            return None
+        script = prelude + script
 
     frame: lldb.SBFrame = (
         debugger.GetSelectedTarget()
@@ -24,21 +310,595 @@ def exp_script(
     options.SetLanguage(lang)
     options.SetIgnoreBreakpoints(True)
     options.SetTrapExceptions(False)
-    options.SetTryAllThreads(True)
+    (policy or _default_policy).apply(options)
     options.SetFetchDynamicValue(lldb.eNoDynamicValues)
     options.SetUnwindOnError(True)
     options.SetGenerateDebugInfo(True)
 
-    value: lldb.SBValue = frame.EvaluateExpression(script, options)
+    with profiler.phase('expression'):
+        value: lldb.SBValue = frame.EvaluateExpression(script, options)
+    profiler.count('expressions')
     error: lldb.SBError = value.GetError()
 
     if error.Success() or error.value == 0x1001:  # success or unknown error
         return value
     else:
+        profiler.count('expression_errors')
         print(error)
         return None
 
 
+ArgumentValue = Union[None, bool, int, str, bytes]
+
+ARGUMENT_KIND_NULL = 0
+ARGUMENT_KIND_INT = 1
+ARGUMENT_KIND_STRING = 2
+ARGUMENT_KIND_BYTES = 3
+
+# Accessors reading the argument block.
+# Layout: u64 count, then `count` slots of (u64 kind, u64 length, u64 value or address of the payload), then payloads.
+_ARGUMENT_ACCESSORS = {
+    lldb.eLanguageTypeSwift: """
+    import Foundation
+    let __illdb_args = UnsafeRawPointer(bitPattern: <ADDRESS>)!
+    let __illdb_argSlot = { (i: Int, field: Int) -> UInt64 in __illdb_args.load(fromByteOffset: 8 + i * 24 + field * 8, as: UInt64.self) }
+    let __illdb_argInt = { (i: Int) -> Int? in
+        __illdb_argSlot(i, 0) == 1 ? Int(truncatingIfNeeded: __illdb_argSlot(i, 2)) : nil
+    }
+    let __illdb_argData = { (i: Int) -> Data? in
+        guard __illdb_argSlot(i, 0) >= 2, let pointer = UnsafeRawPointer(bitPattern: UInt(__illdb_argSlot(i, 2))) else { return nil }
+        return Data(bytes: pointer, count: Int(__illdb_argSlot(i, 1)))
+    }
+    let __illdb_argString = { (i: Int) -> String? in
+        __illdb_argSlot(i, 0) == 2 ? __illdb_argData(i).map { String(decoding: $0, as: UTF8.self) } : nil
+    }
+    """,
+    lldb.eLanguageTypeObjC: """
+    @import Foundation;
+    unsigned long long *__illdb_args = (unsigned long long *)<ADDRESS>;
+    long long (^__illdb_arg_int)(int) = ^long long(int i) {
+      return __illdb_args[1 + i * 3] == 1 ? (long long)__illdb_args[3 + i * 3] : 0;
+    };
+    NSData *(^__illdb_arg_data)(int) = ^NSData *(int i) {
+      if (__illdb_args[1 + i * 3] < 2) { return (NSData *)nil; }
+      return [NSData dataWithBytes:(const void *)__illdb_args[3 + i * 3] length:(NSUInteger)__illdb_args[2 + i * 3]];
+    };
+    NSString *(^__illdb_arg_string)(int) = ^NSString *(int i) {
+      if (__illdb_args[1 + i * 3] != 2) { return (NSString *)nil; }
+      return [[NSString alloc] initWithBytes:(const void *)__illdb_args[3 + i * 3]
+                                      length:(NSUInteger)__illdb_args[2 + i * 3]
+                                    encoding:NSUTF8StringEncoding];
+    };
+    """
+}
+
+# process key -> (address, capacity) of the argument block
+_argument_blocks: dict[tuple[int, int], tuple[int, int]] = {}
+
+
+def pack_arguments(arguments: Sequence[ArgumentValue], base_address: int) -> bytes:
+    """
+    Packs arguments into an argument block placed at `base_address`.
+
+    Args:
+        arguments (Sequence[ArgumentValue]): None, bool, int, str (UTF-8) or bytes values.
+        base_address (int): The address the block will be written to.
+
+    Returns:
+        bytes: The argument block.
+    """
+    header = struct.pack('<Q', len(arguments))
+    slots = b''
+    payloads = b''
+    payload_offset = 8 + 24 * len(arguments)
+
+    for argument in arguments:
+        if argument is None:
+            slots += struct.pack('<QQQ', ARGUMENT_KIND_NULL, 0, 0)
+        elif isinstance(argument, (bool, int)):
+            slots += struct.pack('<QQQ', ARGUMENT_KIND_INT, 0, int(argument) & 0xFFFFFFFFFFFFFFFF)
+        else:
+            kind = ARGUMENT_KIND_STRING if isinstance(argument, str) else ARGUMENT_KIND_BYTES
+            payload = argument.encode('utf-8') if isinstance(argument, str) else argument
+            address = base_address + payload_offset + len(payloads)
+            slots += struct.pack('<QQQ', kind, len(payload), address)
+            # NUL terminated and 8-byte aligned
+            payloads += payload + b'\0' * (8 - len(payload) % 8)
+
+    return header + slots + payloads
+
+
+def marshal_arguments(debugger: lldb.SBDebugger, arguments: Sequence[ArgumentValue]) -> Optional[int]:
+    """
+    Writes arguments into the argument block of the current process.
+
+    The block is allocated once per process and reused, so its address (and therefore the text
+    of expressions reading it) stays the same. It is reallocated only when it has to grow.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        arguments (Sequence[ArgumentValue]): None, bool, int, str (UTF-8) or bytes values.
+
+    Returns:
+        Optional[int]: The address of the argument block, or None if it could not be written.
+    """
+    key = process_key(debugger)
+    if key is None:
+        return None
+
+    process: lldb.SBProcess = debugger.GetSelectedTarget().GetProcess()
+    error = lldb.SBError()
+
+    address, capacity = _argument_blocks.get(key, (0, 0))
+    size = len(pack_arguments(arguments, 0))
+    if size > capacity:
+        if address != 0:
+            process.DeallocateMemory(address)
+        capacity = max(4096, 1 << (size - 1).bit_length())
+        address = process.AllocateMemory(capacity, lldb.ePermissionsReadable | lldb.ePermissionsWritable, error)
+        if error.Fail() or address == lldb.LLDB_INVALID_ADDRESS:
+            print(error)
+            _argument_blocks.pop(key, None)
+            return None
+        _argument_blocks[key] = (address, capacity)
+
+    with profiler.phase('marshal'):
+        block = pack_arguments(arguments, address)
+        process.WriteMemory(address, block, error)
+    profiler.count('bytes_written', len(block))
+    if error.Fail():
+        print(error)
+        return None
+
+    return address
+
+
+def argument_prelude(debugger: lldb.SBDebugger, arguments: Sequence[ArgumentValue], lang: int) -> Optional[str]:
+    """
+    Marshals arguments and returns code defining accessors for them.
+
+    The accessors are `__illdb_arg_int(i)`, `__illdb_arg_string(i)` and `__illdb_arg_data(i)` in Objective-C,
+    and `__illdb_argInt(i)`, `__illdb_argString(i)` and `__illdb_argData(i)` in Swift.
+    A None argument is read as nil (0 for `__illdb_arg_int`).
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        arguments (Sequence[ArgumentValue]): None, bool, int, str (UTF-8) or bytes values.
+        lang (int): The language of the script using the arguments.
+
+    Returns:
+        Optional[str]: The code to prepend to the script, or None if marshalling failed.
+    """
+    address = marshal_arguments(debugger, arguments)
+    if address is None:
+        return None
+    return _ARGUMENT_ACCESSORS[_epilogue_language(lang)].replace('<ADDRESS>', f"{address:#x}")
+
+
+# Epilogues copying `__illdb_data` (NSData/Data) into a malloc'd buffer and returning it as NSRange(address, length)
+_BUFFER_EPILOGUES = {
+    lldb.eLanguageTypeSwift: """
+    let __illdb_buffer = malloc(max(__illdb_data.count, 1))!
+    __illdb_data.copyBytes(to: __illdb_buffer.assumingMemoryBound(to: UInt8.self), count: __illdb_data.count)
+    NSRange(location: Int(bitPattern: __illdb_buffer), length: __illdb_data.count)
+    """,
+    lldb.eLanguageTypeObjC: """
+    NSUInteger __illdb_length = [__illdb_data length];
+    void *__illdb_buffer = malloc(__illdb_length > 0 ? __illdb_length : 1);
+    [__illdb_data getBytes:__illdb_buffer length:__illdb_length];
+    NSMakeRange((NSUInteger)__illdb_buffer, __illdb_length);
+    """
+}
+
+# Epilogues returning `__illdb_result`, a malloc'd buffer as NSRange(address, length), without copying it
+_RANGE_EPILOGUES = {
+    lldb.eLanguageTypeSwift: """
+    let __illdb_range: NSRange = __illdb_result
+    __illdb_range
+    """,
+    lldb.eLanguageTypeObjC: """
+    NSRange __illdb_range = __illdb_result;
+    __illdb_range;
+    """
+}
+
+# Epilogues passing `__illdb_result` (NSData/Data) as it is
+_DATA_EPILOGUES = {
+    lldb.eLanguageTypeSwift: """
+    let __illdb_data: Data = __illdb_result
+    """,
+    lldb.eLanguageTypeObjC: """
+    NSData *__illdb_data = (NSData *)__illdb_result;
+    """
+}
+
+# Epilogues serializing `__illdb_result` (a property list object) into a binary plist
+_OBJECT_EPILOGUES = {
+    lldb.eLanguageTypeSwift: """
+    let __illdb_plist: Any = __illdb_result
+    let __illdb_data = (try? PropertyListSerialization.data(fromPropertyList: __illdb_plist, format: .binary, options: 0)) ?? Data()
+    """,
+    lldb.eLanguageTypeObjC: """
+    NSData *__illdb_data = [NSPropertyListSerialization dataWithPropertyList:__illdb_result
+                                                                      format:NSPropertyListBinaryFormat_v1_0
+                                                                     options:0
+                                                                       error:nil];
+    """
+}
+
+# process key -> addresses of result buffers to be freed by the next transfer
+_pending_buffers: dict[tuple[int, int], list[int]] = {}
+
+
+def _epilogue_language(lang: int) -> int:
+    return lldb.eLanguageTypeSwift if lang == lldb.eLanguageTypeSwift else lldb.eLanguageTypeObjC  # type: ignore[no-any-return]
+
+
+def _exp_buffer(
+        debugger: lldb.SBDebugger,
+        script: str,
+        lang: int,
+        policy: Optional[ExpressionPolicy],
+        arguments: Optional[Sequence[ArgumentValue]],
+        cacheable: bool = False,
+        buffer: bool = False) -> Optional[bytes]:
+    if cacheable:
+        return _cached(debugger, 'data', script, lang, policy, arguments,  # type: ignore[no-any-return]
+                       lambda: _exp_buffer(debugger, script, lang, policy, arguments, buffer=buffer))
+
+    location = _exp_buffer_location(debugger, script, lang, policy, arguments, buffer)
+    if location is None:
+        return None
+    address, length = location
+    if length == 0:
+        return b''
+
+    process: lldb.SBProcess = debugger.GetSelectedTarget().GetProcess()
+    error = lldb.SBError()
+    with profiler.phase('transfer'):
+        data: bytes = process.ReadMemory(address, length, error)
+    if error.Fail():
+        print(error)
+        return None
+    profiler.count('bytes_read', len(data))
+
+    return data
+
+
+def _exp_buffer_location(
+        debugger: lldb.SBDebugger,
+        script: str,
+        lang: int,
+        policy: Optional[ExpressionPolicy],
+        arguments: Optional[Sequence[ArgumentValue]],
+        buffer: bool = False) -> Optional[tuple[int, int]]:
+    # Evaluates a script with a buffer epilogue, and returns the address and length of the buffer.
+    # With `buffer`, the script makes the buffer itself.
+    key = process_key(debugger)
+    if key is None:
+        return None
+
+    epilogue_lang = _epilogue_language(lang)
+    for address in _pending_buffers.get(key, []):
+        if epilogue_lang == lldb.eLanguageTypeSwift:
+            script += f"\nfree(UnsafeMutableRawPointer(bitPattern: {address:#x}))"
+        else:
+            script += f"\nfree((void *){address:#x});"
+    script += (_RANGE_EPILOGUES if buffer else _BUFFER_EPILOGUES)[epilogue_lang]
+
+    ret = exp_script(debugger, script, lang=lang, policy=policy, arguments=arguments)
+    if ret is None:
+        return None
+    _pending_buffers[key] = []
+
+    address = ret.GetChildMemberWithName('location').GetValueAsUnsigned()
+    length = ret.GetChildMemberWithName('length').GetValueAsUnsigned()
+    if address == 0:
+        return None
+    _pending_buffers[key].append(address)
+    return (address, length)
+
+
+def exp_data(
+        debugger: lldb.SBDebugger,
+        script: str,
+        lang: int = lldb.eLanguageTypeSwift,
+        policy: Optional[ExpressionPolicy] = None,
+        arguments: Optional[Sequence[ArgumentValue]] = None,
+        cacheable: bool = False,
+        buffer: bool = False) -> Optional[bytes]:
+    """
+    Evaluates `script` and returns the bytes it produced through a buffer in the debuggee.
+
+    The script must store its result in a variable named `__illdb_result`
+    (`NSData *` in Objective-C, `Data` in Swift).
+    The result is copied into a malloc'd buffer and read with a single `ReadMemory`,
+    so large results are neither printed nor converted to descriptions.
+    The buffer is freed by the next transfer in the same process.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        script (str): The script to evaluate.
+        lang (int): The language of the script.
+        policy (Optional[ExpressionPolicy]): The expression policy. If None, the global policy is used.
+        arguments (Optional[Sequence[ArgumentValue]]): Arguments passed through the argument block (see `argument_prelude`).
+        cacheable (bool):
+            Whether the result may be reused until the process resumes (see `ExpressionCache`).
+            Only for scripts without side effects.
+        buffer (bool):
+            Whether `__illdb_result` is already a malloc'd buffer, as NSRange(address, length).
+            The buffer is read and freed in place of the copy, so large results are not copied in the debuggee.
+
+    Returns:
+        Optional[bytes]: The bytes of `__illdb_result`, or None if evaluation failed.
+    """
+    if not buffer:
+        script += _DATA_EPILOGUES[_epilogue_language(lang)]
+    return _exp_buffer(debugger, script, lang, policy, arguments, cacheable, buffer)
+
+
+def exp_stream(
+        debugger: lldb.SBDebugger,
+        script: str,
+        lang: int = lldb.eLanguageTypeSwift,
+        policy: Optional[ExpressionPolicy] = None,
+        arguments: Optional[Sequence[ArgumentValue]] = None,
+        chunk_size: int = 1 << 20,
+        buffer: bool = False) -> Optional[Iterator[bytes]]:
+    """
+    Evaluates `script` like `exp_data`, and returns the bytes it produced in chunks.
+
+    The result stays in the debuggee and each chunk is read when it is needed,
+    so results larger than the host can comfortably hold can be written out piece by piece.
+    The buffer is freed by the next transfer, so the chunks must be read before evaluating anything else.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        script (str): The script to evaluate. It must store `Data`/`NSData *` in `__illdb_result`.
+        lang (int): The language of the script.
+        policy (Optional[ExpressionPolicy]): The expression policy. If None, the global policy is used.
+        arguments (Optional[Sequence[ArgumentValue]]): Arguments passed through the argument block (see `argument_prelude`).
+        chunk_size (int): The maximum number of bytes of a chunk.
+        buffer (bool): Whether `__illdb_result` is already a malloc'd buffer, as NSRange(address, length) (see `exp_data`).
+
+    Returns:
+        Optional[Iterator[bytes]]:
+            The chunks, or None if evaluation failed. The iterator raises `OSError` if a chunk cannot be read.
+    """
+    if not buffer:
+        script += _DATA_EPILOGUES[_epilogue_language(lang)]
+    location = _exp_buffer_location(debugger, script, lang, policy, arguments, buffer)
+    if location is None:
+        return None
+    address, length = location
+
+    def chunks() -> Iterator[bytes]:
+        process: lldb.SBProcess = debugger.GetSelectedTarget().GetProcess()
+        for offset in range(0, length, chunk_size):
+            error = lldb.SBError()
+            with profiler.phase('transfer'):
+                data: Optional[bytes] = process.ReadMemory(address + offset, min(chunk_size, length - offset), error)
+            if error.Fail() or data is None:
+                raise OSError(f"failed to read the result at {address + offset:#x}: {error}")
+            profiler.count('bytes_read', len(data))
+            yield data
+    return chunks()
+
+
+def exp_object(
+        debugger: lldb.SBDebugger,
+        script: str,
+        lang: int = lldb.eLanguageTypeSwift,
+        policy: Optional[ExpressionPolicy] = None,
+        arguments: Optional[Sequence[ArgumentValue]] = None,
+        cacheable: bool = False) -> Any:
+    """
+    Evaluates `script` and returns the property list object it produced, decoded on the host.
+
+    The script must store its result in a variable named `__illdb_result`
+    (NSDictionary, NSArray, NSString, NSNumber, NSDate or NSData; nil is not allowed inside collections).
+    The object is serialized as a binary plist in the debuggee and transferred like `exp_data`.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        script (str): The script to evaluate.
+        lang (int): The language of the script.
+        policy (Optional[ExpressionPolicy]): The expression policy. If None, the global policy is used.
+        arguments (Optional[Sequence[ArgumentValue]]): Arguments passed through the argument block (see `argument_prelude`).
+        cacheable (bool):
+            Whether the result may be reused until the process resumes (see `ExpressionCache`).
+            Only for scripts without side effects.
+
+    Returns:
+        Any: The decoded object, or None if evaluation or serialization failed.
+    """
+    script += _OBJECT_EPILOGUES[_epilogue_language(lang)]
+    return decode_result(_exp_buffer(debugger, script, lang, policy, arguments, cacheable))
+
+
+@profiler.timed('decode')
+def decode_result(data: Optional[bytes]) -> Any:
+    """
+    Decodes a result transferred by `exp_data`.
+
+    Args:
+        data (Optional[bytes]): Binary/XML property list or JSON.
+
+    Returns:
+        Any: The decoded object, or None if `data` is empty or cannot be decoded.
+    """
+    if not data:
+        return None
+    try:
+        if data.startswith(b'bplist') or data.startswith(b'<?xml'):
+            return plistlib.loads(data)
+        return json.loads(data)
+    except (ValueError, plistlib.InvalidFileException):
+        return None
+
+
+@dataclass
+class Probe:
+    """
+    A named expression evaluated as part of a `ProbeBatch`.
+
+    Attributes:
+        name (str): The key of the result.
+        expression (str): An expression evaluating to a property list object or nil.
+        callback (Optional[Callable[[Any], None]]): Called with the decoded result (None if nil) after the batch runs.
+    """
+
+    name: str
+    expression: str
+    callback: Optional[Callable[[Any], None]] = None
+
+
+@dataclass
+class ProbeBatch:
+    """
+    Collects several probes and evaluates them as a single expression.
+
+    Each probe's value is stored in one dictionary in the debuggee, which is transferred with `exp_object`,
+    so a command needs only one expression evaluation however many facts it has to look up.
+
+    Example:
+    ```python
+    batch = util.ProbeBatch(lldb.eLanguageTypeObjC, prelude="id object = (id)(self.view);")
+    batch.add('class', 'NSStringFromClass([object class])')
+    batch.add('hidden', '@([object isHidden])')
+    results = batch.run(debugger)
+    ```
+
+    Attributes:
+        lang (int): The language of the expressions.
+        prelude (str): Statements evaluated before the probes (e.g. binding an object shared by the probes).
+        probes (list[Probe]): The probes in evaluation order.
+    """
+
+    lang: int = lldb.eLanguageTypeObjC
+    prelude: str = ''
+    probes: list[Probe] = field(default_factory=list)
+
+    def add(self, name: str, expression: str, callback: Optional[Callable[[Any], None]] = None) -> 'ProbeBatch':
+        """
+        Adds a probe.
+
+        Args:
+            name (str): The key of the result.
+            expression (str): An expression evaluating to a property list object or nil.
+                In Objective-C, scalars have to be boxed (e.g. `@(value)`).
+            callback (Optional[Callable[[Any], None]]): Called with the result after the batch runs.
+
+        Returns:
+            ProbeBatch: self
+        """
+        self.probes.append(Probe(name, expression, callback))
+        return self
+
+    def script(self) -> str:
+        """
+        Returns the script evaluating every probe into `__illdb_result`.
+
+        Returns:
+            str: The script.
+        """
+        if self.lang == lldb.eLanguageTypeSwift:
+            script = "import Foundation\n"
+            script += self.prelude + "\n"
+            script += "var __illdb_result = [String: Any]()\n"
+            for probe in self.probes:
+                script += f"__illdb_result[{json.dumps(probe.name)}] = ({probe.expression})\n"
+        else:
+            script = "@import Foundation;\n"
+            script += self.prelude + "\n"
+            script += "NSMutableDictionary *__illdb_result = [NSMutableDictionary dictionary];\n"
+            for probe in self.probes:
+                script += f"""{{
+                id __illdb_value = (id)({probe.expression});
+                if (__illdb_value != nil) {{ __illdb_result[@{json.dumps(probe.name)}] = __illdb_value; }}
+                }}
+                """
+        return script
+
+    def run(
+        self,
+        debugger: lldb.SBDebugger,
+        policy: Optional[ExpressionPolicy] = None,
+        arguments: Optional[Sequence[ArgumentValue]] = None,
+        cacheable: bool = False
+    ) -> Optional[dict[str, Any]]:
+        """
+        Evaluates every probe in one expression and dispatches the results to the callbacks.
+
+        Args:
+            debugger (lldb.SBDebugger): The LLDB debugger.
+            policy (Optional[ExpressionPolicy]): The expression policy. If None, the global policy is used.
+            arguments (Optional[Sequence[ArgumentValue]]): Arguments passed through the argument block.
+            cacheable (bool): Whether the results may be reused until the process resumes.
+
+        Returns:
+            Optional[dict[str, Any]]: Results by probe name (nil results are missing), or None if evaluation failed.
+        """
+        results = exp_object(debugger, self.script(), lang=self.lang, policy=policy, arguments=arguments,
+                             cacheable=cacheable)
+        if not isinstance(results, dict):
+            return None
+
+        for probe in self.probes:
+            if probe.callback is not None:
+                probe.callback(results.get(probe.name))
+
+        return results
+
+
+def describe_object(value: Any, indent: int = 0) -> str:
+    """
+    Returns a description of a decoded property list object in the style of `-[NSObject description]`.
+
+    Args:
+        value (Any): The object.
+        indent (int): The indentation level.
+
+    Returns:
+        str: The description.
+    """
+    padding = '    ' * indent
+    if isinstance(value, dict):
+        lines = [f"{padding}    {describe_object(k)} = {describe_object(v, indent + 1)};" for k, v in value.items()]
+        return '{\n' + ''.join(line + '\n' for line in lines) + padding + '}'
+    elif isinstance(value, list):
+        lines = [f"{padding}    {describe_object(v, indent + 1)}" for v in value]
+        return '(\n' + ',\n'.join(lines) + ('\n' if lines else '') + padding + ')'
+    elif isinstance(value, bool):
+        return '1' if value else '0'
+    elif isinstance(value, bytes):
+        return f"{{length = {len(value)}, bytes = 0x{value[:32].hex()}{'...' if len(value) > 32 else ''}}}"
+    elif isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S +0000')
+    elif isinstance(value, str):
+        if re.fullmatch(r'[\w.$/]+', value):
+            return value
+        return json.dumps(value, ensure_ascii=False)
+    else:
+        return str(value)
+
+
+def unquote(text: str) -> str:
+    """
+    Removes the quotes surrounding a command argument (arguments are split with `posix=False`).
+
+    Args:
+        text (str): The argument.
+
+    Returns:
+        str: The argument without surrounding quotes.
+    """
+    if len(text) > 1 and text[0] == text[-1] and text[0] in ('"', "'"):
+        return text[1:-1]
+    return text
+
+
+@profiler.timed('read_script')
 def read_script_file(file_name: str) -> str:
     file_path = os.path.realpath(__file__)
     dir_name = os.path.dirname(file_path)
@@ -50,52 +910,324 @@ def read_script_file(file_name: str) -> str:
     return text
 
 
-def isIOSSimulator(debugger: lldb.SBDebugger) -> bool:
-    script = """
-    @import Foundation;
-    NSString *name = [[[NSProcessInfo processInfo] environment] objectForKey:@"SIMULATOR_DEVICE_NAME"];
-    name;
+@dataclass(frozen=True)
+class HelperScript:
     """
-    ret = exp_script(debugger, script, lang=lldb.eLanguageTypeObjC)
-    if ret:
-        result: Optional[str] = ret.asStr()
-        return result is not None
-    else:
-        return False
+    A script file whose top-level functions are installed into the debuggee once per process.
 
+    The functions listed in `symbols` are declared as persistent (`$`-prefixed) declarations,
+    so later expressions only have to call them instead of recompiling the whole file.
 
-def isAppKit(debugger: lldb.SBDebugger) -> bool:
-    script = """
-    @import Foundation;
-    Class app = NSClassFromString(@"NSApplication");
-    BOOL val = (BOOL)(app != nil)
-    val
+    Attributes:
+        file_name (str): The script file relative to the `src` directory.
+        symbols (tuple[str, ...]): Names of the top-level functions defined in the file.
+        prelude (str): Code prepended to both the installation and every call (imports, typealiases).
+        lang (int): The language of the script.
     """
-    ret = exp_script(debugger, script, lang=lldb.eLanguageTypeObjC)
 
-    if ret:
-        result: Optional[bool] = ret.asBool()
-        return False if result is None else result
-    else:
-        return False
+    file_name: str
+    symbols: tuple[str, ...]
+    prelude: str = ''
+    lang: int = lldb.eLanguageTypeSwift
 
+    def rename(self, text: str, prefix: str) -> str:
+        """
+        Rewrites every call or declaration of the helper's functions in `text` to the persistent name.
 
-def isUIKit(debugger: lldb.SBDebugger) -> bool:
-    script = """
-    @import Foundation;
-    Class app = NSClassFromString(@"UIApplication");
-    BOOL val = (BOOL)(app != nil)
-    val;
+        Args:
+            text (str): Script text.
+            prefix (str): The prefix of the persistent names (e.g. `$illdb1_`).
+
+        Returns:
+            str: The rewritten script text.
+        """
+        pattern = r'(?<![\w$.])(' + '|'.join(map(re.escape, self.symbols)) + r')(?=\s*\()'
+        return re.sub(pattern, lambda m: prefix + m.group(1), text)
+
+
+# process key -> (file name, prelude) -> prefix of persistent names (None if installation failed)
+_installed_helpers: dict[tuple[int, int], dict[tuple[str, str], Optional[str]]] = {}
+_helper_generation = 0
+
+
+def process_key(debugger: lldb.SBDebugger) -> Optional[tuple[int, int]]:
     """
-    ret = exp_script(debugger, script, lang=lldb.eLanguageTypeObjC)
-    if ret:
-        result: Optional[bool] = ret.asBool()
-        return False if result is None else result
-    else:
+    Returns a key identifying the current process of the selected target.
+    The key changes whenever the process is relaunched.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+
+    Returns:
+        Optional[tuple[int, int]]: (unique ID, process ID), or None if there is no live process.
+    """
+    process: lldb.SBProcess = debugger.GetSelectedTarget().GetProcess()
+    if not process.IsValid() or not process.is_alive:
+        return None
+    return (process.GetUniqueID(), process.GetProcessID())
+
+
+def image_path(module: lldb.SBModule) -> str:
+    """
+    Returns the path of a module in the process, as `_dyld_get_image_name` and `class_getImageName` return it.
+
+    The file LLDB reads on the host (`GetFileSpec`) may be a copy, e.g. under DeviceSupport for physical devices,
+    so the path on the platform is used when there is one.
+
+    Args:
+        module (lldb.SBModule): The module.
+
+    Returns:
+        str: The path.
+    """
+    platform_file: lldb.SBFileSpec = module.GetPlatformFileSpec()
+    if platform_file.IsValid() and platform_file.fullpath:
+        return str(platform_file.fullpath)
+    return str(module.GetFileSpec().fullpath)
+
+
+def module_uuids(debugger: lldb.SBDebugger, host_files: bool = False) -> dict[str, Optional[str]]:
+    """
+    Returns the UUIDs of the modules of the selected target by path.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        host_files (bool): Key modules by the path of their file on the host instead of their path in the process.
+
+    Returns:
+        dict[str, Optional[str]]: The UUID of each module, or None if it has none.
+    """
+    target: lldb.SBTarget = debugger.GetSelectedTarget()
+    modules: dict[str, Optional[str]] = {}
+    for i in range(target.GetNumModules()):
+        module: lldb.SBModule = target.GetModuleAtIndex(i)
+        path = module.GetFileSpec().fullpath if host_files else image_path(module)
+        if not path:
+            continue
+        modules[path] = module.GetUUIDString() or None
+    return modules
+
+
+def install_helper(
+        debugger: lldb.SBDebugger,
+        helper: HelperScript,
+        policy: Optional[ExpressionPolicy] = None) -> Optional[str]:
+    """
+    Installs the helper's functions into the current process unless they already are.
+
+    Persistent declarations survive stops, so a helper is compiled once per process.
+    A relaunched process gets a new key and the helper is installed again under fresh names.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        helper (HelperScript): The helper to install.
+        policy (Optional[ExpressionPolicy]): The expression policy. If None, the global policy is used.
+
+    Returns:
+        Optional[str]: The prefix of the installed names, or None if installation is impossible.
+    """
+    global _helper_generation
+
+    key = process_key(debugger)
+    if key is None:
+        return None
+
+    installed = _installed_helpers.setdefault(key, {})
+
+    helper_key = (helper.file_name, helper.prelude)
+    if helper_key in installed:
+        return installed[helper_key]
+
+    _helper_generation += 1
+    prefix = f"$illdb{_helper_generation}_"
+
+    script = helper.prelude + '\n' + helper.rename(read_script_file(helper.file_name), prefix)
+    with profiler.phase('install_helper'):
+        ret = exp_script(debugger, script, lang=helper.lang, policy=policy)
+
+    installed[helper_key] = prefix if ret is not None else None
+    return installed[helper_key]
+
+
+def exp_helper(
+        debugger: lldb.SBDebugger,
+        helper: HelperScript,
+        call: str,
+        policy: Optional[ExpressionPolicy] = None,
+        arguments: Optional[Sequence[ArgumentValue]] = None) -> Optional[lldb.SBValue]:
+    """
+    Evaluates `call` using the helper's functions, installing them first if needed.
+
+    If the helper cannot be installed, the whole script is evaluated along with `call` as before.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        helper (HelperScript): The helper whose functions `call` uses.
+        call (str): Script calling the helper's functions by their original names.
+        policy (Optional[ExpressionPolicy]): The expression policy. If None, the global policy is used.
+        arguments (Optional[Sequence[ArgumentValue]]): Arguments passed through the argument block (see `argument_prelude`).
+
+    Returns:
+        Optional[lldb.SBValue]: The result of the expression.
+    """
+    script = helper_script(debugger, helper, call, policy=policy)
+    return exp_script(debugger, script, lang=helper.lang, policy=policy, arguments=arguments)
+
+
+def helper_script(
+        debugger: lldb.SBDebugger,
+        helper: HelperScript,
+        call: str,
+        policy: Optional[ExpressionPolicy] = None) -> str:
+    """
+    Returns the script evaluating `call` with the helper's functions, installing them first if needed.
+    Used instead of `exp_helper` to evaluate the script with `exp_object` or `exp_data`.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        helper (HelperScript): The helper whose functions `call` uses.
+        call (str): Script calling the helper's functions by their original names.
+        policy (Optional[ExpressionPolicy]): The expression policy used to install the helper.
+
+    Returns:
+        str: The script. It contains the whole helper if the helper cannot be installed.
+    """
+    prefix = install_helper(debugger, helper, policy=policy)
+    if prefix is None:
+        return helper.prelude + '\n' + read_script_file(helper.file_name) + '\n' + call
+    return helper.prelude + '\n' + helper.rename(call, prefix)
+
+
+@dataclass(frozen=True)
+class PlatformInfo:
+    """
+    Platform facts of the debuggee derived without evaluating any expression.
+
+    Attributes:
+        arch (str): Architecture of the target triple (e.g. `arm64`, `x86_64`), empty if unknown.
+        os (str): OS name of the target triple (e.g. `ios`, `macosx`), empty if unknown.
+        environment (str): Environment of the target triple (e.g. `simulator`, `macabi`).
+        platform_name (str): Name of the selected platform plugin (e.g. `ios-simulator`).
+        has_uikit (Optional[bool]): Whether UIKit is loaded. None if the module list is not available yet.
+        has_appkit (Optional[bool]): Whether AppKit is loaded. None if the module list is not available yet.
+    """
+
+    arch: str
+    os: str
+    environment: str
+    platform_name: str
+    has_uikit: Optional[bool]
+    has_appkit: Optional[bool]
+
+    @property
+    def is_simulator(self) -> Optional[bool]:
+        if self.environment == 'simulator' or self.platform_name.endswith('-simulator'):
+            return True
+        if self.os == '':
+            return None
         return False
 
+    @property
+    def is_macos(self) -> Optional[bool]:
+        if self.os == 'macosx' or self.environment == 'macabi':
+            return True
+        if self.os == '':
+            return None
+        # iOS apps running natively on Apple silicon Macs
+        return self.platform_name in ('host', 'remote-macosx') and not self.is_simulator
+
+    @property
+    def is_ios(self) -> Optional[bool]:
+        if self.os == '':
+            return None
+        return self.os == 'ios' and not self.is_macos
+
+
+# process key -> platform facts
+_platform_infos: dict[tuple[int, int], PlatformInfo] = {}
+
+UIKIT_MODULE_NAMES = {'UIKitCore', 'UIKit'}
+APPKIT_MODULE_NAMES = {'AppKit'}
+
+
+def platform_info(debugger: lldb.SBDebugger) -> Optional[PlatformInfo]:
+    """
+    Returns the platform facts of the current process.
+
+    The facts are derived from the target triple, the platform plugin and the module list,
+    and memoized per process. A relaunched process gets a new key, so nothing stale is reused.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+
+    Returns:
+        Optional[PlatformInfo]: The platform facts, or None if there is no live process.
+    """
+    key = process_key(debugger)
+    if key is None:
+        return None
+    if key in _platform_infos:
+        return _platform_infos[key]
+
+    target: lldb.SBTarget = debugger.GetSelectedTarget()
+
+    triple: str = target.GetTriple() or ''
+    components = triple.split('-')
+    os_name = re.sub(r'[0-9.]+$', '', components[2]) if len(components) > 2 else ''
+    environment = components[3] if len(components) > 3 else ''
+
+    platform: lldb.SBPlatform = target.GetPlatform()
+    platform_name: str = (platform.GetName() if platform.IsValid() else None) or ''
+
+    module_names = set()
+    for i in range(target.GetNumModules()):
+        module: lldb.SBModule = target.GetModuleAtIndex(i)
+        module_names.add(module.GetFileSpec().GetFilename())
+
+    # Only the executable (and dyld) is known until dependent libraries are loaded
+    modules_loaded = len(module_names) > 2
+
+    info = PlatformInfo(
+        arch=components[0],
+        os=os_name,
+        environment=environment,
+        platform_name=platform_name,
+        has_uikit=not module_names.isdisjoint(UIKIT_MODULE_NAMES) if modules_loaded else None,
+        has_appkit=not module_names.isdisjoint(APPKIT_MODULE_NAMES) if modules_loaded else None
+    )
+
+    if modules_loaded:
+        _platform_infos[key] = info
+
+    return info
+
+
+def isIOSSimulator(debugger: lldb.SBDebugger) -> bool:
+    info = platform_info(debugger)
+    if info is not None and info.is_simulator is not None:
+        return info.is_simulator
+    return _probeIOSSimulator(debugger)
+
+
+def isAppKit(debugger: lldb.SBDebugger) -> bool:
+    info = platform_info(debugger)
+    if info is not None and info.has_appkit is not None:
+        return info.has_appkit
+    return _probeClass(debugger, 'NSApplication')
+
+
+def isUIKit(debugger: lldb.SBDebugger) -> bool:
+    info = platform_info(debugger)
+    if info is not None and info.has_uikit is not None:
+        return info.has_uikit
+    return _probeClass(debugger, 'UIApplication')
+
 
 def isMacOS(debugger: lldb.SBDebugger) -> bool:
+    info = platform_info(debugger)
+    if info is not None and info.is_macos is not None:
+        return info.is_macos
+
     model = sysctlbyname(debugger, "hw.model")
     if model:
         return 'Mac' in model and not isIOSSimulator(debugger)
@@ -104,6 +1236,10 @@ def isMacOS(debugger: lldb.SBDebugger) -> bool:
 
 
 def isIOS(debugger: lldb.SBDebugger) -> bool:
+    info = platform_info(debugger)
+    if info is not None and info.is_ios is not None:
+        return info.is_ios
+
     machine = sysctlbyname(debugger, "hw.machine")
     if machine:
         return 'iP' in machine or isIOSSimulator(debugger)
@@ -111,22 +1247,52 @@ def isIOS(debugger: lldb.SBDebugger) -> bool:
         return isUIKit(debugger)
 
 
-def sysctlbyname(debugger: lldb.SBDebugger, key: str) -> Optional[str]:
+def _probeIOSSimulator(debugger: lldb.SBDebugger) -> bool:
+    script = """
+    @import Foundation;
+    NSString *name = [[[NSProcessInfo processInfo] environment] objectForKey:@"SIMULATOR_DEVICE_NAME"];
+    name;
+    """
+    ret = exp_script(debugger, script, lang=lldb.eLanguageTypeObjC)
+    if ret:
+        result: Optional[str] = ret.asStr()
+        return result is not None
+    else:
+        return False
+
+
+def _probeClass(debugger: lldb.SBDebugger, class_name: str) -> bool:
     script = f"""
     @import Foundation;
+    Class app = NSClassFromString(@"{class_name}");
+    BOOL val = (BOOL)(app != nil);
+    val;
+    """
+    ret = exp_script(debugger, script, lang=lldb.eLanguageTypeObjC)
+    if ret:
+        result: Optional[bool] = ret.asBool()
+        return False if result is None else result
+    else:
+        return False
+
+
+def sysctlbyname(debugger: lldb.SBDebugger, key: str) -> Optional[str]:
+    script = """
+    @import Foundation;
     int sysctlbyname(const char *, void *, size_t *, void *, size_t);
 
+    const char *key = [__illdb_arg_string(0) UTF8String];
     size_t size = 0;
-    sysctlbyname("{key}", NULL, &size, NULL, 0);
+    sysctlbyname(key, NULL, &size, NULL, 0);
     char *machine = (char *)malloc(size);
-    sysctlbyname("{key}", machine, &size, NULL, 0);
+    sysctlbyname(key, machine, &size, NULL, 0);
 
     NSString *result = [NSString stringWithUTF8String:machine];
     free(machine);
     result;
     """
 
-    ret = exp_script(debugger, script, lang=lldb.eLanguageTypeObjC)
+    ret = exp_script(debugger, script, lang=lldb.eLanguageTypeObjC, arguments=[key])
     if ret:
         result: Optional[str] = ret.asStr()
         return result
@@ -134,6 +1300,74 @@ def sysctlbyname(debugger: lldb.SBDebugger, key: str) -> Optional[str]:
         return None
 
 
+def object_address(debugger: lldb.SBDebugger, object: str) -> Optional[int]:
+    """
+    Returns the address of an object given as an address, a variable path or an expression.
+
+    Addresses and variables are resolved without evaluating any expression.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        object (str): An address (e.g. `0x600001234560`), a variable path (e.g. `self.view`) or an expression.
+
+    Returns:
+        Optional[int]: The address, or None if it cannot be resolved or is zero.
+    """
+    try:
+        return int(object, 0) or None
+    except ValueError:
+        pass
+
+    frame: lldb.SBFrame = (
+        debugger.GetSelectedTarget()
+        .GetProcess()
+        .GetSelectedThread()
+        .GetSelectedFrame()
+    )
+    if not frame:
+        return None
+
+    if re.fullmatch(r'[A-Za-z_$][\w$]*(\.[A-Za-z_$][\w$]*)*', object):
+        value: lldb.SBValue = frame.GetValueForVariablePath(object)
+        if value.IsValid() and value.GetError().Success():
+            address = value.GetValueAsUnsigned()
+            if address != 0:
+                return address  # type: ignore[no-any-return]
+
+    if currentLanguage(debugger) == lldb.eLanguageTypeSwift:
+        ret = exp_script(debugger, f"unsafeBitCast(({object}) as AnyObject, to: UInt.self)", cacheable=True)
+    else:
+        ret = exp_script(debugger, f"(uintptr_t)({object})", lang=lldb.eLanguageTypeObjC_plus_plus, cacheable=True)
+    if ret is None:
+        return None
+    return ret.GetValueAsUnsigned() or None
+
+
+def read_memory(debugger: lldb.SBDebugger, address: int, length: int) -> Optional[bytes]:
+    """
+    Reads the memory of the selected process without evaluating any expression.
+
+    Args:
+        debugger (lldb.SBDebugger): The LLDB debugger.
+        address (int): The start address.
+        length (int): The number of bytes to read.
+
+    Returns:
+        Optional[bytes]: The memory, or None if it cannot be read.
+    """
+    if length <= 0:
+        return b''
+    process: lldb.SBProcess = debugger.GetSelectedTarget().GetProcess()
+    error = lldb.SBError()
+    with profiler.phase('memory_read'):
+        data: Optional[bytes] = process.ReadMemory(address, length, error)
+    profiler.count('memory_reads')
+    if error.Fail() or data is None:
+        return None
+    profiler.count('bytes_read', len(data))
+    return data
+
+
 def currentLanguage(debugger: lldb.SBDebugger) -> int:
     return (  # type: ignore[no-any-return]
         debugger.GetSelectedTarget()